@@ -0,0 +1,213 @@
+"""Benchmarks for pyteseo.io.domain coastline functions over synthetic coastlines
+
+Usage:
+    python benchmarks/bench_domain.py split --n-polygons 100000
+    python benchmarks/bench_domain.py index --n-polygons 10000 --n-points 1000000
+    python benchmarks/bench_domain.py write --n-polygons 50000
+"""
+
+from __future__ import annotations
+
+import argparse
+import filecmp
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+import numpy as np
+import pandas as pd
+
+from pyteseo.classes import CoastlineIndex, RaggedCoastline
+from pyteseo.io.domain import _split_polygons, write_coastline
+
+
+def synthetic_coastline(
+    n_polygons: int = 10000, n_vertices: int = 20, seed: int = 0
+) -> pd.DataFrame:
+    """synthetic coastline DataFrame (lon, lat) with polygons separated by nan lines
+
+    Args:
+        n_polygons (int, optional): number of polygons. Defaults to 10000.
+        n_vertices (int, optional): mean number of vertices per polygon. Defaults to 20.
+        seed (int, optional): random seed. Defaults to 0.
+
+    Returns:
+        pd.DataFrame: coastline DataFrame as read from a coastline-file (before splitting)
+    """
+    rng = np.random.default_rng(seed)
+    sizes = rng.integers(3, 2 * n_vertices - 3, n_polygons)
+    centers = np.column_stack(
+        [rng.uniform(-10, 10, n_polygons), rng.uniform(35, 45, n_polygons)]
+    )
+
+    blocks = []
+    for size, center in zip(sizes, centers):
+        angles = np.sort(rng.uniform(0, 2 * np.pi, size))
+        radius = rng.uniform(0.005, 0.02) * (1 + 0.3 * rng.random(size))
+        vertices = center + np.column_stack(
+            [radius * np.cos(angles), radius * np.sin(angles)]
+        )
+        blocks.append(np.full((1, 2), np.nan))
+        blocks.append(np.vstack([vertices, vertices[:1]]))
+    return pd.DataFrame(np.vstack(blocks), columns=["lon", "lat"])
+
+
+def split_polygons_loop(df: pd.DataFrame) -> pd.DataFrame:
+    """reference implementation: slice between nan lines and concatenate"""
+    splitted_dfs = []
+    previous_i = count = 0
+    n_nans = len(df[df.isna().any(axis=1)])
+
+    for i in df[df.isna().any(axis=1)].index.values:
+        count += 1
+        if i == 0:
+            continue
+        if count == n_nans:
+            splitted_dfs.append(df.iloc[previous_i:i])
+            if i == df.iloc[[-1]].index.values:
+                break
+            else:
+                splitted_dfs.append(df.iloc[i:])
+        else:
+            splitted_dfs.append(df.iloc[previous_i:i])
+            previous_i = i
+
+    new_polygons = []
+    for i, polygon in enumerate(splitted_dfs):
+        polygon = polygon.copy()
+        polygon.loc[:, ("polygon")] = i + 1
+        polygon.loc[:, ("point")] = polygon.index
+        polygon = polygon.set_index(["polygon", "point"])
+        new_polygons.append(polygon)
+
+    return pd.concat(new_polygons)
+
+
+def timeit(func, *args, repeat: int = 3, **kwargs) -> float:
+    """best wall time of several calls (seconds)"""
+    times = []
+    for _ in range(repeat):
+        t0 = perf_counter()
+        func(*args, **kwargs)
+        times.append(perf_counter() - t0)
+    return min(times)
+
+
+def bench_split(n_polygons: int, n_vertices: int, reference: bool = True) -> None:
+    df = synthetic_coastline(n_polygons, n_vertices)
+    print(f"_split_polygons ({n_polygons} polygons, {len(df)} lines)")
+
+    t = timeit(_split_polygons, df)
+    print(f"    vectorized: {t:.3f} s")
+    if reference:
+        t_loop = timeit(split_polygons_loop, df, repeat=1)
+        print(f"    loop: {t_loop:.3f} s ({t_loop / t:.1f}x)")
+        pd.testing.assert_frame_equal(_split_polygons(df), split_polygons_loop(df))
+
+
+def contains_loop(ragged: RaggedCoastline, lon: np.ndarray, lat: np.ndarray):
+    """reference implementation: even-odd rule polygon by polygon with matplotlib"""
+    from matplotlib.path import Path as MplPath
+
+    points = np.column_stack([lon, lat])
+    parity = np.zeros(len(points), dtype=np.int64)
+    for polygon in ragged:
+        parity += MplPath(polygon).contains_points(points)
+    return parity % 2 == 1
+
+
+def bench_index(
+    n_polygons: int, n_vertices: int, n_points: int, reference: bool = True
+) -> None:
+    ragged = RaggedCoastline.from_dataframe(
+        _split_polygons(synthetic_coastline(n_polygons, n_vertices))
+    )
+    rng = np.random.default_rng(1)
+    lon = rng.uniform(-10, 10, n_points)
+    lat = rng.uniform(35, 45, n_points)
+    print(f"CoastlineIndex ({ragged.n_vertices} vertices, {n_points} points)")
+
+    t = timeit(CoastlineIndex, ragged, repeat=1)
+    print(f"    build: {t:.3f} s")
+    index = CoastlineIndex(ragged)
+    t = timeit(index.contains, lon, lat, repeat=1)
+    print(f"    contains: {t:.3f} s")
+    t_distance = timeit(index.distance, lon, lat, repeat=1)
+    print(f"    distance: {t_distance:.3f} s")
+    if reference:
+        t_loop = timeit(contains_loop, ragged, lon, lat, repeat=1)
+        print(f"    contains loop: {t_loop:.3f} s ({t_loop / t:.1f}x)")
+        np.testing.assert_array_equal(
+            index.contains(lon, lat), contains_loop(ragged, lon, lat)
+        )
+
+
+def write_coastline_groupby(df: pd.DataFrame, path: Path) -> None:
+    """reference implementation: DataFrame.to_csv for the coastline and each polygon"""
+    kwargs = dict(sep="\t", header=False, index=False, float_format="%.8e")
+    df.to_csv(path, na_rep="NaN", **kwargs)
+    for polygon, group in df.groupby("polygon"):
+        group.to_csv(
+            Path(path.parent, f"coastline_polygon_{polygon:03d}.dat"),
+            na_rep="NaN",
+            **kwargs,
+        )
+
+
+def bench_write(
+    n_polygons: int, n_vertices: int, n_workers: int, reference: bool = True
+) -> None:
+    df = _split_polygons(synthetic_coastline(n_polygons, n_vertices))
+    print(f"write_coastline ({n_polygons} polygons, {len(df)} lines)")
+
+    with TemporaryDirectory() as tmp_dir:
+        new_dir, old_dir = Path(tmp_dir, "new"), Path(tmp_dir, "old")
+        new_dir.mkdir()
+        old_dir.mkdir()
+        path = Path(new_dir, "coastline.dat")
+        t = timeit(write_coastline, df, path, n_workers=n_workers, repeat=1)
+        print(f"    bulk ({n_workers=}): {t:.3f} s")
+        if reference:
+            t_ref = timeit(
+                write_coastline_groupby, df, Path(old_dir, "coastline.dat"), repeat=1
+            )
+            print(f"    groupby: {t_ref:.3f} s ({t_ref / t:.1f}x)")
+            names = sorted(p.name for p in old_dir.iterdir())
+            _, mismatch, errors = filecmp.cmpfiles(
+                old_dir, new_dir, names, shallow=False
+            )
+            assert not mismatch and not errors, "written files differ"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    split = subparsers.add_parser("split")
+    split.add_argument("--n-polygons", type=int, default=10000)
+    split.add_argument("--n-vertices", type=int, default=20)
+    split.add_argument("--no-reference", action="store_true")
+
+    index = subparsers.add_parser("index")
+    index.add_argument("--n-polygons", type=int, default=10000)
+    index.add_argument("--n-vertices", type=int, default=20)
+    index.add_argument("--n-points", type=int, default=100000)
+    index.add_argument("--no-reference", action="store_true")
+
+    write = subparsers.add_parser("write")
+    write.add_argument("--n-polygons", type=int, default=10000)
+    write.add_argument("--n-vertices", type=int, default=20)
+    write.add_argument("--n-workers", type=int, default=1)
+    write.add_argument("--no-reference", action="store_true")
+
+    args = parser.parse_args()
+    if args.benchmark == "split":
+        bench_split(args.n_polygons, args.n_vertices, not args.no_reference)
+    elif args.benchmark == "index":
+        bench_index(
+            args.n_polygons, args.n_vertices, args.n_points, not args.no_reference
+        )
+    elif args.benchmark == "write":
+        bench_write(
+            args.n_polygons, args.n_vertices, args.n_workers, not args.no_reference
+        )
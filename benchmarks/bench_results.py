@@ -0,0 +1,178 @@
+"""Benchmarks for pyteseo.io.results readers over synthetic TESEO outputs
+
+Usage:
+    python benchmarks/bench_results.py particles --n-files 2000 --n-workers 8
+    python benchmarks/bench_results.py grids --nx 500 --ny 500 --n-times 240
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+from pathlib import Path
+from time import perf_counter
+
+import numpy as np
+import pandas as pd
+
+from pyteseo.io.results import _add_inactive_cells, read_particles_results
+
+PARTICLES_HEADER = "time (h), spill_id (-), subspill_id (-), longitude (º),  latitude (º), depth (m), status_index (-)"
+
+
+def write_synthetic_particles(
+    dir_path: str, n_files: int = 500, n_particles: int = 1000
+) -> None:
+    """write synthetic "*_particles_*.txt" files with TESEO's format
+
+    Args:
+        dir_path (str): output directory
+        n_files (int, optional): number of snapshots. Defaults to 500.
+        n_particles (int, optional): number of particles per snapshot. Defaults to 1000.
+    """
+    rng = np.random.default_rng(0)
+    for i in range(n_files):
+        data = np.column_stack(
+            [
+                np.full(n_particles, i * 0.5),
+                np.ones(n_particles),
+                np.ones(n_particles),
+                -3.8 + rng.random(n_particles) * 0.1,
+                43.4 + rng.random(n_particles) * 0.1,
+                np.zeros(n_particles),
+                np.ones(n_particles),
+            ]
+        )
+        np.savetxt(
+            Path(dir_path, f"bench_particles_{i:06d}.txt"),
+            data,
+            fmt=["%8.2f", "%12d", "%15d", "%14.7f", "%13.7f", "%10.4f", "%16d"],
+            delimiter=",",
+            header=PARTICLES_HEADER,
+            comments="",
+            encoding="iso-8859-1",
+        )
+
+
+def add_inactive_cells_loop(
+    df_spill: pd.DataFrame, minimum_grid: pd.DataFrame, spill_id: int
+) -> pd.DataFrame:
+    """reference implementation: concatenate the minimum grid to every time step"""
+    full_df = []
+    for time, df in df_spill.groupby("time (h)"):
+        tmp = pd.concat([minimum_grid, df])
+        tmp["spill_id (-)"] = spill_id
+        tmp["time (h)"] = time
+        full_df.append(
+            tmp.drop_duplicates(["longitude (º)", "latitude (º)"], keep="last")
+        )
+    return pd.concat(full_df).reset_index(drop=True)
+
+
+def synthetic_grids(
+    nx: int = 500, ny: int = 500, n_times: int = 240, active_fraction: float = 0.05
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """synthetic minimum grid and active cells of a spill
+
+    Returns:
+        tuple[pd.DataFrame, pd.DataFrame]: active cells and minimum grid
+    """
+    rng = np.random.default_rng(0)
+    lon, lat = np.meshgrid(
+        -3.8 + np.arange(nx) * 5e-4, 43.4 + np.arange(ny) * 5e-4, indexing="ij"
+    )
+    minimum_grid = pd.DataFrame(
+        {"longitude (º)": lon.ravel(), "latitude (º)": lat.ravel()}
+    )
+
+    n_active = int(nx * ny * active_fraction)
+    dfs = []
+    for i in range(n_times):
+        cells = rng.choice(nx * ny, n_active, replace=False)
+        dfs.append(
+            pd.DataFrame(
+                {
+                    "time (h)": i * 0.5,
+                    "longitude (º)": minimum_grid["longitude (º)"].values[cells],
+                    "latitude (º)": minimum_grid["latitude (º)"].values[cells],
+                    "surface_mass_per_area (kg/m2)": rng.random(n_active),
+                    "presence_probability (%)": rng.random(n_active) * 100,
+                    "particles_per_cell (-)": rng.integers(1, 100, n_active),
+                    "spill_id (-)": 1,
+                }
+            )
+        )
+    return pd.concat(dfs).reset_index(drop=True), minimum_grid
+
+
+def timeit(func, *args, repeat: int = 3, **kwargs) -> float:
+    """best wall time of several calls (seconds)"""
+    times = []
+    for _ in range(repeat):
+        t0 = perf_counter()
+        func(*args, **kwargs)
+        times.append(perf_counter() - t0)
+    return min(times)
+
+
+def bench_particles(n_files: int, n_particles: int, n_workers: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        write_synthetic_particles(tmp_dir, n_files, n_particles)
+
+        df_serial = read_particles_results(tmp_dir)
+        for executor in ["thread", "process"]:
+            pd.testing.assert_frame_equal(
+                df_serial,
+                read_particles_results(tmp_dir, n_workers=n_workers, executor=executor),
+            )
+
+        print(f"read_particles_results ({n_files} files x {n_particles} particles)")
+        serial = timeit(read_particles_results, tmp_dir)
+        print(f"    serial: {serial:.3f} s")
+        for executor in ["thread", "process"]:
+            t = timeit(
+                read_particles_results, tmp_dir, n_workers=n_workers, executor=executor
+            )
+            print(f"    {executor} x{n_workers}: {t:.3f} s ({serial / t:.2f}x)")
+
+
+def bench_grids(nx: int, ny: int, n_times: int, reference: bool = True) -> None:
+    df_spill, minimum_grid = synthetic_grids(nx, ny, n_times)
+    print(f"_add_inactive_cells ({nx}x{ny} grid, {n_times} times)")
+
+    t = timeit(_add_inactive_cells, df_spill, minimum_grid, 1, repeat=1)
+    print(f"    vectorized: {t:.3f} s")
+    if reference:
+        t_loop = timeit(add_inactive_cells_loop, df_spill, minimum_grid, 1, repeat=1)
+        print(f"    loop: {t_loop:.3f} s ({t_loop / t:.2f}x)")
+
+        keys = ["time (h)", "longitude (º)", "latitude (º)"]
+        df = _add_inactive_cells(df_spill, minimum_grid, 1)
+        df_loop = add_inactive_cells_loop(df_spill, minimum_grid, 1)[df.columns]
+        pd.testing.assert_frame_equal(
+            df.sort_values(keys).reset_index(drop=True),
+            df_loop.sort_values(keys).reset_index(drop=True),
+            check_dtype=False,
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    particles = subparsers.add_parser("particles")
+    particles.add_argument("--n-files", type=int, default=500)
+    particles.add_argument("--n-particles", type=int, default=1000)
+    particles.add_argument("--n-workers", type=int, default=4)
+
+    grids = subparsers.add_parser("grids")
+    grids.add_argument("--nx", type=int, default=500)
+    grids.add_argument("--ny", type=int, default=500)
+    grids.add_argument("--n-times", type=int, default=240)
+    grids.add_argument("--no-reference", action="store_true")
+
+    args = parser.parse_args()
+    if args.benchmark == "particles":
+        bench_particles(args.n_files, args.n_particles, args.n_workers)
+    elif args.benchmark == "grids":
+        bench_grids(args.nx, args.ny, args.n_times, not args.no_reference)
@@ -2,21 +2,29 @@ from pathlib import Path
 
 import numpy as np
 import pandas as pd
+from scipy.spatial import cKDTree
 
-from pyteseo.defaults import COORDINATE_NAMES, VARIABLE_NAMES
+from pyteseo.defaults import COORDINATE_NAMES, EARTH_RADIUS, VARIABLE_NAMES
 from pyteseo.io.domain import read_coastline, read_grid
-from pyteseo.io.forcings import read_2d_forcing, read_cte_forcing
+from pyteseo.io.forcings import (
+    read_2d_forcing,
+    read_cte_forcing,
+    read_forcing_metadata,
+)
+from pyteseo.io.utils import _segment_distance
 
 
 class Grid:
-    def __init__(self, path: str):
+    def __init__(self, path: str, sidecar: bool = False):
         """centralize grid data and properties
 
         Args:
             path (str): path to grid file
+            sidecar (bool, optional): read grid from a memory-mapped binary copy next to the grid file (built on first read). Defaults to False.
         """
         self.path = str(Path(path).resolve())
-        df = read_grid(self.path)
+        self.sidecar = sidecar
+        df = read_grid(self.path, sidecar=self.sidecar)
         self.calculate_variables(df)
 
     def calculate_variables(self, df):
@@ -31,7 +39,7 @@ class Grid:
 
     @property
     def load(self):
-        return read_grid(self.path)
+        return read_grid(self.path, sidecar=self.sidecar)
 
     def __repr__(self) -> str:
         return f"{self.__class__.__name__}(path={self.path})"
@@ -59,10 +67,362 @@ class Coastline:
     def load(self):
         return read_coastline(self.path)
 
+    @property
+    def ragged(self):
+        return RaggedCoastline.from_dataframe(self.load)
+
+    @property
+    def spatial_index(self):
+        return CoastlineIndex(self.ragged)
+
     def __repr__(self) -> str:
         return f"{self.__class__.__name__}(path={self.path})"
 
 
+class RaggedCoastline:
+    def __init__(
+        self,
+        coords: np.ndarray,
+        offsets: np.ndarray,
+        polygon_ids: np.ndarray = None,
+        leading_nan: bool = False,
+    ):
+        """coastline polygons as a ragged array, vertices of every polygon stored contiguously (CSR layout)
+
+        Args:
+            coords (np.ndarray): (n_vertices, 2) lon, lat of the vertices of all polygons (without nan separators).
+            offsets (np.ndarray): (n_polygons + 1) position in coords where each polygon starts (last one is n_vertices).
+            polygon_ids (np.ndarray, optional): polygon number of each polygon. Defaults to 1...n_polygons.
+            leading_nan (bool, optional): the first polygon starts with a nan line in the DataFrame. Defaults to False.
+        """
+        self.coords = np.ascontiguousarray(coords, dtype=np.float64).reshape(-1, 2)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        if self.offsets[0] != 0 or self.offsets[-1] != len(self.coords):
+            raise ValueError(
+                "offsets should start at 0 and end at the number of vertices"
+            )
+        if np.any(np.diff(self.offsets) < 0):
+            raise ValueError("offsets should be monotonic increasing")
+
+        if polygon_ids is None:
+            polygon_ids = np.arange(1, len(self.offsets))
+        self.polygon_ids = np.asarray(polygon_ids, dtype=np.int64)
+        if len(self.polygon_ids) != self.n_polygons:
+            raise ValueError("polygon_ids should have one value per polygon")
+        self.leading_nan = bool(leading_nan)
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame):
+        """build from a coastline DataFrame with polygon and point as indexes (see read_coastline)
+
+        Args:
+            df (pd.DataFrame): coastline DataFrame (nan lines are dropped)
+
+        Returns:
+            RaggedCoastline: ragged coastline
+        """
+        polygons = df.index.get_level_values("polygon").to_numpy()
+        values = df[[COORDINATE_NAMES["x"], COORDINATE_NAMES["y"]]].to_numpy(np.float64)
+        valid = ~np.isnan(values).any(axis=1)
+        if not len(values):
+            return cls(np.empty((0, 2)), np.zeros(1, dtype=np.int64))
+
+        starts = np.flatnonzero(np.r_[True, polygons[1:] != polygons[:-1]])
+        counts = np.add.reduceat(valid.astype(np.int64), starts)
+        return cls(
+            values[valid],
+            np.r_[0, np.cumsum(counts)],
+            polygons[starts],
+            leading_nan=not valid[0],
+        )
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """coastline DataFrame with polygon and point as indexes (as read_coastline), polygons separated by nan lines
+
+        Returns:
+            pd.DataFrame: coastline DataFrame
+        """
+        counts = np.diff(self.offsets)
+        separators = np.ones(self.n_polygons, dtype=np.int64)
+        if self.n_polygons:
+            separators[0] = self.leading_nan
+        rows = counts + separators
+        starts = np.r_[0, np.cumsum(rows)[:-1]]
+
+        vertex_polygon = np.repeat(np.arange(self.n_polygons), counts)
+        positions = (
+            np.arange(self.n_vertices)
+            - self.offsets[vertex_polygon]
+            + starts[vertex_polygon]
+            + separators[vertex_polygon]
+        )
+        values = np.full((rows.sum(), 2), np.nan)
+        values[positions] = self.coords
+
+        return pd.DataFrame(
+            values,
+            index=pd.MultiIndex.from_arrays(
+                [np.repeat(self.polygon_ids, rows), np.arange(len(values))],
+                names=["polygon", "point"],
+            ),
+            columns=[COORDINATE_NAMES["x"], COORDINATE_NAMES["y"]],
+        )
+
+    @property
+    def n_polygons(self) -> int:
+        return len(self.offsets) - 1
+
+    @property
+    def n_vertices(self) -> int:
+        return len(self.coords)
+
+    @property
+    def nbytes(self) -> int:
+        return self.coords.nbytes + self.offsets.nbytes + self.polygon_ids.nbytes
+
+    @property
+    def bounds(self) -> np.ndarray:
+        """(n_polygons, 4) lon_min, lat_min, lon_max, lat_max of each polygon (nan if empty)"""
+        bounds = np.full((self.n_polygons, 4), np.nan)
+        not_empty = np.diff(self.offsets) > 0
+        starts = self.offsets[:-1][not_empty]
+        if len(starts):
+            bounds[not_empty, :2] = np.minimum.reduceat(self.coords, starts, axis=0)
+            bounds[not_empty, 2:] = np.maximum.reduceat(self.coords, starts, axis=0)
+        return bounds
+
+    def __len__(self) -> int:
+        return self.n_polygons
+
+    def __getitem__(self, i: int) -> np.ndarray:
+        """(n, 2) lon, lat of the i-th polygon (view, no copy)"""
+        if i < 0:
+            i += self.n_polygons
+        if not 0 <= i < self.n_polygons:
+            raise IndexError(f"polygon index {i} out of range")
+        return self.coords[self.offsets[i] : self.offsets[i + 1]]
+
+    def __iter__(self):
+        for i in range(self.n_polygons):
+            yield self[i]
+
+    def to_npz(self, path: str) -> None:
+        """save to an uncompressed npz-file"""
+        np.savez(
+            path,
+            coords=self.coords,
+            offsets=self.offsets,
+            polygon_ids=self.polygon_ids,
+            leading_nan=self.leading_nan,
+        )
+
+    @classmethod
+    def from_npz(cls, path: str):
+        """load from a npz-file created with to_npz"""
+        with np.load(path, allow_pickle=False) as npz:
+            return cls(
+                npz["coords"],
+                npz["offsets"],
+                npz["polygon_ids"],
+                bool(npz["leading_nan"]),
+            )
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(n_polygons={self.n_polygons}, n_vertices={self.n_vertices})"
+
+
+class CoastlineIndex:
+    earth_radius = EARTH_RADIUS
+
+    def __init__(self, coastline, n_bins: int = None, max_pairs: int = 2**22):
+        """spatial index over the coastline segments for point-in-land and distance-to-coast queries
+
+        Args:
+            coastline (RaggedCoastline | pd.DataFrame): coastline polygons (see read_coastline).
+            n_bins (int, optional): number of latitude bins of the segment buckets. Defaults to one bin per 8 segments.
+            max_pairs (int, optional): maximum (point, segment) pairs evaluated at once. Defaults to 2**22.
+        """
+        if isinstance(coastline, pd.DataFrame):
+            coastline = RaggedCoastline.from_dataframe(coastline)
+        self.max_pairs = max_pairs
+
+        # NOTE - closed rings, each vertex is joined to the next one and the last one to the first
+        counts = np.diff(coastline.offsets)
+        vertex_polygon = np.repeat(np.arange(coastline.n_polygons), counts)
+        next_vertex = np.arange(coastline.n_vertices) + 1
+        not_empty = counts > 0
+        next_vertex[coastline.offsets[1:][not_empty] - 1] = coastline.offsets[:-1][
+            not_empty
+        ]
+        start = coastline.coords
+        end = coastline.coords[next_vertex]
+        not_degenerated = np.any(start != end, axis=1)
+        self.start = start[not_degenerated]
+        self.end = end[not_degenerated]
+        self.segment_polygon = vertex_polygon[not_degenerated]
+        if not len(self.start):
+            raise ValueError("coastline without segments")
+
+        self.bounds = np.r_[
+            np.minimum(self.start, self.end).min(axis=0),
+            np.maximum(self.start, self.end).max(axis=0),
+        ]
+        self._build_buckets(n_bins or max(1, len(self.start) // 8))
+        self._build_tree()
+
+    @property
+    def n_segments(self) -> int:
+        return len(self.start)
+
+    def _build_buckets(self, n_bins: int):
+        """latitude bins with the segments whose latitude span overlaps each bin (CSR layout)"""
+        self.n_bins = n_bins
+        self.bin_height = max((self.bounds[3] - self.bounds[1]) / n_bins, 1e-12)
+        y_min = np.minimum(self.start[:, 1], self.end[:, 1])
+        y_max = np.maximum(self.start[:, 1], self.end[:, 1])
+        first_bin = self._bin(y_min)
+        n_segment_bins = self._bin(y_max) - first_bin + 1
+
+        segments = np.repeat(np.arange(self.n_segments), n_segment_bins)
+        bins = np.repeat(first_bin, n_segment_bins) + (
+            np.arange(len(segments))
+            - np.repeat(np.cumsum(n_segment_bins) - n_segment_bins, n_segment_bins)
+        )
+        order = np.argsort(bins, kind="stable")
+        self.bin_segments = segments[order]
+        self.bin_offsets = np.r_[0, np.cumsum(np.bincount(bins, minlength=n_bins))]
+
+    def _bin(self, y: np.ndarray) -> np.ndarray:
+        return np.clip(
+            ((y - self.bounds[1]) / self.bin_height).astype(np.int64),
+            0,
+            self.n_bins - 1,
+        )
+
+    def _build_tree(self):
+        """kd-tree over the midpoints of the projected segments, split so no piece is longer than 4 times the median segment"""
+        self.lat0 = np.deg2rad((self.bounds[1] + self.bounds[3]) / 2)
+        start, end = self._project(self.start), self._project(self.end)
+        length = np.hypot(*(end - start).T)
+        max_length = 4 * np.median(length)
+        n_pieces = np.maximum(np.ceil(length / max_length), 1).astype(np.int64)
+
+        segments = np.repeat(np.arange(self.n_segments), n_pieces)
+        piece = np.arange(len(segments)) - np.repeat(
+            np.cumsum(n_pieces) - n_pieces, n_pieces
+        )
+        direction = (end - start)[segments] / n_pieces[segments, None]
+        self.piece_start = start[segments] + piece[:, None] * direction
+        self.piece_end = self.piece_start + direction
+        self.piece_segment = segments
+        self.half_length = np.hypot(*direction.T).max() / 2
+        self.tree = cKDTree((self.piece_start + self.piece_end) / 2)
+
+    def _project(self, lonlat: np.ndarray) -> np.ndarray:
+        """local equirectangular projection (meters) around the coastline center"""
+        lonlat = np.deg2rad(lonlat)
+        return self.earth_radius * np.column_stack(
+            [lonlat[:, 0] * np.cos(self.lat0), lonlat[:, 1]]
+        )
+
+    def contains(self, lon: np.ndarray, lat: np.ndarray) -> np.ndarray:
+        """points inside coastline polygons (land) by the even-odd rule (nested polygons are holes)
+
+        Args:
+            lon (np.ndarray): longitudes of the points
+            lat (np.ndarray): latitudes of the points
+
+        Returns:
+            np.ndarray: True for points on land, same shape as lon
+        """
+        lon, lat = np.broadcast_arrays(
+            np.asarray(lon, dtype=np.float64), np.asarray(lat, dtype=np.float64)
+        )
+        inside = np.zeros(lon.shape, dtype=bool)
+        candidates = np.flatnonzero(
+            (lon.ravel() >= self.bounds[0])
+            & (lon.ravel() <= self.bounds[2])
+            & (lat.ravel() >= self.bounds[1])
+            & (lat.ravel() <= self.bounds[3])
+        )
+        px, py = lon.ravel()[candidates], lat.ravel()[candidates]
+        bins = self._bin(py)
+        n_pairs = np.diff(self.bin_offsets)[bins]
+
+        crossings = np.zeros(len(candidates), dtype=np.int64)
+        for batch in _batches(n_pairs, self.max_pairs):
+            points = np.repeat(batch, n_pairs[batch])
+            first_pair = np.repeat(
+                np.cumsum(n_pairs[batch]) - n_pairs[batch], n_pairs[batch]
+            )
+            segments = self.bin_segments[
+                self.bin_offsets[bins[points]] + np.arange(len(points)) - first_pair
+            ]
+            x0, y0 = self.start[segments].T
+            x1, y1 = self.end[segments].T
+            straddle = (y0 > py[points]) != (y1 > py[points])
+            with np.errstate(divide="ignore", invalid="ignore"):
+                x_cross = x0 + (py[points] - y0) * (x1 - x0) / (y1 - y0)
+            cross = straddle & (px[points] < x_cross)
+            crossings += np.bincount(points[cross], minlength=len(candidates))
+
+        inside.ravel()[candidates] = crossings % 2 == 1
+        return inside
+
+    def distance(self, lon: np.ndarray, lat: np.ndarray, k: int = 8) -> np.ndarray:
+        """exact distance (meters) from each point to the nearest coastline segment
+
+        Args:
+            lon (np.ndarray): longitudes of the points
+            lat (np.ndarray): latitudes of the points
+            k (int, optional): nearest segment pieces checked first, increased for the points not resolved. Defaults to 8.
+
+        Returns:
+            np.ndarray: distances in meters (local equirectangular projection), same shape as lon
+        """
+        lon, lat = np.broadcast_arrays(
+            np.asarray(lon, dtype=np.float64), np.asarray(lat, dtype=np.float64)
+        )
+        points = self._project(np.column_stack([lon.ravel(), lat.ravel()]))
+        distances = np.full(len(points), np.inf)
+        unsure = np.arange(len(points))
+        n_pieces = len(self.piece_segment)
+        while len(unsure):
+            k = min(k, n_pieces)
+            still_unsure = []
+            for batch in np.array_split(unsure, -(-len(unsure) * k // self.max_pairs)):
+                piece_distances, pieces = self.tree.query(points[batch], k=k)
+                pieces = pieces.reshape(len(batch), k)
+                distances[batch] = _segment_distance(
+                    points[batch, None, :],
+                    self.piece_start[pieces],
+                    self.piece_end[pieces],
+                ).min(axis=1)
+                # NOTE - pieces not checked are farther than the k-th midpoint minus half a piece
+                last_distance = piece_distances.reshape(len(batch), k)[:, -1]
+                still_unsure.append(
+                    batch[last_distance - self.half_length < distances[batch]]
+                )
+            if k == n_pieces:
+                break
+            unsure = np.concatenate(still_unsure)
+            k *= 4
+
+        return distances.reshape(lon.shape)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(n_segments={self.n_segments}, n_bins={self.n_bins})"
+
+
+def _batches(sizes: np.ndarray, max_size: int) -> list[np.ndarray]:
+    """split positions in consecutive batches whose total size does not exceed max_size (unless single)"""
+    if not len(sizes):
+        return []
+    batch_ids = np.cumsum(sizes) // max(max_size, 1)
+    boundaries = np.flatnonzero(np.diff(batch_ids)) + 1
+    return np.split(np.arange(len(sizes)), boundaries)
+
+
 class Currents:
     def __init__(self, lst_path: str, dt_cte: float = 1.0):
         """centralize currents data and properties
@@ -75,24 +435,13 @@ class Currents:
         self.varnames = VARIABLE_NAMES[self.forcing_type]
         self.path = str(Path(lst_path).resolve())
 
-        if len(pd.read_csv(self.path, delimiter="\s+").columns) != 1:
-            df = read_cte_forcing(self.path, self.forcing_type, dt_cte)
-            self.dx = None
-            self.dy = None
-            self.dt = dt_cte
-            self.nx = 1
-            self.ny = 1
-            self.nt = len(df)
-
-        else:
-            df = read_2d_forcing(self.path, self.forcing_type)
-
-            self.dt = _calculate_dt(df)
-            self.dx = _calculate_dx(df)
-            self.dy = _calculate_dy(df)
-            self.nt = _calculate_nt(df)
-            self.nx = _calculate_nx(df)
-            self.ny = _calculate_ny(df)
+        metadata = read_forcing_metadata(self.path, self.forcing_type, dt_cte)
+        self.dt = metadata["dt"]
+        self.dx = metadata["dx"]
+        self.dy = metadata["dy"]
+        self.nt = metadata["nt"]
+        self.nx = metadata["nx"]
+        self.ny = metadata["ny"]
 
     @property
     def load(self):
@@ -117,24 +466,13 @@ class Winds:
         self.varnames = VARIABLE_NAMES[self.forcing_type]
         self.path = str(Path(lst_path).resolve())
 
-        if len(pd.read_csv(self.path, delimiter="\s+").columns) != 1:
-            df = read_cte_forcing(self.path, self.forcing_type, dt_cte)
-            self.dx = None
-            self.dy = None
-            self.dt = dt_cte
-            self.nx = 1
-            self.ny = 1
-            self.nt = len(df)
-
-        else:
-            df = read_2d_forcing(self.path, self.forcing_type)
-
-            self.dt = _calculate_dt(df)
-            self.dx = _calculate_dx(df)
-            self.dy = _calculate_dy(df)
-            self.nt = _calculate_nt(df)
-            self.nx = _calculate_nx(df)
-            self.ny = _calculate_ny(df)
+        metadata = read_forcing_metadata(self.path, self.forcing_type, dt_cte)
+        self.dt = metadata["dt"]
+        self.dx = metadata["dx"]
+        self.dy = metadata["dy"]
+        self.nt = metadata["nt"]
+        self.nx = metadata["nx"]
+        self.ny = metadata["ny"]
 
     @property
     def load(self):
@@ -159,23 +497,13 @@ class Waves:
         self.varnames = VARIABLE_NAMES[self.forcing_type]
         self.path = str(Path(lst_path).resolve())
 
-        if len(pd.read_csv(self.path, delimiter="\s+").columns) != 1:
-            df = read_cte_forcing(self.path, self.forcing_type, dt_cte)
-            self.dx = None
-            self.dy = None
-            self.dt = dt_cte
-            self.nx = 1
-            self.ny = 1
-            self.nt = len(df)
-        else:
-            df = read_2d_forcing(self.path, self.forcing_type)
-
-            self.dt = _calculate_dt(df)
-            self.dx = _calculate_dx(df)
-            self.dy = _calculate_dy(df)
-            self.nt = _calculate_nt(df)
-            self.nx = _calculate_nx(df)
-            self.ny = _calculate_ny(df)
+        metadata = read_forcing_metadata(self.path, self.forcing_type, dt_cte)
+        self.dt = metadata["dt"]
+        self.dx = metadata["dx"]
+        self.dy = metadata["dy"]
+        self.nt = metadata["nt"]
+        self.nx = metadata["nx"]
+        self.ny = metadata["ny"]
 
     @property
     def load(self):
@@ -206,22 +534,9 @@ def _calculate_dy(df: pd.DataFrame, coordname: str = COORDINATE_NAMES["y"]):
         return dy[0]
 
 
-def _calculate_dt(df: pd.DataFrame, coordname: str = COORDINATE_NAMES["t"]):
-    dt = np.unique(np.diff(df[coordname].unique()))
-    if len(dt) == 1:
-        return dt[0]
-    else:
-        print("WARNING: dt is not constant!")
-        return dt[0]
-
-
 def _calculate_nx(df: pd.DataFrame, coordname: str = COORDINATE_NAMES["x"]):
     return len(df[coordname].unique())
 
 
 def _calculate_ny(df: pd.DataFrame, coordname: str = COORDINATE_NAMES["y"]):
     return len(df[coordname].unique())
-
-
-def _calculate_nt(df: pd.DataFrame, coordname: str = COORDINATE_NAMES["t"]):
-    return len(df[coordname].unique())
@@ -0,0 +1,191 @@
+"""Local content-addressed cache of remote (OPeNDAP) dataset subsets.
+Each request (url, variables and bbox) gets its own folder with one NetCDF-file per
+downloaded time range, so overlapping requests only download the missing times.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import xarray as xr
+
+TIME_FORMAT = "%Y%m%dT%H%M%S"
+
+
+class DatasetCache:
+    def __init__(self, cache_dir: str, max_size: int = None):
+        """on-disk cache of dataset subsets with LRU eviction by size
+
+        Args:
+            cache_dir (str): path to the cache folder.
+            max_size (int, optional): maximum size of the cache in bytes, least recently used files are evicted first. Defaults to None (unlimited).
+        """
+        self.path = Path(cache_dir)
+        self.max_size = max_size
+        if not self.path.exists():
+            self.path.mkdir(parents=True)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(path={self.path}, max_size={self.max_size})"
+
+    @property
+    def size(self) -> int:
+        """total size of the cached files in bytes"""
+        return sum(file.stat().st_size for file in self.path.glob("*/*.nc"))
+
+    def key(
+        self, url: str, variables: list[str], bbox: tuple[float, float, float, float]
+    ) -> str:
+        """content address of a request (url, variables and bbox)"""
+        content = json.dumps(
+            {
+                "url": url,
+                "variables": sorted(variables),
+                "bbox": [float(v) for v in bbox],
+            },
+            sort_keys=True,
+        )
+        return hashlib.sha1(content.encode()).hexdigest()
+
+    def get(
+        self,
+        url: str,
+        variables: list[str],
+        bbox: tuple[float, float, float, float],
+        timebox: tuple[datetime, datetime],
+        fetch: callable,
+    ) -> xr.Dataset:
+        """get a subset from the cache, downloading only the time ranges not cached yet
+
+        Args:
+            url (str): dataset url.
+            variables (list[str]): selected variables.
+            bbox (tuple[float, float, float, float]): lon_min, lat_min, lon_max, lat_max.
+            timebox (tuple[datetime, datetime]): initial_time, end_time.
+            fetch (callable): function fetch(timebox) returning the subset (variables and bbox) for a time range.
+
+        Returns:
+            xr.Dataset: loaded subset between initial_time and end_time
+        """
+        key_path = Path(self.path, self.key(url, variables, bbox))
+        if not key_path.exists():
+            key_path.mkdir(parents=True)
+        timebox = (pd.Timestamp(timebox[0]), pd.Timestamp(timebox[1]))
+
+        cached = _cached_intervals(key_path)
+        missing = _missing_intervals(timebox, list(cached.values()))
+        if missing:
+            print(f"Cache miss for {len(missing)} time range(s) @ {key_path.name}")
+        empty = None
+        for interval in missing:
+            ds = fetch(tuple(t.to_pydatetime() for t in interval)).load()
+            print(f"Loaded {ds.nbytes / 2**20:.2f} MB (in-memory) from {url}")
+            if not ds.sizes.get("time", 0):
+                empty = ds
+                continue
+            # NOTE - recorded by the times received (NRT/forecast products may end before the request)
+            interval = (
+                pd.Timestamp(ds["time"].values.min()),
+                pd.Timestamp(ds["time"].values.max()),
+            )
+            file = Path(key_path, _interval_filename(interval))
+            tmp_file = file.with_name(f".{file.name}.tmp")
+            ds.to_netcdf(tmp_file)
+            tmp_file.replace(file)
+            cached[file] = interval
+
+        used = [
+            file
+            for file, (t0, t1) in cached.items()
+            if t0 <= timebox[1] and t1 >= timebox[0]
+        ]
+        datasets = []
+        for file in used:
+            with xr.open_dataset(file) as ds:
+                datasets.append(ds.load())
+            os.utime(file)
+        self.evict(keep=used)
+        if not datasets:
+            return empty
+
+        ds = xr.concat(datasets, dim="time") if len(datasets) > 1 else datasets[0]
+        _, index = np.unique(ds["time"].values, return_index=True)
+        return ds.isel(time=index).sel(time=slice(timebox[0], timebox[1]))
+
+    def evict(self, keep: list = None) -> int:
+        """remove least recently used files until the cache fits max_size
+
+        Args:
+            keep (list, optional): files that must not be removed. Defaults to None.
+
+        Returns:
+            int: bytes removed
+        """
+        if self.max_size is None:
+            return 0
+        keep = [Path(file) for file in keep or []]
+        files = sorted(self.path.glob("*/*.nc"), key=lambda file: file.stat().st_mtime)
+        size = sum(file.stat().st_size for file in files)
+
+        removed = 0
+        for file in files:
+            if size - removed <= self.max_size:
+                break
+            if file in keep:
+                continue
+            removed += file.stat().st_size
+            file.unlink()
+            if not any(file.parent.iterdir()):
+                file.parent.rmdir()
+        return removed
+
+    def clear(self) -> None:
+        """remove every cached file"""
+        for file in self.path.glob("*/*.nc"):
+            file.unlink()
+        for folder in self.path.iterdir():
+            if folder.is_dir() and not any(folder.iterdir()):
+                folder.rmdir()
+
+
+def _interval_filename(interval: tuple[pd.Timestamp, pd.Timestamp]) -> str:
+    return f"{interval[0]:{TIME_FORMAT}}_{interval[1]:{TIME_FORMAT}}.nc"
+
+
+def _cached_intervals(key_path: Path) -> dict:
+    """time range covered by each cached file of a request (from the file names)"""
+    intervals = {}
+    for file in key_path.glob("*.nc"):
+        t0, t1 = file.stem.split("_")
+        intervals[file] = (
+            pd.Timestamp(datetime.strptime(t0, TIME_FORMAT)),
+            pd.Timestamp(datetime.strptime(t1, TIME_FORMAT)),
+        )
+    return intervals
+
+
+def _missing_intervals(timebox: tuple, intervals: list[tuple]) -> list[tuple]:
+    """parts of the timebox not covered by the intervals (limits included)"""
+    t0, t1 = timebox
+    if any(start <= t0 and end >= t1 for start, end in intervals):
+        return []
+
+    missing = []
+    cursor = t0
+    for start, end in sorted(intervals):
+        if end < cursor:
+            continue
+        if start > t1:
+            break
+        if start > cursor:
+            missing.append((cursor, start))
+        cursor = max(cursor, end)
+    if cursor < t1 or (not missing and cursor == t0):
+        missing.append((cursor, t1))
+    return missing
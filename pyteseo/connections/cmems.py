@@ -1,4 +1,9 @@
+from __future__ import annotations
+
+import hashlib
 from datetime import datetime, timedelta
+from functools import partial
+from threading import Lock
 
 import numpy as np
 import pandas as pd
@@ -7,13 +12,25 @@ from pydap.cas.get_cookies import setup_session
 from pydap.client import open_url
 from requests.sessions import Session
 
+from pyteseo.connections.cache import DatasetCache
+from pyteseo.connections.download import fetch_in_chunks
+
+_SESSIONS = {}
+_SESSIONS_LOCK = Lock()
+
 
 def access_global_currents(
     username: str,
     password: str,
     bbox: tuple[float, float, float, float],
     timebox: tuple[datetime, datetime],
-) -> pd.DataFrame:
+    as_dataset: bool = False,
+    cache: DatasetCache = None,
+    chunk: timedelta = None,
+    n_workers: int = 4,
+    retries: int = 2,
+    cmems: Cmems = None,
+) -> pd.DataFrame | xr.Dataset:
     """access to CMEMS GLOBAL and get total currents (circulation + tide + stokes drift)
 
     Args:
@@ -21,26 +38,43 @@ def access_global_currents(
         password (str): CMEMS password for login
         bbox (tuple[float, float, float, float]): lon_min, lat_min, lon_max, lat_max
         timebox (tuple[datetime, datetime]): initial_time, end_time
+        as_dataset (bool, optional): return the xr.Dataset instead of a DataFrame (see write_2d_forcing_from_dataset). Defaults to False.
+        cache (DatasetCache, optional): local cache of downloaded subsets. Defaults to None.
+        chunk (timedelta, optional): download the timebox by chunks of this length (see fetch_in_chunks). Defaults to None (single request).
+        n_workers (int, optional): maximum number of concurrent chunk downloads. Defaults to 4.
+        retries (int, optional): number of times a failed chunk is requested again. Defaults to 2.
+        cmems (Cmems, optional): authenticated session to reuse, otherwise taken from cmems_login. Defaults to None.
 
     Returns:
-        pd.DataFrame: resulting dataframe with currents data (time, lon, lat, u, v)
+        pd.DataFrame | xr.Dataset: resulting dataframe with currents data (time, lon, lat, u, v)
     """
     opendap_url = (
         "https://nrt.cmems-du.eu/thredds/dodsC/cmems_mod_glo_phy_anfc_merged-uv_PT1H-i"
     )
     varnames = ["utotal", "vtotal"]
 
-    cmems = Cmems(username, password)
-    ds = cmems.opendap_access(opendap_url)
-    ds = ds.squeeze(drop=True)
-    ds = ds.get(varnames)
-    ds = coords_standarization(ds, "time", "longitude", "latitude")
-    ds = spatial_subset(ds, bbox)
-    ds = temporal_subset(ds, timebox, buffer=timedelta(hours=1))
+    fetch = partial(
+        _fetch_subset,
+        username=username,
+        password=password,
+        opendap_url=opendap_url,
+        varnames=varnames,
+        bbox=bbox,
+        cmems=cmems,
+        squeeze=True,
+        coordnames=("time", "longitude", "latitude"),
+    )
+    if chunk is not None:
+        fetch = partial(
+            fetch_in_chunks, fetch, chunk=chunk, n_workers=n_workers, retries=retries
+        )
+    ds = _get_subset(fetch, opendap_url, varnames, bbox, timebox, cache)
     ds = ds.rename(
         {varname: new_varname for varname, new_varname in zip(varnames, ["u", "v"])}
     )
-    ds = ds.resample(time="1H").interpolate("linear")
+    ds = ds.resample(time="1h").interpolate("linear")
+    if as_dataset:
+        return ds
     df = ds.to_dataframe().reset_index()
     df["time"] = (df["time"] - df["time"][0]).dt.total_seconds() / 3600
 
@@ -52,7 +86,13 @@ def access_global_winds(
     password: str,
     bbox: tuple[float, float, float, float],
     timebox: tuple[datetime, datetime],
-) -> pd.DataFrame:
+    as_dataset: bool = False,
+    cache: DatasetCache = None,
+    chunk: timedelta = None,
+    n_workers: int = 4,
+    retries: int = 2,
+    cmems: Cmems = None,
+) -> pd.DataFrame | xr.Dataset:
     """access to CMEMS GLOBAL L4-SATELLITE winds
 
     Args:
@@ -60,35 +100,144 @@ def access_global_winds(
         password (str): CMEMS password for login
         bbox (tuple[float, float, float, float]): lon_min, lat_min, lon_max, lat_max
         timebox (tuple[datetime, datetime]): initial_time, end_time
+        as_dataset (bool, optional): return the xr.Dataset instead of a DataFrame (see write_2d_forcing_from_dataset). Defaults to False.
+        cache (DatasetCache, optional): local cache of downloaded subsets. Defaults to None.
+        chunk (timedelta, optional): download the timebox by chunks of this length (see fetch_in_chunks). Defaults to None (single request).
+        n_workers (int, optional): maximum number of concurrent chunk downloads. Defaults to 4.
+        retries (int, optional): number of times a failed chunk is requested again. Defaults to 2.
+        cmems (Cmems, optional): authenticated session to reuse, otherwise taken from cmems_login. Defaults to None.
 
     Returns:
-        xr.Dataset: resulting dataframe with winds data (time, lon, lat, u, v)
+        pd.DataFrame | xr.Dataset: resulting dataframe with winds data (time, lon, lat, u, v)
     """
     opendap_url = "https://nrt.cmems-du.eu/thredds/dodsC/cmems_obs-wind_glo_phy_nrt_l4_0.125deg_PT1H"
     varnames = ["eastward_wind", "northward_wind"]
 
-    cmems = Cmems(username, password)
-    ds = cmems.opendap_access(opendap_url)
-    ds = ds.get(varnames)
-    ds = spatial_subset(ds, bbox)
-    ds = temporal_subset(ds, timebox, buffer=timedelta(hours=1))
+    fetch = partial(
+        _fetch_subset,
+        username=username,
+        password=password,
+        opendap_url=opendap_url,
+        varnames=varnames,
+        bbox=bbox,
+        cmems=cmems,
+    )
+    if chunk is not None:
+        fetch = partial(
+            fetch_in_chunks, fetch, chunk=chunk, n_workers=n_workers, retries=retries
+        )
+    ds = _get_subset(fetch, opendap_url, varnames, bbox, timebox, cache)
     ds = ds.rename(
         {varname: new_varname for varname, new_varname in zip(varnames, ["u", "v"])}
     )
+    if as_dataset:
+        return ds
     df = ds.to_dataframe().reset_index()
     df["time"] = (df["time"] - df["time"][0]).dt.total_seconds() / 3600
 
     return df
 
 
+def _get_subset(
+    fetch: callable,
+    opendap_url: str,
+    varnames: list[str],
+    bbox: tuple[float, float, float, float],
+    timebox: tuple[datetime, datetime],
+    cache: DatasetCache = None,
+) -> xr.Dataset:
+    """load the subset (1 hour buffer around the timebox) through the cache if provided"""
+    timebox = (timebox[0] - timedelta(hours=1), timebox[1] + timedelta(hours=1))
+    if cache is None:
+        ds = fetch(timebox).load()
+        print(f"Loaded {ds.nbytes / 2**20:.2f} MB (in-memory) from {opendap_url}")
+        return ds
+    return cache.get(opendap_url, varnames, bbox, timebox, fetch)
+
+
+def _fetch_subset(
+    timebox: tuple[datetime, datetime],
+    username: str,
+    password: str,
+    opendap_url: str,
+    varnames: list[str],
+    bbox: tuple[float, float, float, float],
+    squeeze: bool = False,
+    coordnames: tuple[str, str, str] = None,
+    cmems: Cmems = None,
+) -> xr.Dataset:
+    """open a CMEMS dataset and select variables, bbox and timebox
+
+    Args:
+        timebox (tuple[datetime, datetime]): initial_time, end_time
+        username (str): CMEMS username for login
+        password (str): CMEMS password for login
+        opendap_url (str): dataset url
+        varnames (list[str]): variables to select
+        bbox (tuple[float, float, float, float]): lon_min, lat_min, lon_max, lat_max
+        squeeze (bool, optional): drop dimensions of length 1 (i.e. depth). Defaults to False.
+        coordnames (tuple[str, str, str], optional): dataset's names for t, x and y coordinates to be standarized. Defaults to None.
+        cmems (Cmems, optional): authenticated session to reuse. Defaults to None.
+
+    Returns:
+        xr.Dataset: lazy subset, nothing is transferred until it is loaded
+    """
+    cmems = cmems or cmems_login(username, password)
+    ds = cmems.opendap_access(opendap_url)
+    ds = ds.get(varnames)
+    if squeeze:
+        ds = ds.squeeze(drop=True)
+    if coordnames:
+        ds = coords_standarization(ds, *coordnames)
+    ds = spatial_subset(ds, bbox)
+    return temporal_subset(ds, timebox)
+
+
+def cmems_login(
+    username: str, password: str, max_age: timedelta = timedelta(hours=8)
+) -> Cmems:
+    """authenticated CMEMS session, reused across calls until it expires
+
+    Args:
+        username (str): CMEMS username for login
+        password (str): CMEMS password for login
+        max_age (timedelta, optional): maximum age of a session before login again. Defaults to timedelta(hours=8).
+
+    Returns:
+        Cmems: authenticated session
+    """
+    key = (username, hashlib.sha256(password.encode()).hexdigest())
+    with _SESSIONS_LOCK:
+        cmems = _SESSIONS.get(key)
+        if cmems is None or cmems.expired:
+            cmems = Cmems(username, password, max_age)
+            _SESSIONS[key] = cmems
+    return cmems
+
+
 class Cmems:
     cas_url = "https://cmems-cas.cls.fr/cas/login"
 
-    def __init__(self, username: str, password: str) -> Session:
+    def __init__(
+        self, username: str, password: str, max_age: timedelta = timedelta(hours=8)
+    ) -> Session:
         self.session = setup_session(self.cas_url, username, password)
         self.session.cookies.set("CASTGC", self.session.cookies.get_dict()["CASTGC"])
+        self.username = username
+        self.login_time = datetime.utcnow()
+        self.max_age = max_age
         print(f"\033[1;32m {username=} login successful! \U0001F642 \033[0;0m\n")
 
+    @property
+    def expired(self) -> bool:
+        """True if the session is older than max_age or its CAS ticket cookie expired"""
+        if datetime.utcnow() - self.login_time > self.max_age:
+            return True
+        return any(
+            cookie.name == "CASTGC" and cookie.is_expired()
+            for cookie in self.session.cookies
+        )
+
     def opendap_access(self, opendap_url) -> xr.Dataset:
         data_store = xr.backends.PydapDataStore(
             open_url(url=opendap_url, session=self.session)
@@ -145,10 +294,7 @@ def spatial_subset(
         xr.Dataset: subset dataset
     """
     if buffer:
-        dx = max(np.unique(ds["lon"].diff("lon").values))
-        dy = max(np.unique(ds["lat"].diff("lat").values))
-
-        buffer_value = max([dx, dy])
+        buffer_value = max(_coordinate_step(ds, "lon"), _coordinate_step(ds, "lat"))
         return ds.sel(
             lon=slice(bbox[0] - buffer_value, bbox[2] + buffer_value),
             lat=slice(bbox[1] - buffer_value, bbox[3] + buffer_value),
@@ -160,6 +306,13 @@ def spatial_subset(
         )
 
 
+def _coordinate_step(ds: xr.Dataset, name: str) -> float:
+    """step of a regular coordinate from its first two values (no full scan)"""
+    if ds[name].size < 2:
+        return 0.0
+    return abs(float(ds[name][1] - ds[name][0]))
+
+
 def temporal_subset(
     ds: xr.Dataset, timebox: tuple[datetime, datetime], buffer: timedelta = None
 ) -> xr.Dataset:
@@ -0,0 +1,96 @@
+"""Chunked and concurrent retrieval of remote (OPeNDAP) dataset subsets.
+The timebox is split in chunks that are downloaded on a bounded thread pool, retried
+on failure and merged along time.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from functools import partial
+from time import sleep
+
+import numpy as np
+import pandas as pd
+import xarray as xr
+
+from pyteseo.io.utils import _parallel_map
+
+
+def split_timebox(
+    timebox: tuple[datetime, datetime], chunk: timedelta
+) -> list[tuple[datetime, datetime]]:
+    """split a timebox in consecutive chunks (limits are shared by neighbour chunks)
+
+    Args:
+        timebox (tuple[datetime, datetime]): initial_time, end_time
+        chunk (timedelta): length of each chunk
+
+    Returns:
+        list[tuple[datetime, datetime]]: timebox of each chunk
+    """
+    if chunk <= timedelta(0):
+        raise ValueError(f"chunk should be a positive timedelta, got {chunk}")
+
+    t0, t1 = pd.Timestamp(timebox[0]), pd.Timestamp(timebox[1])
+    starts = pd.date_range(t0, t1, freq=pd.Timedelta(chunk))
+    if len(starts) > 1 and starts[-1] == t1:
+        starts = starts[:-1]
+    ends = list(starts[1:]) + [t1]
+    return [
+        (start.to_pydatetime(), end.to_pydatetime()) for start, end in zip(starts, ends)
+    ]
+
+
+def fetch_in_chunks(
+    fetch: callable,
+    timebox: tuple[datetime, datetime],
+    chunk: timedelta = timedelta(days=1),
+    n_workers: int = 4,
+    retries: int = 2,
+    retry_wait: float = 1.0,
+) -> xr.Dataset:
+    """download a subset by time chunks on a bounded thread pool and merge them
+
+    Args:
+        fetch (callable): function fetch(timebox) returning the (lazy) subset for a time range.
+        timebox (tuple[datetime, datetime]): initial_time, end_time
+        chunk (timedelta, optional): length of each chunk. Defaults to timedelta(days=1).
+        n_workers (int, optional): maximum number of concurrent downloads. Defaults to 4.
+        retries (int, optional): number of times a failed chunk is requested again. Defaults to 2.
+        retry_wait (float, optional): seconds to wait before the first retry, doubled on each retry. Defaults to 1.0.
+
+    Returns:
+        xr.Dataset: loaded subset sorted by time without duplicated times
+    """
+    timeboxes = split_timebox(timebox, chunk)
+    print(f"Downloading {len(timeboxes)} chunk(s) with {n_workers=}")
+    datasets = _parallel_map(
+        partial(_fetch_chunk, fetch=fetch, retries=retries, retry_wait=retry_wait),
+        timeboxes,
+        n_workers,
+        "thread",
+    )
+
+    ds = xr.concat(datasets, dim="time") if len(datasets) > 1 else datasets[0]
+    _, index = np.unique(ds["time"].values, return_index=True)
+    return ds.isel(time=index)
+
+
+def _fetch_chunk(
+    timebox: tuple[datetime, datetime],
+    fetch: callable,
+    retries: int = 2,
+    retry_wait: float = 1.0,
+) -> xr.Dataset:
+    """fetch and load one chunk, retrying on failure"""
+    for attempt in range(retries + 1):
+        try:
+            return fetch(timebox).load()
+        except Exception as err:
+            if attempt == retries:
+                raise
+            print(
+                f"WARNING: chunk {timebox[0].isoformat()} - {timebox[1].isoformat()} "
+                f"failed ({err!r}), retrying in {retry_wait * 2**attempt:.1f} s"
+            )
+            sleep(retry_wait * 2**attempt)
@@ -1,27 +1,72 @@
 import xarray as xr
-import numpy as np
 from datetime import datetime, timedelta
+from functools import partial
+
+from pyteseo.connections.download import fetch_in_chunks
 
 
 def access_forecast_global_winds(
-    date: datetime, bbox: tuple[float, float, float, float]
+    date: datetime,
+    bbox: tuple[float, float, float, float],
+    chunk: timedelta = None,
+    n_workers: int = 4,
+    retries: int = 2,
 ):
+    """access to NOAA GFS 0.25º hourly forecast winds (ugrd10m, vgrd10m)
+
+    Args:
+        date (datetime): initial time of the forecast
+        bbox (tuple[float, float, float, float]): lon_min, lat_min, lon_max, lat_max
+        chunk (timedelta, optional): download by time chunks of this length, each chunk on its own pydap connection (see fetch_in_chunks). Defaults to None (single request).
+        n_workers (int, optional): maximum number of concurrent chunk downloads. Defaults to 4.
+        retries (int, optional): number of times a failed chunk is requested again. Defaults to 2.
 
+    Returns:
+        xr.Dataset: winds dataset
+    """
     variables = ["ugrd10m", "vgrd10m"]
     ds = opendap_access_gfs_0p25_hourly(date)
     ds = ds.get(variables)
     ds = spatial_subset(ds, bbox)
-    ds = ds.load()
-    print("Load ok!")
+    subset = temporal_subset(ds, date)
+    if chunk is None:
+        ds = subset.load()
+    else:
+        # NOTE - the netCDF4 backend serializes every remote read behind a global lock
+        fetch = partial(
+            _fetch_chunk,
+            opendap_url=ds.encoding["source"],
+            variables=variables,
+            bbox=bbox,
+        )
+        ds = fetch_in_chunks(
+            fetch,
+            (subset.time[0].values, subset.time[-1].values),
+            chunk=chunk,
+            n_workers=n_workers,
+            retries=retries,
+        )
+    print(f"Loaded {ds.nbytes / 2**20:.2f} MB (in-memory)")
 
     ds = reorder_0_360_to_m180_180(ds)
-    ds = ds.resample(time="1H").interpolate("nearest")
+    ds = ds.resample(time="1h").interpolate("nearest")
     print("Resample ok!")
-    ds = temporal_subset(ds, date)
 
     return ds
 
 
+def _fetch_chunk(
+    timebox: tuple[datetime, datetime],
+    opendap_url: str,
+    variables: list[str],
+    bbox: tuple[float, float, float, float],
+) -> xr.Dataset:
+    """open the dataset with its own pydap connection and subset one time chunk (lazy)"""
+    ds = xr.open_dataset(opendap_url, engine="pydap")
+    ds = spatial_subset(ds.get(variables), bbox)
+    return ds.sel(time=slice(*timebox))
+
+
 def reorder_0_360_to_m180_180(ds):
     attrs = ds.lon.attrs
     attrs["minimum"] = -180
@@ -50,14 +95,16 @@ def spatial_subset(
     Returns:
         xr.Dataset: subset dataset
     """
+    bbox = list(bbox)
     if bbox[0] < 0:
         bbox[0] = bbox[0] + 360
     if bbox[2] < 0:
         bbox[2] = bbox[2] + 360
 
     if buffer:
-        dx = max(np.unique(ds["lon"].diff("lon").values))
-        dy = max(np.unique(ds["lat"].diff("lat").values))
+        # NOTE - regular grid, the step comes from the first two coordinate values
+        dx = abs(float(ds["lon"][1] - ds["lon"][0]))
+        dy = abs(float(ds["lat"][1] - ds["lat"][0]))
 
         buffer_value = max([dx, dy])
         return ds.sel(
@@ -95,6 +142,7 @@ def opendap_access_gfs_0p25_hourly(date):
 
         try:
             ds = xr.open_dataset(opendap_url)
+            ds.encoding["source"] = opendap_url
             access = True
             print("\033[1;32m access successful! \U0001F642 \033[0;0m\n")
         except OSError as err:
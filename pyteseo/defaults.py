@@ -2,7 +2,12 @@ from datetime import timedelta
 
 import numpy as np
 
-DIRECTORY_NAMES = {"input": "input", "output": "output"}
+DIRECTORY_NAMES = {
+    "input": "input",
+    "output": "output",
+    "cache": ".pyteseo_cache",
+    "ensemble_member": "member_*",
+}
 
 FILE_NAMES = {
     "grid": "grid.dat",
@@ -41,6 +46,8 @@ VARIABLE_NAMES = {
 
 COORDINATE_NAMES = {"x": "lon", "y": "lat", "z": "depth", "t": "time"}
 
+EARTH_RADIUS = 6371008.8
+
 RESULTS_MAP = {
     "time (h)": "time",
     "longitude (º)": "lon",
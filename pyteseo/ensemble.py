@@ -0,0 +1,276 @@
+from __future__ import annotations
+
+import os
+import subprocess
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from time import monotonic
+
+import pandas as pd
+
+from pyteseo.defaults import DIRECTORY_NAMES
+from pyteseo.io.utils import _file_checksum, _share_file
+from pyteseo.wrapper import TeseoWrapper
+
+# NOTE - checksums of the canonical files, computed once per worker process
+_SOURCE_CHECKSUMS = {}
+
+
+class TeseoEnsemble:
+    def __init__(
+        self,
+        dir_path: str,
+        input_dir: str,
+        teseo_binary_path: str,
+        simulation_keyword: str = "teseo",
+        mode: str = "copy",
+    ):
+        """configure and run many TESEO simulations (members) sharing the same inputs
+
+        Args:
+            dir_path (str): path to the ensemble folder, one folder per member is created inside.
+            input_dir (str): path to the 'input' directory (grid, coastline and forcings) used by all the members.
+            teseo_binary_path (str): path to TESEO's binary.
+            simulation_keyword (str, optional): keyword to name simulation files. Defaults to "teseo".
+            mode (str, optional): how inputs and binary reach each member, "copy", "hardlink" or "symlink". Defaults to "copy".
+        """
+        if mode not in ["copy", "hardlink", "symlink"]:
+            raise ValueError(
+                f"Invalid mode: {mode}. Allowed ['copy', 'hardlink', 'symlink']"
+            )
+        self.path = str(Path(dir_path).resolve())
+        self.input_dir = str(Path(input_dir).resolve())
+        self.teseo_binary_path = str(Path(teseo_binary_path).resolve())
+        self.simulation_keyword = simulation_keyword
+        self.mode = mode
+        self.report = None
+        self.savings = None
+
+        if not Path(self.input_dir).exists():
+            raise FileNotFoundError(self.input_dir)
+        if not Path(self.teseo_binary_path).exists():
+            raise FileNotFoundError(self.teseo_binary_path)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(path={self.path})"
+
+    def member_path(self, member_id: int) -> str:
+        """path to the simulation folder of a member"""
+        return str(
+            Path(
+                self.path,
+                DIRECTORY_NAMES["ensemble_member"].replace("*", f"{member_id:03d}"),
+            )
+        )
+
+    def run(
+        self,
+        user_parameters_list: list[dict[str, any]],
+        max_workers: int = None,
+        retries: int = 0,
+    ) -> pd.DataFrame:
+        """set up and run every member on a bounded process pool
+
+        Args:
+            user_parameters_list (list[dict[str, any]]): user parameters of each member (see TeseoWrapper.setup).
+            max_workers (int, optional): maximum number of members running at the same time. Defaults to os.cpu_count().
+            retries (int, optional): number of times a failed simulation is executed again. Defaults to 0.
+
+        Returns:
+            pd.DataFrame: report per member (member_id, path, status, attempts, input_time, bytes_saved, bytes_copied, copy_time, files_hashed, setup_time, run_time, error)
+        """
+        max_workers = max_workers or os.cpu_count()
+        signatures = self._signatures()
+        members = [
+            {
+                "member_id": member_id,
+                "path": self.member_path(member_id),
+                "input_dir": self.input_dir,
+                "teseo_binary_path": self.teseo_binary_path,
+                "simulation_keyword": self.simulation_keyword,
+                "user_parameters": user_parameters,
+                "retries": retries,
+                "mode": self.mode,
+            }
+            for member_id, user_parameters in enumerate(user_parameters_list)
+        ]
+
+        results = []
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(_run_member, member) for member in members]
+            for future in as_completed(futures):
+                result = future.result()
+                print(
+                    f"[member_{result['member_id']:03d}] {result['status']} "
+                    f"(attempts={result['attempts']}, run_time={result['run_time']:.1f} s)"
+                )
+                results.append(result)
+
+        self.report = (
+            pd.DataFrame(results).sort_values("member_id").reset_index(drop=True)
+        )
+
+        if self._signatures() != signatures:
+            print("WARNING: shared inputs were modified during the ensemble run!")
+        self.savings = {
+            "bytes_saved": int(self.report["bytes_saved"].sum()),
+            "input_time_spent": float(self.report["input_time"].sum()),
+            "input_time_saved": self._input_time_saved(),
+        }
+        print(
+            f"Inputs shared by {self.mode}: {self.savings['bytes_saved'] / 2**20:.1f} MB "
+            f"saved in disk, {self.savings['input_time_spent']:.2f} s spent preparing inputs "
+            f"(~{self.savings['input_time_saved']:.2f} s saved against copies)"
+        )
+        return self.report
+
+    def _canonical_paths(self) -> list[Path]:
+        paths = [file for file in Path(self.input_dir).iterdir() if file.is_file()]
+        paths.append(Path(self.teseo_binary_path))
+        return paths
+
+    def _signatures(self) -> dict:
+        """size and modification time of the canonical inputs and binary"""
+        signatures = {}
+        for path in self._canonical_paths():
+            stat = path.stat()
+            signatures[str(path)] = (stat.st_size, stat.st_mtime_ns)
+        return signatures
+
+    def _input_time_saved(self) -> float:
+        """estimated time the linked bytes would have taken to be copied"""
+        bytes_saved = int(self.report["bytes_saved"].sum())
+        if bytes_saved == 0:
+            return 0.0
+        bytes_copied = int(self.report["bytes_copied"].sum())
+        copy_time = float(self.report["copy_time"].sum())
+        # NOTE - without fallback copies in the run, the throughput is measured once
+        if bytes_copied > 0 and copy_time > 0:
+            throughput = bytes_copied / copy_time
+        else:
+            throughput = self._copy_throughput()
+        return bytes_saved / throughput if throughput > 0 else 0.0
+
+    def _copy_throughput(self, max_bytes: int = 2**26) -> float:
+        """bytes per second copying (up to max_bytes of) the largest canonical file"""
+        src = max(self._canonical_paths(), key=lambda path: path.stat().st_size)
+        dst = Path(self.path, f".{src.name}.throughput")
+        t0 = monotonic()
+        with open(src, "rb") as f_src, open(dst, "wb") as f_dst:
+            n_bytes = f_dst.write(f_src.read(max_bytes))
+        elapsed = monotonic() - t0
+        dst.unlink()
+        return n_bytes / elapsed if elapsed > 0 else 0.0
+
+
+def _run_member(member: dict) -> dict:
+    """set up and execute one ensemble member (runs inside a worker process)
+
+    Args:
+        member (dict): member definition created by TeseoEnsemble.run
+
+    Returns:
+        dict: member report
+    """
+    result = {
+        "member_id": member["member_id"],
+        "path": member["path"],
+        "status": "failed",
+        "attempts": 0,
+        "input_time": 0.0,
+        "bytes_saved": 0,
+        "bytes_copied": 0,
+        "copy_time": 0.0,
+        "files_hashed": 0,
+        "setup_time": 0.0,
+        "run_time": 0.0,
+        "error": None,
+    }
+
+    t0 = monotonic()
+    try:
+        job = TeseoWrapper(member["path"], member["simulation_keyword"])
+        for file in Path(member["input_dir"]).iterdir():
+            if file.is_file():
+                dst = Path(job.input_dir, file.name)
+                t_share = monotonic()
+                bytes_saved = _share_file(file, dst, member["mode"])
+                _check_shared_file(
+                    file, dst, bytes_saved, monotonic() - t_share, result
+                )
+        t_share = monotonic()
+        bytes_saved = job.prepare_teseo_binary(
+            member["teseo_binary_path"], member["mode"]
+        )
+        _check_shared_file(
+            member["teseo_binary_path"],
+            job.teseo_binary_path,
+            bytes_saved,
+            monotonic() - t_share,
+            result,
+        )
+        result["input_time"] = monotonic() - t0
+
+        job.load_inputs()
+        job.setup(dict(member["user_parameters"]))
+    except Exception as err:
+        result["setup_time"] = monotonic() - t0
+        result["error"] = f"setup: {err!r}"
+        return result
+    result["setup_time"] = monotonic() - t0
+
+    t0 = monotonic()
+    for attempt in range(1, member["retries"] + 2):
+        result["attempts"] = attempt
+        try:
+            job.execute_simulation()
+        except (subprocess.CalledProcessError, OSError) as err:
+            result["error"] = repr(err)
+            continue
+        result["status"] = "finished"
+        result["error"] = None
+        break
+    result["run_time"] = monotonic() - t0
+
+    return result
+
+
+def _check_shared_file(
+    src: str, dst: str, bytes_saved: int, elapsed: float, result: dict
+) -> None:
+    """account a shared file in the member report and verify it if it was copied
+
+    Links are checked by target, copies (copy mode or a hardlink falling back to a copy) by checksum.
+
+    Args:
+        src (str): path to the canonical file
+        dst (str): path to the member file
+        bytes_saved (int): bytes saved by sharing the file (see _share_file)
+        elapsed (float): seconds spent sharing the file
+        result (dict): member report updated in place
+
+    Raises:
+        ValueError: if a copy does not match the canonical file (size or checksum)
+    """
+    src, dst = Path(src).resolve(), Path(dst)
+    result["bytes_saved"] += bytes_saved
+    if os.path.samefile(src, dst):
+        return
+
+    size = dst.stat().st_size
+    result["bytes_copied"] += size
+    result["copy_time"] += elapsed
+    if size != src.stat().st_size:
+        raise ValueError(f"Shared file {dst} does not match {src}")
+    result["files_hashed"] += 1
+    if _file_checksum(dst) != _source_checksum(src):
+        raise ValueError(f"Shared file {dst} does not match {src}")
+
+
+def _source_checksum(path: Path) -> str:
+    """checksum of a canonical file, cached by path, size and modification time"""
+    stat = path.stat()
+    key = (str(path), stat.st_size, stat.st_mtime_ns)
+    if key not in _SOURCE_CHECKSUMS:
+        _SOURCE_CHECKSUMS[key] = _file_checksum(path)
+    return _SOURCE_CHECKSUMS[key]
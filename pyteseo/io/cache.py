@@ -0,0 +1,130 @@
+"""On-disk columnar cache for DataFrames parsed from TESEO's text files.
+Each column is stored as a binary numpy array in an uncompressed npz-file together
+with a signature of the source files (names, sizes and modification times).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+CACHE_VERSION = 1
+
+
+def files_signature(files: list, **kwargs) -> str:
+    """Signature of a set of files based on their names, sizes and modification times
+
+    Args:
+        files (list): paths to the source files
+        **kwargs: additional reader options that change the output
+
+    Returns:
+        str: hexadecimal sha1 digest
+    """
+    items = []
+    for file in files:
+        stat = Path(file).stat()
+        items.append([Path(file).name, stat.st_size, stat.st_mtime_ns])
+    content = json.dumps(
+        {"version": CACHE_VERSION, "files": items, "options": kwargs},
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha1(content.encode()).hexdigest()
+
+
+def read_cached_dataframe(path: str, signature: str) -> pd.DataFrame | None:
+    """Load a cached DataFrame if it exists and matches the signature
+
+    Args:
+        path (str): path to the cache file
+        signature (str): expected signature of the source files
+
+    Returns:
+        pd.DataFrame | None: cached DataFrame or None if missing or outdated
+    """
+    path = Path(path)
+    if not path.exists():
+        return None
+
+    with np.load(path, allow_pickle=False) as npz:
+        if str(npz["__signature__"]) != signature:
+            return None
+        columns = list(npz["__columns__"])
+        return pd.DataFrame(
+            {column: npz[f"column_{i}"] for i, column in enumerate(columns)}
+        )
+
+
+def write_cached_dataframe(df: pd.DataFrame, path: str, signature: str) -> None:
+    """Store a DataFrame (RangeIndex) column by column in the cache file
+
+    Args:
+        df (pd.DataFrame): DataFrame to cache
+        path (str): path to the cache file
+        signature (str): signature of the source files
+    """
+    path = Path(path)
+    if not path.parent.exists():
+        path.parent.mkdir(parents=True)
+
+    arrays = {
+        "__signature__": np.array(signature),
+        "__columns__": np.array(df.columns, dtype=str),
+    }
+    for i, column in enumerate(df.columns):
+        values = df[column].to_numpy()
+        arrays[f"column_{i}"] = values.astype(str) if values.dtype == object else values
+
+    # NOTE - write to a temporary file first so readers never see a partial cache
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with open(tmp_path, "wb") as f:
+        np.savez(f, **arrays)
+    tmp_path.replace(path)
+
+
+def read_array_sidecar(path: str, signature: str) -> tuple[np.ndarray, dict] | None:
+    """Memory-map a sidecar array ('<path>.npy' + '<path>.json') if it matches the signature
+
+    Args:
+        path (str): path to the source file
+        signature (str): expected signature of the source file
+
+    Returns:
+        tuple[np.ndarray, dict] | None: read-only memory-mapped array and metadata, or None if missing or outdated
+    """
+    npy_path, json_path = _sidecar_paths(path)
+    if not npy_path.exists() or not json_path.exists():
+        return None
+
+    with open(json_path, "r") as f:
+        metadata = json.load(f)
+    if metadata.get("signature") != signature:
+        return None
+    return np.load(npy_path, mmap_mode="r", allow_pickle=False), metadata
+
+
+def write_array_sidecar(
+    array: np.ndarray, path: str, signature: str, **metadata
+) -> None:
+    """Store an array next to its source file ('<path>.npy') with a metadata header ('<path>.json')
+
+    Args:
+        array (np.ndarray): array to store
+        path (str): path to the source file
+        signature (str): signature of the source file
+        **metadata: additional metadata (json serializable)
+    """
+    npy_path, json_path = _sidecar_paths(path)
+    np.save(npy_path, np.ascontiguousarray(array), allow_pickle=False)
+    with open(json_path, "w") as f:
+        json.dump({"signature": signature, **metadata}, f)
+
+
+def _sidecar_paths(path: str) -> tuple[Path, Path]:
+    path = Path(path)
+    return path.with_name(f"{path.name}.npy"), path.with_name(f"{path.name}.json")
@@ -2,25 +2,44 @@
 """
 from __future__ import annotations
 
+from functools import partial
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 
-from pyteseo.defaults import FILE_PATTERNS
-from pyteseo.io.utils import _check_lonlat_range, _check_lonlat_soting
+from pyteseo.defaults import COORDINATE_NAMES, FILE_PATTERNS
+from pyteseo.io.cache import files_signature, read_array_sidecar, write_array_sidecar
+from pyteseo.io.utils import (
+    _check_lonlat_range,
+    _check_lonlat_soting,
+    _format_table,
+    _parallel_map,
+    _segment_distance,
+)
 
 
-def read_grid(path: str, nan_value: float = -999) -> pd.DataFrame:
+def read_grid(
+    path: str, nan_value: float = -999, sidecar: bool = False
+) -> pd.DataFrame:
     """Read TESEO grid-file to pandas DataFrame
 
     Args:
         path (str): path to the grid-file
         nan_value (float, optional): value to set nans. Defaults to -999.
+        sidecar (bool, optional): use (and build on first read) a memory-mapped binary copy next to the grid-file ('<grid-file>.npy' and '<grid-file>.json'). Defaults to False.
 
     Returns:
         pd.DataFrame: DataFrame with TESEO grid data [lon, lat, depth]
     """
     path = Path(path)
+    if sidecar:
+        signature = files_signature([path], nan_value=nan_value)
+        cached = read_array_sidecar(path, signature)
+        if cached is not None:
+            array, metadata = cached
+            return pd.DataFrame(array, columns=metadata["columns"])
+
     df = pd.read_csv(path, delimiter="\s+", na_values=str(nan_value), header=None)
 
     if df.shape[1] != 3:
@@ -32,6 +51,11 @@ def read_grid(path: str, nan_value: float = -999) -> pd.DataFrame:
     _check_lonlat_range(df)
     _check_lonlat_soting(df)
 
+    if sidecar:
+        write_array_sidecar(
+            df.to_numpy(dtype="float64"), path, signature, columns=list(df.columns)
+        )
+
     return df
 
 
@@ -72,35 +96,19 @@ def _split_polygons(df: pd.DataFrame) -> pd.DataFrame:
     Returns:
         pd.DataFrame: DataFrame with polygon and point number as indexes
     """
-    splitted_dfs = []
-    previous_i = count = 0
-    n_nans = len(df[df.isna().any(axis=1)])
-
-    for i in df[df.isna().any(axis=1)].index.values:
-        count += 1
-        if i == 0:
-            continue
-        if count == n_nans:
-            splitted_dfs.append(df.iloc[previous_i:i])
-            if i == df.iloc[[-1]].index.values:
-                break
-            else:
-                splitted_dfs.append(df.iloc[i:])
-        else:
-            splitted_dfs.append(df.iloc[previous_i:i])
-            previous_i = i
-
-    if splitted_dfs[0].equals(df):
-        print("WARNING - There is nothing to split in this DataFrame!")
+    # NOTE - each nan line starts a new polygon, a nan line at the end is dropped
+    nan_mask = df.isna().any(axis=1).to_numpy()
+    polygon_ids = np.cumsum(nan_mask) - nan_mask[0] + 1
 
-    new_polygons = []
-    for i, polygon in enumerate(splitted_dfs):
-        polygon.loc[:, ("polygon")] = i + 1
-        polygon.loc[:, ("point")] = polygon.index
-        polygon = polygon.set_index(["polygon", "point"])
-        new_polygons.append(polygon)
+    if not nan_mask[1:].any():
+        print("WARNING - There is nothing to split in this DataFrame!")
+    if len(df) > 1 and nan_mask[-1]:
+        df = df.iloc[:-1]
+        polygon_ids = polygon_ids[:-1]
 
-    return pd.concat(new_polygons)
+    return df.set_axis(
+        pd.MultiIndex.from_arrays([polygon_ids, df.index], names=["polygon", "point"])
+    )
 
 
 def write_grid(df: pd.DataFrame, path: str, nan_value: float = -999) -> None:
@@ -149,12 +157,13 @@ def write_grid(df: pd.DataFrame, path: str, nan_value: float = -999) -> None:
     )
 
 
-def write_coastline(df: pd.DataFrame, path: str) -> None:
+def write_coastline(df: pd.DataFrame, path: str, n_workers: int = 1) -> None:
     """Write TESEO coastline and polygons files
 
     Args:
         df (pd.DataFrame): DataFrame with columns 'lon', 'lat' and polygons separated by nan lines (lon:[-180,180], lat:[-90,90])
         path (str): path to the new coastline-file
+        n_workers (int, optional): number of polygon-files written concurrently. Defaults to 1.
     """
     path = Path(path)
 
@@ -175,21 +184,25 @@ def write_coastline(df: pd.DataFrame, path: str) -> None:
             "lon and lat values should be inside ranges lon[-180,180] and lat[-90,90]!"
         )
 
-    df.to_csv(
-        path,
-        sep="\t",
-        header=False,
-        index=False,
-        float_format="%.8e",
-        na_rep="NaN",
-    )
-    _write_polygons(df, path.parent)
+    # NOTE - vertices are formatted once for the coastline-file and the polygon-files
+    lines = "".join(
+        _format_table(
+            [df[column].to_numpy() for column in df.columns],
+            float_format="%.8e",
+            na_rep="NaN",
+        )
+    ).splitlines(keepends=True)
+    with open(path, "w") as f:
+        f.writelines(lines)
+    _write_polygons(df, path.parent, n_workers=n_workers, lines=lines)
 
 
 def _write_polygons(
     df: pd.DataFrame,
     dir_path: str,
     filename_pattern: str = FILE_PATTERNS["polygons"],
+    n_workers: int = 1,
+    lines: list[str] = None,
 ) -> None:
     """Write polygons from a coastline DataFrame
 
@@ -197,18 +210,273 @@ def _write_polygons(
         df (pd.DataFrame): input coastline DataFrame
         dir_path (str): directory where polygon files will be created
         filename (str, optional): filename for polygon-files (numbering and extension will be added). Defaults to "coastline_polygon".
+        n_workers (int, optional): number of polygon-files written concurrently. Defaults to 1.
+        lines (list[str], optional): already formatted lines of df. Defaults to None.
     """
+    if lines is None:
+        lines = "".join(
+            _format_table(
+                [df[column].to_numpy() for column in df.columns],
+                float_format="%.8e",
+                na_rep="NaN",
+            )
+        ).splitlines(keepends=True)
+
+    polygons = df.index.get_level_values("polygon").to_numpy()
+    order = np.argsort(polygons, kind="stable")
+    polygon_ids, starts = np.unique(polygons[order], return_index=True)
+    stops = np.append(starts[1:], len(order))
+    if not np.array_equal(order, np.arange(len(order))):
+        lines = [lines[i] for i in order]
+
+    _parallel_map(
+        partial(_write_lines, lines=lines),
+        [
+            (
+                Path(dir_path, f"{filename_pattern}".replace("*", f"{polygon:03d}")),
+                start,
+                stop,
+            )
+            for polygon, start, stop in zip(polygon_ids, starts, stops)
+        ],
+        n_workers,
+        "thread",
+    )
 
-    grouped = df.groupby("polygon")
-    for polygon, group in grouped:
-        path_polygon = Path(
-            dir_path, f"{filename_pattern}".replace("*", f"{polygon:03d}")
-        )
-        group.to_csv(
-            path_polygon,
-            sep="\t",
-            header=False,
-            index=False,
-            float_format="%.8e",
-            na_rep="NaN",
+
+def _write_lines(item: tuple, lines: list[str]) -> None:
+    """write lines[start:stop] from a (path, start, stop) item"""
+    path, start, stop = item
+    with open(path, "w") as f:
+        f.writelines(lines[start:stop])
+
+
+def preprocess_coastline(
+    df: pd.DataFrame,
+    grid,
+    tolerance: float = None,
+    buffer: float = 1,
+    clip: bool = True,
+    simplify: bool = True,
+) -> pd.DataFrame:
+    """Clip coastline polygons to the grid domain and simplify them to the grid resolution
+
+    Args:
+        df (pd.DataFrame): coastline DataFrame with polygon and point as indexes (see read_coastline)
+        grid (Grid): grid of the domain (any object with x_min, x_max, y_min, y_max, dx and dy)
+        tolerance (float, optional): simplification tolerance in degrees. Defaults to half of the smallest grid step.
+        buffer (float, optional): cells added around the grid bbox before clipping. Defaults to 1.
+        clip (bool, optional): clip polygons to the grid bbox. Defaults to True.
+        simplify (bool, optional): simplify polygons (Douglas-Peucker). Defaults to True.
+
+    Returns:
+        pd.DataFrame: preprocessed coastline DataFrame, ready for write_coastline
+    """
+    n_vertices = _count_vertices(df)
+    n_polygons = len(df.index.unique("polygon"))
+
+    if clip:
+        bbox = (
+            grid.x_min - buffer * grid.dx,
+            grid.y_min - buffer * grid.dy,
+            grid.x_max + buffer * grid.dx,
+            grid.y_max + buffer * grid.dy,
         )
+        df = clip_coastline(df, bbox)
+    if simplify:
+        if tolerance is None:
+            tolerance = 0.5 * min(grid.dx, grid.dy)
+        df = simplify_coastline(df, tolerance)
+
+    print(
+        f"Coastline vertices: {n_vertices} -> {_count_vertices(df)} "
+        f"({n_polygons} -> {len(df.index.unique('polygon'))} polygons)"
+    )
+    return df
+
+
+def clip_coastline(df: pd.DataFrame, bbox: tuple) -> pd.DataFrame:
+    """Clip coastline polygons to a bbox (Sutherland-Hodgman), polygons outside are dropped
+
+    Args:
+        df (pd.DataFrame): coastline DataFrame with polygon and point as indexes (see read_coastline)
+        bbox (tuple): lon_min, lat_min, lon_max, lat_max
+
+    Returns:
+        pd.DataFrame: coastline DataFrame with the clipped polygons (renumbered)
+    """
+    lon_min, lat_min, lon_max, lat_max = bbox
+    if lon_min >= lon_max or lat_min >= lat_max:
+        raise ValueError(f"Invalid bbox: {bbox}")
+
+    coords, offsets, closed, leading_nan = _coastline_rings(df)
+    for axis, limit, sign in [
+        (0, lon_min, 1),
+        (0, lon_max, -1),
+        (1, lat_min, 1),
+        (1, lat_max, -1),
+    ]:
+        coords, offsets = _clip_rings(coords, offsets, axis, limit, sign)
+
+    return _rings_dataframe(coords, offsets, closed, leading_nan, df.columns)
+
+
+def simplify_coastline(df: pd.DataFrame, tolerance: float) -> pd.DataFrame:
+    """Simplify coastline polygons (Douglas-Peucker), polygons collapsing under the tolerance are dropped
+
+    Args:
+        df (pd.DataFrame): coastline DataFrame with polygon and point as indexes (see read_coastline)
+        tolerance (float): maximum distance (degrees) from removed vertices to the simplified polygon
+
+    Returns:
+        pd.DataFrame: coastline DataFrame with the simplified polygons (renumbered)
+    """
+    if tolerance < 0:
+        raise ValueError(f"tolerance should be positive, got {tolerance}")
+
+    coords, offsets, closed, leading_nan = _coastline_rings(df)
+    keep = _douglas_peucker(coords, offsets, tolerance)
+    offsets = np.r_[0, np.cumsum(keep)][offsets]
+
+    return _rings_dataframe(coords[keep], offsets, closed, leading_nan, df.columns)
+
+
+def _count_vertices(df: pd.DataFrame) -> int:
+    return int((~df.isna().any(axis=1)).sum())
+
+
+def _coastline_rings(df: pd.DataFrame) -> tuple:
+    """vertices of every polygon without nan lines nor closing vertex (ragged layout)
+
+    Returns:
+        tuple: coords (n, 2), offsets (n_polygons + 1), closed (n_polygons) and leading_nan
+    """
+    values = df[[COORDINATE_NAMES["x"], COORDINATE_NAMES["y"]]].to_numpy(np.float64)
+    if not len(values):
+        return np.empty((0, 2)), np.zeros(1, dtype=np.int64), np.zeros(0, bool), False
+
+    polygons = df.index.get_level_values("polygon").to_numpy()
+    valid = ~np.isnan(values).any(axis=1)
+    starts = np.flatnonzero(np.r_[True, polygons[1:] != polygons[:-1]])
+    counts = np.add.reduceat(valid.astype(np.int64), starts)
+    coords = values[valid]
+    offsets = np.r_[0, np.cumsum(counts)]
+
+    closed = np.zeros(len(counts), dtype=bool)
+    multiple = counts > 1
+    closed[multiple] = np.all(
+        coords[offsets[:-1][multiple]] == coords[offsets[1:][multiple] - 1], axis=1
+    )
+    keep = np.ones(len(coords), dtype=bool)
+    keep[offsets[1:][closed] - 1] = False
+    return coords[keep], np.r_[0, np.cumsum(counts - closed)], closed, not valid[0]
+
+
+def _rings_dataframe(
+    coords: np.ndarray,
+    offsets: np.ndarray,
+    closed: np.ndarray,
+    leading_nan: bool,
+    columns,
+    min_vertices: int = 3,
+) -> pd.DataFrame:
+    """coastline DataFrame from rings (see _coastline_rings), dropping rings with less than min_vertices"""
+    counts = np.diff(offsets)
+    kept = counts >= min_vertices
+    starts, counts, closed = offsets[:-1][kept], counts[kept], closed[kept]
+
+    separators = np.ones(len(counts), dtype=np.int64)
+    if len(separators):
+        separators[0] = leading_nan
+    rows = separators + counts + closed
+    first_rows = np.r_[0, np.cumsum(rows)[:-1]] + separators
+
+    values = np.full((rows.sum(), 2), np.nan)
+    ring = np.repeat(np.arange(len(counts)), counts)
+    vertices = np.arange(len(ring)) - np.repeat(np.cumsum(counts) - counts, counts)
+    values[first_rows[ring] + vertices] = coords[np.repeat(starts, counts) + vertices]
+    values[(first_rows + counts)[closed]] = coords[starts[closed]]
+
+    return pd.DataFrame(
+        values,
+        index=pd.MultiIndex.from_arrays(
+            [np.repeat(np.arange(1, len(counts) + 1), rows), np.arange(len(values))],
+            names=["polygon", "point"],
+        ),
+        columns=columns,
+    )
+
+
+def _clip_rings(
+    coords: np.ndarray, offsets: np.ndarray, axis: int, limit: float, sign: int
+) -> tuple:
+    """Sutherland-Hodgman step of every ring against the half-plane sign * (coord[axis] - limit) >= 0"""
+    if not len(coords):
+        return coords, offsets
+
+    counts = np.diff(offsets)
+    not_empty = counts > 0
+    previous = np.arange(len(coords)) - 1
+    previous[offsets[:-1][not_empty]] = offsets[1:][not_empty] - 1
+
+    inside = sign * (coords[:, axis] - limit) >= 0
+    crossing = inside != inside[previous]
+    # NOTE - each edge (previous -> vertex) emits the intersection if crossing and the vertex if inside
+    emitted = crossing.astype(np.int64) + inside
+    positions = np.cumsum(emitted) - emitted
+
+    p, c = coords[previous[crossing]], coords[crossing]
+    t = (limit - p[:, axis]) / (c[:, axis] - p[:, axis])
+    intersections = p + t[:, None] * (c - p)
+    intersections[:, axis] = limit
+
+    clipped = np.empty((emitted.sum(), 2))
+    clipped[positions[crossing]] = intersections
+    clipped[(positions + crossing)[inside]] = coords[inside]
+    return clipped, np.r_[0, np.cumsum(emitted)][offsets]
+
+
+def _douglas_peucker(
+    coords: np.ndarray, offsets: np.ndarray, tolerance: float
+) -> np.ndarray:
+    """Douglas-Peucker over every ring at once, one level of the recursion per iteration
+
+    Returns:
+        np.ndarray: mask of the vertices kept
+    """
+    keep = np.zeros(len(coords), dtype=bool)
+    counts = np.diff(offsets)
+    rings = np.flatnonzero(counts > 0)
+    keep[offsets[rings]] = True
+
+    # NOTE - intervals [start, end] of vertices, end == ring end refers to the first vertex (closing edge)
+    start, end = offsets[rings], offsets[rings + 1]
+    ring_start, ring_end = offsets[rings], offsets[rings + 1]
+    while len(start):
+        lengths = end - start - 1
+        inner = lengths > 0
+        start, end, lengths = start[inner], end[inner], lengths[inner]
+        ring_start, ring_end = ring_start[inner], ring_end[inner]
+        if not len(start):
+            break
+
+        first = np.cumsum(lengths) - lengths
+        interval = np.repeat(np.arange(len(start)), lengths)
+        vertex = np.arange(lengths.sum()) - first[interval] + start[interval] + 1
+        a = coords[start]
+        b = coords[np.where(end == ring_end, ring_start, end)]
+        distance = _segment_distance(coords[vertex], a[interval], b[interval])
+
+        max_distance = np.maximum.reduceat(distance, first)
+        hits = np.flatnonzero(distance == max_distance[interval])
+        _, first_hits = np.unique(interval[hits], return_index=True)
+        farthest = vertex[hits[first_hits]]
+
+        split = max_distance > tolerance
+        farthest = farthest[split]
+        keep[farthest] = True
+        start, end = np.r_[start[split], farthest], np.r_[farthest, end[split]]
+        ring_start = np.r_[ring_start[split], ring_start[split]]
+        ring_end = np.r_[ring_end[split], ring_end[split]]
+
+    return keep
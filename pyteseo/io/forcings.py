@@ -2,17 +2,30 @@
 """
 from __future__ import annotations
 
+from functools import partial
 from pathlib import Path
 
+import dask
+import dask.array as da
+import numpy as np
 import pandas as pd
+import xarray as xr
 
-from pyteseo.defaults import FILE_NAMES, FILE_PATTERNS, VARIABLE_NAMES
+from pyteseo.defaults import (
+    COORDINATE_NAMES,
+    FILE_NAMES,
+    FILE_PATTERNS,
+    VARIABLE_NAMES,
+)
 from pyteseo.io.utils import (
+    _calculate_step,
     _check_cte_dt,
     _check_lonlat_range,
     _check_varnames,
     _check_n_vars,
     _check_lonlat_soting,
+    _parallel_map,
+    _write_table,
 )
 
 
@@ -43,12 +56,21 @@ def read_cte_forcing(path: str, forcing_type: str, dt: float) -> pd.DataFrame:
     return df
 
 
-def read_2d_forcing(path: str, forcing_type: str) -> pd.DataFrame:
+def read_2d_forcing(
+    path: str,
+    forcing_type: str,
+    n_workers: int = 1,
+    executor: str = "thread",
+    engine: str = "c",
+) -> pd.DataFrame:
     """Read TESEO 2d forcings from list files
 
     Args:
         path (str): path to forcing lst-file 'lst*.pre'
         forcing_type (list): 'currents', 'winds', or 'waves'
+        n_workers (int, optional): number of workers to parse snapshot files in parallel. Defaults to 1 (serial).
+        executor (str, optional): pool used when n_workers > 1, "thread" or "process". Defaults to "thread".
+        engine (str, optional): pd.read_csv parser, "c" or "pyarrow" (single tab or space delimiter). Defaults to "c".
 
     Returns:
         pd.DataFrame: forcing DataFrame, columns=[time, lon, lat, var1, var2, ..., varN]
@@ -60,16 +82,14 @@ def read_2d_forcing(path: str, forcing_type: str) -> pd.DataFrame:
     path = Path(path)
     files = read_list_file(path)
 
-    df_list = []
-    for file in files:
-        df = pd.read_csv(file, delimiter="\s+", header=None)
-        _check_n_vars(df, file_column_names)
-        df.columns = file_column_names
-        _check_lonlat_range(df)
-        _check_lonlat_soting(df)
-
-        df.insert(loc=0, column="time", value=float(file.stem[-4:-1]))
-        df_list.append(df)
+    df_list = _parallel_map(
+        partial(
+            _read_2d_forcing_file, file_column_names=file_column_names, engine=engine
+        ),
+        files,
+        n_workers,
+        executor,
+    )
 
     n_rows = list(set([len(df.index) for df in df_list]))
     if len(n_rows) != 1:
@@ -81,6 +101,169 @@ def read_2d_forcing(path: str, forcing_type: str) -> pd.DataFrame:
     return df
 
 
+def _read_2d_forcing_file(
+    path: Path, file_column_names: list, engine: str = "c"
+) -> pd.DataFrame:
+    """Read and check a 2d forcing snapshot file, time is obtained from the filename
+
+    Args:
+        path (Path): path to the snapshot file
+        file_column_names (list): names of the columns [lon, lat, var1, ..., varN]
+        engine (str, optional): pd.read_csv parser, "c" or "pyarrow". Defaults to "c".
+
+    Returns:
+        pd.DataFrame: snapshot DataFrame, columns=[time, lon, lat, var1, var2, ..., varN]
+    """
+    if engine == "pyarrow":
+        with open(path, "r") as f:
+            delimiter = "\t" if "\t" in f.readline() else " "
+        df = pd.read_csv(path, delimiter=delimiter, header=None, engine="pyarrow")
+    else:
+        df = pd.read_csv(path, delimiter="\s+", header=None, engine=engine)
+    _check_n_vars(df, file_column_names)
+    df.columns = file_column_names
+    _check_lonlat_range(df)
+    _check_lonlat_soting(df)
+
+    df.insert(loc=0, column="time", value=float(path.stem[-4:-1]))
+    return df
+
+
+def read_2d_forcing_dataset(path: str, forcing_type: str) -> xr.Dataset:
+    """Lazy read of TESEO 2d forcings from list files to a dask-backed xr.Dataset (time, lat, lon).
+    Each snapshot file is one chunk. Validation is done on the first file and, for the rest, when each chunk is computed.
+
+    Args:
+        path (str): path to forcing lst-file 'lst*.pre'
+        forcing_type (str): 'currents', 'winds', or 'waves'
+
+    Returns:
+        xr.Dataset: forcing Dataset, dims=[time, lat, lon], data_vars=[var1, var2, ..., varN]
+    """
+    coordnames = VARIABLE_NAMES[forcing_type]["coords"]
+    varnames = VARIABLE_NAMES[forcing_type]["vars"]
+    file_column_names = (coordnames + varnames)[1:]
+
+    path = Path(path)
+    files = read_list_file(path)
+    times = np.array([float(file.stem[-4:-1]) for file in files])
+    _check_cte_dt(pd.DataFrame({"time": times}))
+
+    df = pd.read_csv(files[0], delimiter="\s+", header=None)
+    _check_n_vars(df, file_column_names)
+    df.columns = file_column_names
+    _check_lonlat_range(df)
+    _check_lonlat_soting(df)
+
+    lon = np.unique(df[COORDINATE_NAMES["x"]].values)
+    lat = np.unique(df[COORDINATE_NAMES["y"]].values)
+    coords = df[[COORDINATE_NAMES["x"], COORDINATE_NAMES["y"]]].values
+    shape = (len(varnames), len(lat), len(lon))
+
+    snapshots = [
+        da.from_delayed(
+            dask.delayed(_read_2d_snapshot)(file, coords, lon, lat, len(varnames)),
+            shape=shape,
+            dtype=np.float64,
+        )
+        for file in files
+    ]
+    data = da.stack(snapshots, axis=1)
+
+    return xr.Dataset(
+        {
+            varname: ([coordnames[0], "lat", "lon"], data[i])
+            for i, varname in enumerate(varnames)
+        },
+        coords={coordnames[0]: times, "lat": lat, "lon": lon},
+    )
+
+
+def _read_2d_snapshot(
+    path: str, coords: np.ndarray, lon: np.ndarray, lat: np.ndarray, n_vars: int
+) -> np.ndarray:
+    """Read a 2d forcing snapshot file to an array (var, lat, lon)
+
+    Args:
+        path (str): path to the snapshot file
+        coords (np.ndarray): expected (lon, lat) of every line, as in the first snapshot
+        lon (np.ndarray): sorted longitudes of the forcing grid
+        lat (np.ndarray): sorted latitudes of the forcing grid
+        n_vars (int): number of variables after lon and lat
+
+    Raises:
+        ValueError: if the file does not match the first snapshot
+
+    Returns:
+        np.ndarray: snapshot data, missing points are NaN
+    """
+    values = pd.read_csv(path, delimiter="\s+", header=None).values
+    if values.shape != (len(coords), n_vars + 2):
+        raise ValueError(f"{path} shape {values.shape} differs from the first file!")
+    if not np.array_equal(values[:, :2], coords):
+        raise ValueError(f"{path} coordinates differ from the first file!")
+
+    array = np.full((n_vars, len(lat), len(lon)), np.nan)
+    ix = np.searchsorted(lon, coords[:, 0])
+    iy = np.searchsorted(lat, coords[:, 1])
+    array[:, iy, ix] = values[:, 2:].T
+    return array
+
+
+def read_forcing_metadata(path: str, forcing_type: str, dt_cte: float = 1.0) -> dict:
+    """Scan forcing dimensions without loading the data.
+    nt from the lst-file lines, dt from the filenames and nx, ny, dx, dy from the first snapshot.
+
+    Args:
+        path (str): path to forcing lst-file 'lst*.pre'
+        forcing_type (str): 'currents', 'winds', or 'waves'
+        dt_cte (float, optional): time step if spatially cte. Defaults to 1.0.
+
+    Returns:
+        dict: spatially_cte, nt, dt, nx, ny, dx, dy (dx and dy are None if spatially cte)
+    """
+    path = Path(path)
+    with open(path, "r") as f:
+        lines = [line.split() for line in f if line.strip()]
+
+    varnames = VARIABLE_NAMES[forcing_type]["vars"]
+    if len(lines[0]) != 1:
+        if len(lines[0]) != len(varnames):
+            raise ValueError(
+                f"lst-file has {len(lines[0])} columns not equal to vars: {varnames}!"
+            )
+        return {
+            "spatially_cte": True,
+            "nt": len(lines),
+            "dt": dt_cte,
+            "nx": 1,
+            "ny": 1,
+            "dx": None,
+            "dy": None,
+        }
+
+    coordnames = VARIABLE_NAMES[forcing_type]["coords"]
+    file_column_names = (coordnames + varnames)[1:]
+    files = [Path(path.parent, line[0]) for line in lines]
+    times = np.array([float(file.stem[-4:-1]) for file in files])
+
+    df = pd.read_csv(files[0], delimiter="\s+", header=None)
+    _check_n_vars(df, file_column_names)
+    df.columns = file_column_names
+    lon = df[COORDINATE_NAMES["x"]].unique()
+    lat = df[COORDINATE_NAMES["y"]].unique()
+
+    return {
+        "spatially_cte": False,
+        "nt": len(files),
+        "dt": _calculate_step(times, "dt"),
+        "nx": len(lon),
+        "ny": len(lat),
+        "dx": _calculate_step(lon, "dx"),
+        "dy": _calculate_step(lat, "dy"),
+    }
+
+
 def read_list_file(path: str) -> list:
     """read realatives paths stored in lst-file
 
@@ -133,7 +316,12 @@ def write_cte_forcing(
 
 
 def write_2d_forcing(
-    df: pd.DataFrame, dir_path: str, forcing_type: str, nan_value: int = 0
+    df: pd.DataFrame,
+    dir_path: str,
+    forcing_type: str,
+    nan_value: int = 0,
+    n_workers: int = 1,
+    executor: str = "thread",
 ) -> None:
     """write lst-file and forcing files per time from a DataFrame with the required variables.
         currents: [time, lon, lat, u, v]
@@ -145,6 +333,8 @@ def write_2d_forcing(
         dir_path (str): path to the 'inputs' directory of the simulation
         forcing_type (str): 'currents', 'winds', or 'waves'
         nan_value (int, optional): value for NaN sustitution. Defaults to 0.
+        n_workers (int, optional): number of forcing files written concurrently. Defaults to 1.
+        executor (str, optional): "thread" or "process" pool. Defaults to "thread".
     """
     lst_filename = FILE_NAMES[forcing_type]
     file_pattern = FILE_PATTERNS[forcing_type]
@@ -158,21 +348,78 @@ def write_2d_forcing(
     _check_lonlat_range(df)
     _check_cte_dt(df)
 
-    grouped = df.groupby(coordnames[0])
-    for time, group in grouped:
-        with open(path, "a") as f:
-            f.write(f"{file_pattern}\n".replace("*", f"{int(time):03d}"))
-
-        path_currents = Path(path.parent, file_pattern.replace("*", f"{int(time):03d}"))
-        group.to_csv(
-            path_currents,
-            sep="\t",
-            columns=coordnames[1:] + varnames,
-            header=False,
-            index=False,
-            float_format="%.8e",
-            na_rep=nan_value,
-        )
+    times, starts = np.unique(df[coordnames[0]].to_numpy(), return_index=True)
+    stops = np.append(starts[1:], len(df))
+    filenames = [file_pattern.replace("*", f"{int(time):03d}") for time in times]
+    columns = [df[column].to_numpy() for column in coordnames[1:] + varnames]
+
+    with open(path, "w") as f:
+        f.write("".join(f"{filename}\n" for filename in filenames))
+
+    _parallel_map(
+        partial(_write_2d_forcing_file, nan_value=nan_value),
+        [
+            (Path(path.parent, filename), [column[start:stop] for column in columns])
+            for filename, start, stop in zip(filenames, starts, stops)
+        ],
+        n_workers,
+        executor,
+    )
+
+
+def _write_2d_forcing_file(item: tuple, nan_value: int = 0) -> None:
+    """write one forcing file from a (path, columns) item"""
+    path, columns = item
+    with open(path, "w") as f:
+        _write_table(f, columns, float_format="%.8e", na_rep=nan_value)
+
+
+def write_2d_forcing_from_dataset(
+    ds: xr.Dataset, dir_path: str, forcing_type: str, nan_value: int = 0
+) -> None:
+    """write lst-file and forcing files per time from a Dataset, one time slice at a time.
+        currents: (time, lon, lat) [u, v]
+        winds: (time, lon, lat) [u, v]
+        waves: (time, lon, lat) [hs, dir, tp]
+
+    Args:
+        ds (xr.Dataset): Dataset (numpy or dask-backed) with required coordinate and variable names
+        dir_path (str): path to the 'inputs' directory of the simulation
+        forcing_type (str): 'currents', 'winds', or 'waves'
+        nan_value (int, optional): value for NaN sustitution. Defaults to 0.
+    """
+    lst_filename = FILE_NAMES[forcing_type]
+    file_pattern = FILE_PATTERNS[forcing_type]
+    varnames = VARIABLE_NAMES[forcing_type]["vars"]
+    coordnames = VARIABLE_NAMES[forcing_type]["coords"]
+    path = Path(dir_path, lst_filename)
+
+    _check_varnames(ds, varnames + coordnames)
+    ds = ds[varnames].sortby(coordnames)
+    _check_lonlat_range(ds)
+
+    times = ds[coordnames[0]].values
+    if np.issubdtype(times.dtype, np.datetime64):
+        times = (times - times[0]) / np.timedelta64(1, "h")
+    _calculate_step(times, "Forcing time step")
+
+    # NOTE - same row order as write_2d_forcing (sorted by lon and then by lat)
+    lon = ds[coordnames[1]].values
+    lat = ds[coordnames[2]].values
+    lon_column = np.repeat(lon, len(lat))
+    lat_column = np.tile(lat, len(lon))
+
+    filenames = [file_pattern.replace("*", f"{int(time):03d}") for time in times]
+    with open(path, "w") as f:
+        f.write("".join(f"{filename}\n" for filename in filenames))
+
+    for i, filename in enumerate(filenames):
+        snapshot = ds.isel({coordnames[0]: i}).transpose(*coordnames[1:]).load()
+        columns = [lon_column, lat_column] + [
+            snapshot[varname].values.ravel() for varname in varnames
+        ]
+        with open(Path(path.parent, filename), "w") as f:
+            _write_table(f, columns, float_format="%.8e", na_rep=nan_value)
 
 
 def write_null_forcing(dir_path: str, forcing_type: str):
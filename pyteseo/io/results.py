@@ -1,24 +1,48 @@
 """Input and Output functionality for specific TESEO file formats
 """
+
 from __future__ import annotations
 
+import os
+from fnmatch import fnmatch
+from io import StringIO
 from pathlib import Path
+from time import monotonic, sleep
+from typing import Callable, Iterator
 
+import dask
+import dask.array as da
+import numpy as np
 import pandas as pd
+import xarray as xr
 
-from pyteseo.defaults import FILE_NAMES, FILE_PATTERNS, RESULTS_MAP
+from pyteseo.defaults import DIRECTORY_NAMES, FILE_NAMES, FILE_PATTERNS, RESULTS_MAP
+from pyteseo.io.cache import (
+    files_signature,
+    read_cached_dataframe,
+    write_cached_dataframe,
+)
+from pyteseo.io.utils import _parallel_map
 
 
 # # 4. RESULTS
 def read_particles_results(
     dir_path: str,
     file_pattern: str = FILE_PATTERNS["teseo_particles"],
+    n_workers: int = 1,
+    executor: str = "thread",
+    cache: bool = False,
+    cache_dir: str = None,
 ) -> pd.DataFrame:
     """Load TESEO's particles results files "*_properties_*.txt" to DataFrame
 
     Args:
         dir_path (str): path to the results directory
         file_pattern (str, optional): file pattern of particles restuls. Defaults to "*_particles_*.txt".
+        n_workers (int, optional): number of workers to parse files in parallel. Defaults to 1 (serial).
+        executor (str, optional): pool used when n_workers > 1, "thread" or "process". Defaults to "thread".
+        cache (bool, optional): use (and update) the on-disk columnar cache. Defaults to False.
+        cache_dir (str, optional): cache directory. Defaults to ".pyteseo_cache" next to dir_path.
 
     Returns:
         pd.DataFrame: Dataframe with all the results (including times and spill_id)
@@ -29,30 +53,35 @@ def read_particles_results(
     if not files:
         raise FileNotFoundError(f"No files matching the pattern {file_pattern}")
     else:
-        dfs = [
-            pd.read_csv(
-                file,
-                sep=",",
-                header=0,
-                encoding="iso-8859-1",
-                skipinitialspace=True,
-            )
-            for file in files
-        ]
+        if cache:
+            cache_path = _get_cache_path(dir_path, "particles", cache_dir)
+            signature = files_signature(files)
+            df = read_cached_dataframe(cache_path, signature)
+            if df is not None:
+                return df
+
+        dfs = _parallel_map(_read_results_file, files, n_workers, executor)
 
         df = pd.concat(dfs).reset_index(drop=True)
-        return _rename_results_names(df)
+        df = _rename_results_names(df)
+        if cache:
+            write_cached_dataframe(df, cache_path, signature)
+        return df
 
 
 def read_properties_results(
     dir_path: str,
     file_pattern: str = FILE_PATTERNS["teseo_properties"],
+    cache: bool = False,
+    cache_dir: str = None,
 ) -> pd.DataFrame:
     """Load TESEO's propierties results files "*_properties_*.txt" to DataFrame
 
     Args:
         dir_path (str): path to the results directory
         file_pattern (str, optional): file pattern of particles restuls. Defaults to "*_properties_*.txt".
+        cache (bool, optional): use (and update) the on-disk columnar cache. Defaults to False.
+        cache_dir (str, optional): cache directory. Defaults to ".pyteseo_cache" next to dir_path.
 
     Returns:
         pd.DataFrame: Dataframe with all the results (including times and spill_id)
@@ -63,6 +92,13 @@ def read_properties_results(
     if not files:
         raise FileNotFoundError(f"No files matching the pattern {file_pattern}")
     else:
+        if cache:
+            cache_path = _get_cache_path(dir_path, "properties", cache_dir)
+            signature = files_signature(files)
+            df = read_cached_dataframe(cache_path, signature)
+            if df is not None:
+                return df
+
         spill_ids = [file.stem.split("_")[2] for file in files]
 
         dfs = []
@@ -79,13 +115,18 @@ def read_properties_results(
             dfs.append(df_)
 
         df = pd.concat(dfs).reset_index(drop=True)
-        return _rename_results_names(df)
+        df = _rename_results_names(df)
+        if cache:
+            write_cached_dataframe(df, cache_path, signature)
+        return df
 
 
 def read_grids_results(
     dir_path: str,
     file_pattern: str = FILE_PATTERNS["teseo_grids"],
     fullgrid_filename: str = FILE_NAMES["teseo_grid_coordinates"],
+    cache: bool = False,
+    cache_dir: str = None,
 ) -> pd.DataFrame:
 
     """Load TESEO's grids results files "*_grid_*.txt" to DataFrame
@@ -94,6 +135,8 @@ def read_grids_results(
         dir_path (PosixPath | str):  path to the results directory
         file_pattern (str, optional): file pattern of particles restuls. Defaults to DEF_PATTERNS["teseo_grids"].
         fullgrid_filename (str, optional): filename of results coordinates domain-grid. Defaults to  DEF_FILES["teseo_grid_coordinates"].
+        cache (bool, optional): use (and update) the on-disk columnar cache. Defaults to False.
+        cache_dir (str, optional): cache directory. Defaults to ".pyteseo_cache" next to dir_path.
 
     Returns:
         pd.DataFrame: Dataframe with all the results (including times and spill_id)
@@ -103,6 +146,13 @@ def read_grids_results(
     if not files:
         raise FileNotFoundError(f"No files matching the pattern {file_pattern}")
     else:
+        if cache:
+            cache_path = _get_cache_path(dir_path, "grids", cache_dir)
+            signature = files_signature(files + [dir_path / fullgrid_filename])
+            df = read_cached_dataframe(cache_path, signature)
+            if df is not None:
+                return df
+
         spill_ids = [int(file.stem.split("_")[2]) for file in files]
 
         dfs = []
@@ -132,7 +182,319 @@ def read_grids_results(
             minimum_grid = get_minimum_grid(fullgrid, df_spill)
             dfs.append(_add_inactive_cells(df_spill, minimum_grid, spill_id))
         df = pd.concat(dfs).reset_index(drop=True)
-        return _rename_results_names(df)
+        df = _rename_results_names(df)
+        if cache:
+            write_cached_dataframe(df, cache_path, signature)
+        return df
+
+
+def read_grids_results_dataset(
+    dir_path: str,
+    file_pattern: str = FILE_PATTERNS["teseo_grids"],
+    fullgrid_filename: str = FILE_NAMES["teseo_grid_coordinates"],
+    chunks: dict = None,
+) -> xr.Dataset:
+    """Load TESEO's grids results files "*_grid_*.txt" to a dense xr.Dataset (spill_id, time, lat, lon)
+    Cells are placed directly in the results domain-grid, inactive cells are NaN (float32).
+
+    Args:
+        dir_path (str): path to the results directory
+        file_pattern (str, optional): file pattern of grids results. Defaults to DEF_PATTERNS["teseo_grids"].
+        fullgrid_filename (str, optional): filename of results coordinates domain-grid. Defaults to DEF_FILES["teseo_grid_coordinates"].
+        chunks (dict, optional): if defined, the dataset is dask-backed (one file per chunk) and rechunked with it. Defaults to None.
+
+    Returns:
+        xr.Dataset: grids results, times (h) are read from the "time (h)" column of each file
+    """
+    dir_path = Path(dir_path)
+    files = sorted(list(dir_path.glob(file_pattern)))
+    if not files:
+        raise FileNotFoundError(f"No files matching the pattern {file_pattern}")
+
+    fullgrid = _read_results_file(dir_path / fullgrid_filename)
+    lon = np.unique(fullgrid["longitude (º)"].values)
+    lat = np.unique(fullgrid["latitude (º)"].values)
+
+    spill_ids = np.array([int(file.stem.split("_")[-2]) for file in files])
+    times = np.array([_grid_file_time(file) for file in files])
+    spill_coords, spill_index = np.unique(spill_ids, return_inverse=True)
+    time_coords, time_index = np.unique(times, return_inverse=True)
+
+    header = pd.read_csv(files[0], nrows=0, encoding="iso-8859-1").columns
+    varnames = [
+        varname.strip()
+        for varname in header
+        if varname.strip() not in ["time (h)", "longitude (º)", "latitude (º)"]
+    ]
+    shape = (len(varnames), len(lat), len(lon))
+
+    if chunks is None:
+        data = np.full(
+            (len(varnames), len(spill_coords), len(time_coords), len(lat), len(lon)),
+            np.nan,
+            dtype=np.float32,
+        )
+        for file, i, j in zip(files, spill_index, time_index):
+            data[:, i, j] = _grid_file_to_array(file, lon, lat, varnames)
+    else:
+        empty = da.full(shape, np.nan, dtype=np.float32, chunks=shape)
+        blocks = [[empty] * len(time_coords) for _ in spill_coords]
+        for file, i, j in zip(files, spill_index, time_index):
+            blocks[i][j] = da.from_delayed(
+                dask.delayed(_grid_file_to_array)(file, lon, lat, varnames),
+                shape=shape,
+                dtype=np.float32,
+            )
+        data = da.stack([da.stack(block, axis=1) for block in blocks], axis=1)
+
+    ds = xr.Dataset(
+        {
+            RESULTS_MAP.get(varname, varname): (
+                ["spill_id", "time", "lat", "lon"],
+                data[k],
+            )
+            for k, varname in enumerate(varnames)
+        },
+        coords={"spill_id": spill_coords, "time": time_coords, "lat": lat, "lon": lon},
+    )
+    return ds.chunk(chunks) if chunks else ds
+
+
+class ResultsTail:
+    def __init__(
+        self,
+        dir_path: str,
+        particles_pattern: str = FILE_PATTERNS["teseo_particles"],
+        properties_pattern: str = FILE_PATTERNS["teseo_properties"],
+        grids_pattern: str = FILE_PATTERNS["teseo_grids"],
+    ):
+        """incremental reader of TESEO's results while the simulation is running.
+        Each file is read only once: particles and grids snapshots when their size is stable
+        between two polls, and properties files from the last line already read.
+
+        Args:
+            dir_path (str): path to the results directory
+            particles_pattern (str, optional): file pattern of particles results. Defaults to "*_particles_*.txt".
+            properties_pattern (str, optional): file pattern of properties results. Defaults to "*_properties_*.txt".
+            grids_pattern (str, optional): file pattern of grids results. Defaults to "*_grid_*.txt".
+        """
+        self.dir_path = Path(dir_path)
+        self.patterns = {
+            "particles": particles_pattern,
+            "properties": properties_pattern,
+            "grids": grids_pattern,
+        }
+        self.consumed = set()
+        self._sizes = {}
+        self._properties = {}
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(dir_path={self.dir_path})"
+
+    def poll(self, final: bool = False) -> list[tuple[str, pd.DataFrame]]:
+        """read results written since the previous poll
+
+        Args:
+            final (bool, optional): the simulation has finished, read snapshots without waiting for a stable size. Defaults to False.
+
+        Returns:
+            list[tuple[str, pd.DataFrame]]: ('particles' | 'properties' | 'grids', new results) sorted by filename
+        """
+        if not self.dir_path.exists():
+            return []
+
+        with os.scandir(self.dir_path) as entries:
+            files = sorted(
+                (entry.name, entry.stat().st_size)
+                for entry in entries
+                if entry.is_file()
+            )
+
+        new_results = []
+        for result_type, pattern in self.patterns.items():
+            for filename, size in files:
+                if not fnmatch(filename, pattern):
+                    continue
+                path = Path(self.dir_path, filename)
+                if result_type == "properties":
+                    df = self._read_new_properties(path, size)
+                else:
+                    df = self._read_new_snapshot(path, size, final)
+                if df is not None:
+                    if result_type in ["properties", "grids"]:
+                        df["spill_id (-)"] = int(
+                            path.stem.split("_")[-2 if result_type == "grids" else -1]
+                        )
+                    new_results.append((result_type, _rename_results_names(df)))
+
+        return new_results
+
+    def follow(
+        self,
+        poll_interval: float = 1.0,
+        until: Callable[[], bool] = None,
+        timeout: float = None,
+    ) -> Iterator[tuple[str, pd.DataFrame]]:
+        """generator of new results as soon as they are written
+
+        Args:
+            poll_interval (float, optional): seconds between polls. Defaults to 1.0.
+            until (Callable[[], bool], optional): returns True when the simulation has finished. Defaults to None (follow until timeout).
+            timeout (float, optional): maximum seconds to follow the results. Defaults to None.
+
+        Yields:
+            Iterator[tuple[str, pd.DataFrame]]: ('particles' | 'properties' | 'grids', new results)
+        """
+        start = monotonic()
+        while True:
+            finished = until is not None and until()
+            yield from self.poll(final=finished)
+            if finished or (timeout is not None and monotonic() - start > timeout):
+                return
+            sleep(poll_interval)
+
+    def _read_new_snapshot(self, path: Path, size: int, final: bool):
+        if path in self.consumed:
+            return None
+        if not final and (size == 0 or self._sizes.get(path) != size):
+            self._sizes[path] = size
+            return None
+
+        self.consumed.add(path)
+        self._sizes.pop(path, None)
+        return _read_results_file(path)
+
+    def _read_new_properties(self, path: Path, size: int):
+        header, offset = self._properties.get(path, (None, 0))
+        if size <= offset:
+            return None
+
+        with open(path, "rb") as f:
+            f.seek(offset)
+            content = f.read(size - offset)
+        complete = content[: content.rfind(b"\n") + 1]
+        if not complete:
+            return None
+
+        lines = complete.decode("iso-8859-1")
+        if header is None:
+            header, _, lines = lines.partition("\n")
+            header += "\n"
+        self._properties[path] = (header, offset + len(complete))
+        self.consumed.add(path)
+        if not lines.strip():
+            return None
+
+        return pd.read_csv(
+            StringIO(header + lines), sep=",", header=0, skipinitialspace=True
+        )
+
+
+def _grid_file_to_array(
+    path: str, lon: np.ndarray, lat: np.ndarray, varnames: list
+) -> np.ndarray:
+    """Place the active cells of a grids results file in the results domain-grid
+
+    Args:
+        path (str): path to the grids results file
+        lon (np.ndarray): sorted longitudes of the results domain-grid
+        lat (np.ndarray): sorted latitudes of the results domain-grid
+        varnames (list): variables (original TESEO's names) to extract
+
+    Returns:
+        np.ndarray: float32 array (variable, lat, lon), inactive cells are NaN
+    """
+    df = _read_results_file(path)
+    ix = _coordinate_index(lon, df["longitude (º)"].values)
+    iy = _coordinate_index(lat, df["latitude (º)"].values)
+
+    array = np.full((len(varnames), len(lat), len(lon)), np.nan, dtype=np.float32)
+    for k, varname in enumerate(varnames):
+        array[k, iy, ix] = df[varname].values
+    return array
+
+
+def _coordinate_index(coords: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """Index of each value in a sorted coordinate array (nearest coordinate)
+
+    Args:
+        coords (np.ndarray): sorted coordinates
+        values (np.ndarray): values to locate
+
+    Raises:
+        ValueError: if any value is not a coordinate of the grid
+
+    Returns:
+        np.ndarray: indexes in coords
+    """
+    index = np.clip(np.searchsorted(coords, values), 1, len(coords) - 1)
+    index = np.where(
+        np.abs(values - coords[index - 1]) <= np.abs(values - coords[index]),
+        index - 1,
+        index,
+    )
+    tolerance = np.min(np.diff(coords)) / 2 if len(coords) > 1 else 0
+    if np.any(np.abs(coords[index] - values) > tolerance):
+        raise ValueError("Grids results cells are not in the results domain-grid!")
+    return index
+
+
+def _get_cache_path(dir_path: Path, result_type: str, cache_dir: str = None) -> Path:
+    """Path of the cache file for a type of results of a results directory
+
+    Args:
+        dir_path (Path): path to the results directory
+        result_type (str): 'particles', 'properties', or 'grids'
+        cache_dir (str, optional): cache directory. Defaults to ".pyteseo_cache" next to dir_path.
+
+    Returns:
+        Path: path to the cache file
+    """
+    dir_path = Path(dir_path).resolve()
+    if cache_dir is None:
+        cache_dir = Path(dir_path.parent, DIRECTORY_NAMES["cache"])
+    return Path(cache_dir, f"{result_type}_{dir_path.name}.npz")
+
+
+def _grid_file_time(path: str) -> float:
+    """Time (h) of a grids results file, from its first row (or its name in minutes if empty)
+
+    Args:
+        path (str): path to the grids results file
+
+    Returns:
+        float: time (h)
+    """
+    df = pd.read_csv(
+        path,
+        sep=",",
+        header=0,
+        usecols=[0],
+        nrows=1,
+        encoding="iso-8859-1",
+        skipinitialspace=True,
+    )
+    if df.empty:
+        return int(Path(path).stem.split("_")[-1]) / 60
+    return float(df.iloc[0, 0])
+
+
+def _read_results_file(path: str) -> pd.DataFrame:
+    """Read a single TESEO's results file (particles, properties, grids or grid coordinates)
+
+    Args:
+        path (str): path to the results file
+
+    Returns:
+        pd.DataFrame: DataFrame with TESEO's original column names
+    """
+    return pd.read_csv(
+        path,
+        sep=",",
+        header=0,
+        encoding="iso-8859-1",
+        skipinitialspace=True,
+    )
 
 
 def _rename_results_names(
@@ -156,6 +518,7 @@ def _add_inactive_cells(
     df_spill: pd.DataFrame, minimum_grid: pd.DataFrame, spill_id: int
 ) -> pd.DataFrame:
     """Concatenate active and inactive cells of grids results.
+    The dense grid (time, cell) is built at once and active cells are placed by index arithmetic.
 
     Args:
         df_spill (pd.DataFrame): active celss for specific spill.
@@ -165,16 +528,42 @@ def _add_inactive_cells(
     Returns:
         pd.DataFrame: spill grid results in minimum grid-results area
     """
-    full_df = []
-    for time, df in df_spill.groupby("time (h)"):
-        tmp = pd.concat([minimum_grid, df])
-        tmp["spill_id (-)"] = spill_id
-        tmp["time (h)"] = time
-        full_df.append(tmp)
-
-    return pd.concat(full_df).drop_duplicates(
-        ["longitude (º)", "latitude (º)"], ignore_index=True, keep="last"
+    t, x, y = "time (h)", "longitude (º)", "latitude (º)"
+    columns = list(minimum_grid.columns) + [
+        column for column in df_spill.columns if column not in minimum_grid.columns
+    ]
+    value_columns = [
+        column for column in columns if column not in [t, x, y, "spill_id (-)"]
+    ]
+
+    times = np.sort(df_spill[t].unique())
+    n_times, n_cells = len(times), len(minimum_grid)
+
+    cell_index = pd.MultiIndex.from_frame(minimum_grid[[x, y]]).get_indexer(
+        pd.MultiIndex.from_frame(df_spill[[x, y]])
     )
+    time_index = np.searchsorted(times, df_spill[t].values)
+    in_grid = cell_index >= 0
+    position = time_index[in_grid] * n_cells + cell_index[in_grid]
+
+    data = {
+        x: np.tile(minimum_grid[x].values, n_times),
+        y: np.tile(minimum_grid[y].values, n_times),
+        t: np.repeat(times, n_cells),
+    }
+    for column in value_columns:
+        values = np.full(n_times * n_cells, np.nan)
+        values[position] = df_spill[column].values[in_grid]
+        data[column] = values
+    data["spill_id (-)"] = np.full(n_times * n_cells, spill_id)
+
+    df = pd.DataFrame(data, columns=columns)
+    if not in_grid.all():
+        # NOTE - active cells out of the results grid are kept after the dense grid
+        outside = df_spill.loc[~in_grid].assign(**{"spill_id (-)": spill_id})
+        df = pd.concat([df, outside[columns]])
+
+    return df.reset_index(drop=True)
 
 
 def get_minimum_grid(fullgrid: pd.DataFrame, df_spill: pd.DataFrame) -> pd.DataFrame:
@@ -1,3 +1,9 @@
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from shutil import copy2
+
 import numpy as np
 
 from pyteseo.defaults import COORDINATE_NAMES
@@ -9,6 +15,15 @@ def _check_cte_dt(df):
         print(f"WARNING: Forcing time steps are not constant {dt}")
 
 
+def _calculate_step(values, name="step"):
+    steps = np.unique(np.diff(values))
+    if len(steps) == 0:
+        return None
+    if len(steps) > 1:
+        print(f"WARNING: {name} is not constant!")
+    return steps[0]
+
+
 def _check_lonlat_range(df):
     if (
         df.lon.max() >= 180
@@ -50,3 +65,141 @@ def _add_default_parameters(d, d_defaults):
         if default_key not in d.keys():
             d[default_key] = d_defaults[default_key]
     return d
+
+
+def _parallel_map(func, items, n_workers=1, executor="thread"):
+    """apply func to every item, optionally on a pool, keeping the input order
+
+    Args:
+        func (callable): function to apply (module-level if executor is "process").
+        items (iterable): items to process.
+        n_workers (int, optional): number of workers, 1 runs serially. Defaults to 1.
+        executor (str, optional): "thread" or "process". Defaults to "thread".
+
+    Returns:
+        list: results in the same order as items
+    """
+    items = list(items)
+    if n_workers is None or n_workers < 1:
+        raise ValueError(f"n_workers should be a positive integer, got {n_workers}")
+    if executor == "thread":
+        pool = ThreadPoolExecutor
+    elif executor == "process":
+        pool = ProcessPoolExecutor
+    else:
+        raise ValueError(f"Invalid executor: {executor}. Allowed ['thread', 'process']")
+
+    if n_workers == 1 or len(items) <= 1:
+        return [func(item) for item in items]
+    with pool(max_workers=min(n_workers, len(items))) as ex:
+        return list(ex.map(func, items))
+
+
+def _write_table(
+    f, columns, float_format="%.8e", na_rep="nan", sep="\t", chunk_size=2**16
+):
+    """write columns as delimited text rows (see _format_table)
+
+    Args:
+        f (file object): opened text file.
+        columns (list[np.ndarray]): 1d arrays of the same length (one per column).
+        float_format (str, optional): format of float columns. Defaults to "%.8e".
+        na_rep (str, optional): representation of NaN values. Defaults to "nan".
+        sep (str, optional): column delimiter. Defaults to "\\t".
+        chunk_size (int, optional): rows formatted at once. Defaults to 2**16.
+    """
+    for text in _format_table(columns, float_format, na_rep, sep, chunk_size):
+        f.write(text)
+
+
+def _format_table(
+    columns, float_format="%.8e", na_rep="nan", sep="\t", chunk_size=2**16
+):
+    """format columns as delimited text rows, each block of rows with one %-operation
+
+    Args:
+        columns (list[np.ndarray]): 1d arrays of the same length (one per column).
+        float_format (str, optional): format of float columns. Defaults to "%.8e".
+        na_rep (str, optional): representation of NaN values. Defaults to "nan".
+        sep (str, optional): column delimiter. Defaults to "\\t".
+        chunk_size (int, optional): rows formatted at once. Defaults to 2**16.
+
+    Yields:
+        str: text of each block of rows (lines ended by "\\n")
+    """
+    formats = [
+        float_format if np.asarray(column).dtype.kind == "f" else "%s"
+        for column in columns
+    ]
+    n_rows = len(columns[0]) if columns else 0
+    if not n_rows:
+        return
+
+    if all(fmt == float_format for fmt in formats):
+        table = np.column_stack(columns).astype(float)
+    else:
+        table = np.empty((n_rows, len(columns)), dtype=object)
+        for i, column in enumerate(columns):
+            table[:, i] = column
+    row = sep.join(formats) + "\n"
+    na_rep = str(na_rep)
+
+    for start in range(0, n_rows, chunk_size):
+        block = table[start : start + chunk_size]
+        text = (row * len(block)) % tuple(block.ravel().tolist())
+        # NOTE - "%e" writes NaN as "nan", which never appears in a formatted number
+        if na_rep != "nan":
+            text = text.replace("nan", na_rep)
+        yield text
+
+
+def _segment_distance(p: np.ndarray, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """euclidean distance from points p to segments a-b (broadcasted)"""
+    ab = b - a
+    ab2 = np.sum(ab**2, axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = np.where(ab2 > 0, np.sum((p - a) * ab, axis=-1) / ab2, 0.0)
+    t = np.clip(t, 0, 1)
+    return np.linalg.norm(p - (a + t[..., None] * ab), axis=-1)
+
+
+def _file_checksum(path, algorithm="sha256", block_size=2**20):
+    """hexadecimal checksum of a file read by blocks"""
+    h = hashlib.new(algorithm)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _share_file(src, dst, mode="copy"):
+    """make src available at dst by copy, hardlink or symlink
+
+    Args:
+        src (str): path to the canonical file.
+        dst (str): destination path (replaced if exists).
+        mode (str, optional): "copy", "hardlink" or "symlink". Defaults to "copy".
+
+    Returns:
+        int: bytes saved (not duplicated in disk)
+    """
+    src, dst = Path(src).resolve(), Path(dst)
+    if mode not in ["copy", "hardlink", "symlink"]:
+        raise ValueError(
+            f"Invalid mode: {mode}. Allowed ['copy', 'hardlink', 'symlink']"
+        )
+    if dst.is_symlink() or dst.exists():
+        dst.unlink()
+
+    if mode == "hardlink":
+        try:
+            os.link(src, dst)
+            return src.stat().st_size
+        except OSError as err:
+            print(f"WARNING: hardlink not possible ({err}), copying {src.name}")
+    elif mode == "symlink":
+        dst.symlink_to(src)
+        return src.stat().st_size
+
+    copy2(src, dst)
+    return 0
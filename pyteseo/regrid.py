@@ -0,0 +1,355 @@
+"""Regridding of rectilinear lon/lat fields (forcings and domain grids).
+Interpolation is separable: one sparse weight matrix per axis, computed once, cached
+and applied to every time step with two sparse products.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from collections import OrderedDict
+from threading import Lock
+
+import numpy as np
+import pandas as pd
+import xarray as xr
+from scipy import sparse
+
+from pyteseo.defaults import COORDINATE_NAMES
+
+METHODS = ["bilinear", "nearest", "conservative"]
+
+_WEIGHTS = OrderedDict()
+_WEIGHTS_LOCK = Lock()
+_WEIGHTS_MAX_SIZE = 64
+
+
+class Regridder:
+    def __init__(
+        self,
+        src_lon: np.ndarray,
+        src_lat: np.ndarray,
+        dst_lon: np.ndarray,
+        dst_lat: np.ndarray,
+        method: str = "bilinear",
+        min_weight: float = 0.0,
+    ):
+        """regrid fields from a source to a destination rectilinear lon/lat grid
+
+        Args:
+            src_lon (np.ndarray): 1d longitudes of the source grid
+            src_lat (np.ndarray): 1d latitudes of the source grid
+            dst_lon (np.ndarray): 1d longitudes of the destination grid
+            dst_lat (np.ndarray): 1d latitudes of the destination grid
+            method (str, optional): "bilinear", "nearest" or "conservative". Defaults to "bilinear".
+            min_weight (float, optional): destination points whose weight over valid (not NaN) source points is not greater are NaN. Defaults to 0.0.
+        """
+        if method not in METHODS:
+            raise ValueError(f"Invalid method: {method}. Allowed {METHODS}")
+        self.method = method
+        self.min_weight = min_weight
+        self.src_lon = np.asarray(src_lon, dtype=np.float64)
+        self.src_lat = np.asarray(src_lat, dtype=np.float64)
+        self.dst_lon = np.asarray(dst_lon, dtype=np.float64)
+        self.dst_lat = np.asarray(dst_lat, dtype=np.float64)
+
+        self.wx = _cached_weights(self.src_lon, self.dst_lon, method)
+        self.wy = _cached_weights(self.src_lat, self.dst_lat, method)
+        self.coverage = np.outer(
+            np.asarray(self.wy.sum(axis=1)).ravel(),
+            np.asarray(self.wx.sum(axis=1)).ravel(),
+        )
+
+    @classmethod
+    def from_grid(
+        cls,
+        src_lon: np.ndarray,
+        src_lat: np.ndarray,
+        grid,
+        method: str = "bilinear",
+        min_weight: float = 0.0,
+    ):
+        """regridder from a source lon/lat to the nodes of a TESEO grid
+
+        Args:
+            src_lon (np.ndarray): 1d longitudes of the source grid
+            src_lat (np.ndarray): 1d latitudes of the source grid
+            grid (Grid): destination grid (any object with x_min, x_max, nx, y_min, y_max and ny)
+            method (str, optional): "bilinear", "nearest" or "conservative". Defaults to "bilinear".
+            min_weight (float, optional): see Regridder. Defaults to 0.0.
+
+        Returns:
+            Regridder: regridder to the grid nodes
+        """
+        dst_lon, dst_lat = grid_coordinates(grid)
+        return cls(src_lon, src_lat, dst_lon, dst_lat, method, min_weight)
+
+    @property
+    def src_shape(self) -> tuple:
+        return len(self.src_lat), len(self.src_lon)
+
+    @property
+    def dst_shape(self) -> tuple:
+        return len(self.dst_lat), len(self.dst_lon)
+
+    def __call__(self, values: np.ndarray) -> np.ndarray:
+        """regrid an array (..., lat, lon) to (..., dst_lat, dst_lon), NaN values are left out and weights renormalized
+
+        Args:
+            values (np.ndarray): values on the source grid, latitude and longitude as last axes
+
+        Returns:
+            np.ndarray: values on the destination grid (NaN where no valid source)
+        """
+        values = np.asarray(values, dtype=np.float64)
+        if values.shape[-2:] != self.src_shape:
+            raise ValueError(
+                f"values should end with the source shape {self.src_shape}, got {values.shape}"
+            )
+        leading_shape = values.shape[:-2]
+        values = values.reshape(-1, *self.src_shape)
+
+        nan_mask = np.isnan(values)
+        if nan_mask.any():
+            weights = self._apply((~nan_mask).astype(np.float64))
+            values = self._apply(np.where(nan_mask, 0.0, values))
+        else:
+            weights = np.broadcast_to(self.coverage, (len(values),) + self.dst_shape)
+            values = self._apply(values)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            values = np.where(weights > self.min_weight, values / weights, np.nan)
+        return values.reshape(leading_shape + self.dst_shape)
+
+    def _apply(self, values: np.ndarray) -> np.ndarray:
+        """separable product wy @ values @ wx.T over a stack (n, lat, lon)"""
+        n, ny, nx = values.shape
+        dst_ny, dst_nx = self.dst_shape
+        values = (self.wx @ values.reshape(n * ny, nx).T).T
+        values = values.reshape(n, ny, dst_nx).transpose(1, 0, 2).reshape(ny, -1)
+        values = self.wy @ values
+        return values.reshape(dst_ny, n, dst_nx).transpose(1, 0, 2)
+
+    def regrid_dataset(
+        self,
+        ds: xr.Dataset,
+        lon_name: str = COORDINATE_NAMES["x"],
+        lat_name: str = COORDINATE_NAMES["y"],
+    ) -> xr.Dataset:
+        """regrid every variable of a Dataset depending on lon and lat (lazy if dask-backed)
+
+        Args:
+            ds (xr.Dataset): Dataset on the source grid
+            lon_name (str, optional): name of the longitude coordinate. Defaults to "lon".
+            lat_name (str, optional): name of the latitude coordinate. Defaults to "lat".
+
+        Returns:
+            xr.Dataset: Dataset on the destination grid
+        """
+        dims = [lat_name, lon_name]
+        regridded = {}
+        for varname, da in ds.data_vars.items():
+            if not set(dims).issubset(da.dims):
+                regridded[varname] = da
+                continue
+            regridded[varname] = xr.apply_ufunc(
+                self,
+                da.transpose(..., lat_name, lon_name),
+                input_core_dims=[dims],
+                output_core_dims=[dims],
+                exclude_dims=set(dims),
+                dask="parallelized",
+                output_dtypes=[np.float64],
+                dask_gufunc_kwargs={
+                    "output_sizes": dict(zip(dims, self.dst_shape)),
+                    "allow_rechunk": True,
+                },
+            )
+
+        coords = {
+            name: coord
+            for name, coord in ds.coords.items()
+            if not set(dims).intersection(coord.dims)
+        }
+        coords.update({lon_name: self.dst_lon, lat_name: self.dst_lat})
+        return xr.Dataset(regridded, coords=coords, attrs=ds.attrs)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(method={self.method}, src_shape={self.src_shape}, dst_shape={self.dst_shape})"
+
+
+def regrid_dataset(
+    ds: xr.Dataset,
+    dst_lon: np.ndarray,
+    dst_lat: np.ndarray,
+    method: str = "bilinear",
+    min_weight: float = 0.0,
+    lon_name: str = COORDINATE_NAMES["x"],
+    lat_name: str = COORDINATE_NAMES["y"],
+) -> xr.Dataset:
+    """regrid a Dataset (forcings from CMEMS, NOAA...) to a destination lon/lat grid
+
+    Args:
+        ds (xr.Dataset): Dataset on a rectilinear lon/lat grid
+        dst_lon (np.ndarray): 1d longitudes of the destination grid
+        dst_lat (np.ndarray): 1d latitudes of the destination grid
+        method (str, optional): "bilinear", "nearest" or "conservative". Defaults to "bilinear".
+        min_weight (float, optional): see Regridder. Defaults to 0.0.
+        lon_name (str, optional): name of the longitude coordinate. Defaults to "lon".
+        lat_name (str, optional): name of the latitude coordinate. Defaults to "lat".
+
+    Returns:
+        xr.Dataset: Dataset on the destination grid
+    """
+    regridder = Regridder(
+        ds[lon_name].values, ds[lat_name].values, dst_lon, dst_lat, method, min_weight
+    )
+    return regridder.regrid_dataset(ds, lon_name, lat_name)
+
+
+def regrid_dataframe(
+    df: pd.DataFrame,
+    dst_lon: np.ndarray,
+    dst_lat: np.ndarray,
+    method: str = "bilinear",
+    min_weight: float = 0.0,
+) -> pd.DataFrame:
+    """regrid a forcing DataFrame [time, lon, lat, vars...] or a grid DataFrame [lon, lat, depth]
+
+    Args:
+        df (pd.DataFrame): DataFrame with lon and lat (and optionally time) columns on a rectilinear grid
+        dst_lon (np.ndarray): 1d longitudes of the destination grid
+        dst_lat (np.ndarray): 1d latitudes of the destination grid
+        method (str, optional): "bilinear", "nearest" or "conservative". Defaults to "bilinear".
+        min_weight (float, optional): see Regridder. Defaults to 0.0.
+
+    Returns:
+        pd.DataFrame: DataFrame with the same columns on the destination grid, sorted by time, lon and lat
+    """
+    dims = [
+        COORDINATE_NAMES[key]
+        for key in ["t", "x", "y"]
+        if COORDINATE_NAMES[key] in df.columns
+    ]
+    ds = df.set_index(dims).to_xarray()
+    ds = regrid_dataset(ds, dst_lon, dst_lat, method, min_weight)
+    df_regridded = ds.transpose(*dims).to_dataframe().reset_index()
+    return df_regridded[list(df.columns)]
+
+
+def grid_coordinates(grid) -> tuple[np.ndarray, np.ndarray]:
+    """1d lon and lat of the nodes of a TESEO grid
+
+    Args:
+        grid (Grid): grid (any object with x_min, x_max, nx, y_min, y_max and ny)
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: lon, lat
+    """
+    return (
+        np.linspace(grid.x_min, grid.x_max, grid.nx),
+        np.linspace(grid.y_min, grid.y_max, grid.ny),
+    )
+
+
+def weights_1d(src: np.ndarray, dst: np.ndarray, method: str) -> sparse.csr_matrix:
+    """interpolation weights along one axis (destination x source)
+
+    Args:
+        src (np.ndarray): 1d source coordinates (strictly monotonic)
+        dst (np.ndarray): 1d destination coordinates
+        method (str): "bilinear", "nearest" or "conservative"
+
+    Returns:
+        sparse.csr_matrix: (len(dst), len(src)) weights, rows of destinations outside the source are empty
+    """
+    src = np.asarray(src, dtype=np.float64)
+    dst = np.asarray(dst, dtype=np.float64)
+    if method not in METHODS:
+        raise ValueError(f"Invalid method: {method}. Allowed {METHODS}")
+    if len(src) < 2:
+        raise ValueError("source coordinates should have at least 2 values")
+
+    order = np.argsort(src, kind="stable")
+    src = src[order]
+    if np.any(np.diff(src) <= 0):
+        raise ValueError("source coordinates should be strictly monotonic")
+
+    if method == "bilinear":
+        rows, cols, weights = _bilinear_weights(src, dst)
+    elif method == "nearest":
+        rows, cols, weights = _nearest_weights(src, dst)
+    else:
+        rows, cols, weights = _conservative_weights(src, dst)
+
+    matrix = sparse.csr_matrix(
+        (weights, (rows, order[cols])), shape=(len(dst), len(src))
+    )
+    matrix.eliminate_zeros()
+    return matrix
+
+
+def _bilinear_weights(src: np.ndarray, dst: np.ndarray) -> tuple:
+    inside = np.flatnonzero((dst >= src[0]) & (dst <= src[-1]))
+    i = np.clip(np.searchsorted(src, dst[inside], side="right") - 1, 0, len(src) - 2)
+    t = (dst[inside] - src[i]) / (src[i + 1] - src[i])
+    return np.r_[inside, inside], np.r_[i, i + 1], np.r_[1 - t, t]
+
+
+def _nearest_weights(src: np.ndarray, dst: np.ndarray) -> tuple:
+    edges = _cell_edges(src)
+    inside = np.flatnonzero((dst >= edges[0]) & (dst <= edges[-1]))
+    i = np.clip(np.searchsorted(edges, dst[inside], side="right") - 1, 0, len(src) - 1)
+    return inside, i, np.ones(len(inside))
+
+
+def _conservative_weights(src: np.ndarray, dst: np.ndarray) -> tuple:
+    if len(dst) < 2:
+        raise ValueError("conservative destination coordinates need at least 2 values")
+    src_edges = _cell_edges(src)
+    dst_order = np.argsort(dst, kind="stable")
+    dst_edges = _cell_edges(dst[dst_order])
+    lower, upper = dst_edges[:-1], dst_edges[1:]
+
+    # NOTE - source cells [first, last) overlapping each destination cell
+    first = np.clip(np.searchsorted(src_edges, lower, side="right") - 1, 0, len(src))
+    last = np.clip(np.searchsorted(src_edges, upper, side="left"), 0, len(src))
+    counts = np.maximum(last - first, 0)
+    rows = np.repeat(np.arange(len(dst)), counts)
+    cols = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    cols += np.repeat(first, counts)
+
+    overlap = np.minimum(upper[rows], src_edges[cols + 1]) - np.maximum(
+        lower[rows], src_edges[cols]
+    )
+    weights = np.maximum(overlap, 0) / (upper - lower)[rows]
+    return dst_order[rows], cols, weights
+
+
+def _cell_edges(centers: np.ndarray) -> np.ndarray:
+    """edges of the cells around sorted centers (half step beyond the first and last)"""
+    middle = 0.5 * (centers[1:] + centers[:-1])
+    return np.r_[
+        centers[0] - (middle[0] - centers[0]),
+        middle,
+        centers[-1] + (centers[-1] - middle[-1]),
+    ]
+
+
+def _cached_weights(src: np.ndarray, dst: np.ndarray, method: str) -> sparse.csr_matrix:
+    """weights_1d reused for the same coordinates and method (least recently used are dropped)"""
+    key = (
+        method,
+        hashlib.sha1(np.ascontiguousarray(src).tobytes()).hexdigest(),
+        hashlib.sha1(np.ascontiguousarray(dst).tobytes()).hexdigest(),
+    )
+    with _WEIGHTS_LOCK:
+        if key in _WEIGHTS:
+            _WEIGHTS.move_to_end(key)
+            return _WEIGHTS[key]
+
+    weights = weights_1d(src, dst, method)
+    with _WEIGHTS_LOCK:
+        _WEIGHTS[key] = weights
+        while len(_WEIGHTS) > _WEIGHTS_MAX_SIZE:
+            _WEIGHTS.popitem(last=False)
+    return weights
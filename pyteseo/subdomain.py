@@ -0,0 +1,196 @@
+"""Reduction of forcings and results grid to the area a spill can reach.
+The reachable envelope around each spill point is the maximum drift speed (currents plus
+a wind factor of the wind speed) times the simulation duration, widened by a safety buffer.
+"""
+
+from __future__ import annotations
+
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+import xarray as xr
+
+from pyteseo.defaults import COORDINATE_NAMES, EARTH_RADIUS
+
+
+def reachable_bbox(
+    spill_points: list[dict],
+    duration: timedelta,
+    currents: pd.DataFrame | xr.Dataset = None,
+    winds: pd.DataFrame | xr.Dataset = None,
+    wind_factor: float = 0.035,
+    buffer: float = 0.2,
+) -> tuple[float, float, float, float]:
+    """bbox reachable from the spill points within the duration at the maximum drift speed
+
+    Args:
+        spill_points (list[dict]): spill point definitions (with 'lon' and 'lat')
+        duration (timedelta): simulation duration
+        currents (pd.DataFrame | xr.Dataset, optional): currents with 'u' and 'v' or 'mod' (m/s). Defaults to None.
+        winds (pd.DataFrame | xr.Dataset, optional): winds with 'u' and 'v' or 'mod' (m/s). Defaults to None.
+        wind_factor (float, optional): fraction of the wind speed transferred to the drift. Defaults to 0.035.
+        buffer (float, optional): safety buffer as a fraction of the reachable distance. Defaults to 0.2.
+
+    Returns:
+        tuple[float, float, float, float]: lon_min, lat_min, lon_max, lat_max
+    """
+    if not spill_points:
+        raise ValueError("spill_points should contain at least one spill point")
+    if buffer < 0:
+        raise ValueError(f"buffer should be positive, got {buffer}")
+
+    speed = _max_speed(currents) + wind_factor * _max_speed(winds)
+    distance = speed * duration.total_seconds() * (1 + buffer)
+    print(
+        f"Reachable distance: {distance / 1000:.1f} km (max drift speed {speed:.2f} m/s)"
+    )
+
+    lon = np.array([spill_point["lon"] for spill_point in spill_points], dtype=float)
+    lat = np.array([spill_point["lat"] for spill_point in spill_points], dtype=float)
+    dlat = np.degrees(distance / EARTH_RADIUS)
+    # NOTE - meridians converge, the widest longitude span is at the most poleward latitude
+    poleward = np.minimum(np.maximum(np.abs(lat - dlat), np.abs(lat + dlat)), 89.0)
+    dlon = np.minimum(
+        np.degrees(distance / (EARTH_RADIUS * np.cos(np.radians(poleward)))), 180.0
+    )
+
+    return (
+        float(max(np.min(lon - dlon), -180.0)),
+        float(max(np.min(lat - dlat), -90.0)),
+        float(min(np.max(lon + dlon), 180.0)),
+        float(min(np.max(lat + dlat), 90.0)),
+    )
+
+
+def crop_to_bbox(
+    data: pd.DataFrame | xr.Dataset, bbox: tuple, margin: int = 1
+) -> pd.DataFrame | xr.Dataset:
+    """crop a forcing or grid to a bbox keeping margin nodes beyond each side
+
+    Args:
+        data (pd.DataFrame | xr.Dataset): forcing [time, lon, lat, ...] or grid [lon, lat, depth]
+        bbox (tuple): lon_min, lat_min, lon_max, lat_max
+        margin (int, optional): nodes kept outside the bbox (for interpolation at the edges). Defaults to 1.
+
+    Returns:
+        pd.DataFrame | xr.Dataset: cropped data (spatially cte forcings are returned as they are)
+    """
+    x, y = COORDINATE_NAMES["x"], COORDINATE_NAMES["y"]
+    if x not in _names(data) or y not in _names(data):
+        return data
+
+    lon_min, lat_min, lon_max, lat_max = bbox
+    lon = np.unique(np.asarray(data[x]))
+    lat = np.unique(np.asarray(data[y]))
+    lon_range = _crop_range(lon, lon_min, lon_max, margin, x)
+    lat_range = _crop_range(lat, lat_min, lat_max, margin, y)
+
+    if isinstance(data, xr.Dataset):
+        return data.isel(
+            {
+                x: _between(data[x].values, *lon_range),
+                y: _between(data[y].values, *lat_range),
+            }
+        )
+    mask = _between(data[x].to_numpy(), *lon_range) & _between(
+        data[y].to_numpy(), *lat_range
+    )
+    return data[mask].reset_index(drop=True)
+
+
+def crop_to_reachable_area(
+    parameters: dict,
+    currents: pd.DataFrame | xr.Dataset = None,
+    winds: pd.DataFrame | xr.Dataset = None,
+    waves: pd.DataFrame | xr.Dataset = None,
+    results_grid: pd.DataFrame = None,
+    wind_factor: float = 0.035,
+    buffer: float = 0.2,
+    margin: int = 1,
+) -> dict:
+    """crop forcings and results grid to the area reachable by the spill (before write_2d_forcing and write_grid)
+
+    Args:
+        parameters (dict): simulation parameters with 'spill_points' and 'duration' (as for TeseoWrapper.setup)
+        currents (pd.DataFrame | xr.Dataset, optional): currents [time, lon, lat, u, v]. Defaults to None.
+        winds (pd.DataFrame | xr.Dataset, optional): winds [time, lon, lat, u, v]. Defaults to None.
+        waves (pd.DataFrame | xr.Dataset, optional): waves [time, lon, lat, hs, dir, tp]. Defaults to None.
+        results_grid (pd.DataFrame, optional): results grid [lon, lat, depth]. Defaults to None.
+        wind_factor (float, optional): fraction of the wind speed transferred to the drift. Defaults to 0.035.
+        buffer (float, optional): safety buffer as a fraction of the reachable distance. Defaults to 0.2.
+        margin (int, optional): nodes kept outside the reachable bbox. Defaults to 1.
+
+    Returns:
+        dict: cropped data of the inputs passed ('currents', 'winds', 'waves', 'results_grid') and the 'bbox'
+    """
+    bbox = reachable_bbox(
+        parameters["spill_points"],
+        parameters["duration"],
+        currents,
+        winds,
+        wind_factor,
+        buffer,
+    )
+    print(f"Reachable bbox: {tuple(round(limit, 4) for limit in bbox)}")
+
+    cropped = {"bbox": bbox}
+    inputs = {
+        "currents": currents,
+        "winds": winds,
+        "waves": waves,
+        "results_grid": results_grid,
+    }
+    for name, data in inputs.items():
+        if data is None:
+            continue
+        cropped[name] = crop_to_bbox(data, bbox, margin)
+        print(
+            f"{name}: {_n_points(data)} -> {_n_points(cropped[name])} points per time"
+        )
+    return cropped
+
+
+def _max_speed(forcing: pd.DataFrame | xr.Dataset) -> float:
+    if forcing is None:
+        return 0.0
+    # NOTE - spatially cte forcings (read_cte_forcing) are given as mod and dir
+    if "mod" in _names(forcing):
+        speed = np.abs(np.asarray(forcing["mod"], dtype=float))
+    else:
+        speed = np.hypot(np.asarray(forcing["u"]), np.asarray(forcing["v"]))
+    if not np.isfinite(speed).any():
+        return 0.0
+    return float(np.nanmax(speed))
+
+
+def _names(data: pd.DataFrame | xr.Dataset) -> list:
+    if isinstance(data, xr.Dataset):
+        return list(data.variables)
+    return list(data.columns)
+
+
+def _n_points(data: pd.DataFrame | xr.Dataset) -> int:
+    x, y = COORDINATE_NAMES["x"], COORDINATE_NAMES["y"]
+    if x not in _names(data) or y not in _names(data):
+        return 1
+    if isinstance(data, xr.Dataset):
+        return data.sizes[x] * data.sizes[y]
+    return len(data[[x, y]].drop_duplicates())
+
+
+def _crop_range(
+    values: np.ndarray, vmin: float, vmax: float, margin: int, name: str
+) -> tuple[float, float]:
+    """limits of the sorted values inside [vmin, vmax] plus margin values on each side"""
+    if vmax < values[0] or vmin > values[-1]:
+        raise ValueError(
+            f"Reachable {name} range [{vmin}, {vmax}] does not overlap data [{values[0]}, {values[-1]}]"
+        )
+    start = max(np.searchsorted(values, vmin, side="left") - margin, 0)
+    stop = min(np.searchsorted(values, vmax, side="right") + margin, len(values))
+    return values[start], values[stop - 1]
+
+
+def _between(values: np.ndarray, vmin: float, vmax: float) -> np.ndarray:
+    return (values >= vmin) & (values <= vmax)
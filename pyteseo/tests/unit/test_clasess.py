@@ -1,6 +1,11 @@
+import asyncio
+import subprocess
+import sys
 from pathlib import Path
 from shutil import copyfile, rmtree
 
+import numpy as np
+import pandas as pd
 import pytest
 
 from pyteseo.__init__ import __version__ as v
@@ -10,6 +15,8 @@ from pyteseo.classes import (
     Waves,
     Winds,
     Coastline,
+    CoastlineIndex,
+    RaggedCoastline,
 )
 from pyteseo.wrapper import TeseoWrapper
 from pyteseo.defaults import FILE_NAMES
@@ -101,6 +108,22 @@ def test_TeseoWrapper(input_files, input_files_dst, error, setup_teardown):
         assert Path(job.input_dir, FILE_NAMES["waves"]).exists()
 
 
+def test_TeseoWrapper_sidecar(setup_teardown):
+    Path(tmp_path, "input").mkdir(parents=True)
+    copyfile(Path(data_path, "grid.dat"), Path(tmp_path, "input", "grid.dat"))
+    grid_path = Path(tmp_path, "input", "grid.dat")
+
+    job = TeseoWrapper(dir_path=tmp_path)
+    job.load_inputs(sidecar=True)
+    assert job.grid.sidecar
+    assert Path(tmp_path, "input", "grid.dat.npy").exists()
+    mtime = Path(tmp_path, "input", "grid.dat.npy").stat().st_mtime_ns
+
+    job.load_inputs(sidecar=True)
+    assert Path(tmp_path, "input", "grid.dat.npy").stat().st_mtime_ns == mtime
+    pd.testing.assert_frame_equal(job.grid.load, Grid(grid_path).load)
+
+
 @pytest.mark.parametrize(
     "path, error",
     [
@@ -121,6 +144,17 @@ def test_TeseoGrid(path, error):
         assert grid.ny == 267
 
 
+def test_TeseoGrid_sidecar(setup_teardown):
+    grid_path = Path(tmp_path, "grid.dat")
+    copyfile(Path(data_path, "grid.dat"), grid_path)
+
+    grid = Grid(grid_path, sidecar=True)
+    assert Path(tmp_path, "grid.dat.npy").exists()
+    assert grid.nx == 238
+    assert grid.ny == 267
+    assert grid.load.equals(Grid(grid_path).load)
+
+
 @pytest.mark.parametrize(
     "path, error",
     [
@@ -137,6 +171,90 @@ def test_TeseoCoastline(path, error):
         assert isinstance(coastline.path, str)
 
 
+@pytest.mark.parametrize(
+    "filename", [("coastline.dat"), ("coastline_othernanformat.dat")]
+)
+def test_RaggedCoastline(filename, setup_teardown):
+    coastline = Coastline(Path(data_path, filename))
+    df = coastline.load
+    ragged = coastline.ragged
+
+    assert ragged.n_polygons == len(ragged) == coastline.n_polygons
+    assert ragged.n_vertices == df.notna().all(axis=1).sum()
+    pd.testing.assert_frame_equal(ragged.to_dataframe(), df)
+
+    polygon = df.loc[ragged.polygon_ids[1]].dropna().to_numpy()
+    np.testing.assert_array_equal(ragged[1], polygon)
+    np.testing.assert_array_equal(ragged[-1], list(ragged)[-1])
+    with pytest.raises(IndexError):
+        ragged[ragged.n_polygons]
+
+    bounds = df.groupby(level="polygon").agg(["min", "max"])
+    np.testing.assert_allclose(ragged.bounds[:, 0], bounds[("lon", "min")])
+    np.testing.assert_allclose(ragged.bounds[:, 1], bounds[("lat", "min")])
+    np.testing.assert_allclose(ragged.bounds[:, 2], bounds[("lon", "max")])
+    np.testing.assert_allclose(ragged.bounds[:, 3], bounds[("lat", "max")])
+
+    ragged.to_npz(Path(tmp_path, "coastline.npz"))
+    loaded = RaggedCoastline.from_npz(Path(tmp_path, "coastline.npz"))
+    pd.testing.assert_frame_equal(loaded.to_dataframe(), df)
+
+
+def test_CoastlineIndex():
+    # NOTE - island [0, 1]x[0, 1] with a lake [0.4, 0.6]x[0.4, 0.6] and a small islet at [2, 2.1]x[0, 0.1]
+    ragged = RaggedCoastline(
+        [
+            [0, 0], [1, 0], [1, 1], [0, 1], [0, 0],
+            [0.4, 0.4], [0.6, 0.4], [0.6, 0.6], [0.4, 0.6],
+            [2, 0], [2.1, 0], [2.1, 0.1], [2, 0.1],
+        ],
+        [0, 5, 9, 13],
+    )  # fmt: skip
+    index = CoastlineIndex(ragged, n_bins=3)
+    lon = np.array([[0.2, 0.5, 1.5], [2.05, -1, 0.5]])
+    lat = np.array([[0.2, 0.5, 0.5], [0.05, 0.5, 0.2]])
+
+    np.testing.assert_array_equal(
+        index.contains(lon, lat), [[True, False, False], [True, False, True]]
+    )
+    meters = index.earth_radius * np.deg2rad(1)
+    cos_lat0 = np.cos(np.deg2rad(0.5))
+    np.testing.assert_allclose(
+        index.distance(lon, lat),
+        [
+            [0.2 * meters * cos_lat0, 0.1 * meters * cos_lat0, 0.5 * meters * cos_lat0],
+            [0.05 * meters * cos_lat0, 1 * meters * cos_lat0, 0.2 * meters],
+        ],
+    )
+
+
+def test_CoastlineIndex_coastline_file():
+    coastline = Coastline(Path(data_path, "coastline.dat"))
+    index = coastline.spatial_index
+    df = coastline.load.dropna()
+    lon, lat = df["lon"].to_numpy(), df["lat"].to_numpy()
+
+    assert isinstance(index, CoastlineIndex)
+    np.testing.assert_allclose(index.distance(lon, lat), 0, atol=1e-6)
+    assert not index.contains(lon.min() - 1, lat.min() - 1)
+
+    index_dense = CoastlineIndex(coastline.ragged, n_bins=1, max_pairs=1000)
+    lon_points = np.linspace(coastline.x_min, coastline.x_max, 50)
+    lat_points = np.linspace(coastline.y_min, coastline.y_max, 50)
+    lon_points, lat_points = np.meshgrid(lon_points, lat_points)
+    np.testing.assert_array_equal(
+        index.contains(lon_points, lat_points),
+        index_dense.contains(lon_points, lat_points),
+    )
+
+
+def test_RaggedCoastline_bad_offsets():
+    with pytest.raises(ValueError):
+        RaggedCoastline(np.zeros((4, 2)), [0, 3])
+    with pytest.raises(ValueError):
+        RaggedCoastline(np.zeros((4, 2)), [0, 3, 2, 4])
+
+
 @pytest.mark.parametrize(
     "path, dt_cte",
     [
@@ -212,3 +330,41 @@ def test_TeseoWaves(path, dt_cte):
         assert "hs" in winds.load.keys()
         assert "dir" in winds.load.keys()
         assert "tp" in winds.load.keys()
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="fake TESEO binary is a script")
+@pytest.mark.parametrize("exit_code, status", [(0, "finished"), (3, "failed")])
+def test_TeseoWrapper_execute_simulation_async(exit_code, status, setup_teardown):
+    job = TeseoWrapper(dir_path=tmp_path)
+    job.teseo_binary_path = Path(job.path, "teseo")
+    job.teseo_binary_path.write_text(
+        f"#!{sys.executable}\n"
+        "import sys, time\n"
+        "time.sleep(0.2)\n"
+        "print('running', sys.argv[1])\n"
+        f"sys.exit({exit_code})\n"
+    )
+    job.teseo_binary_path.chmod(0o755)
+    job.cfg_path = str(Path(job.path, "teseo.cfg"))
+
+    async def run_simulations():
+        handles = [await job.execute_simulation_async() for _ in range(3)]
+        assert all(handle.status == "running" for handle in handles)
+        assert all(handle.returncode is None for handle in handles)
+        return [await handle.wait() for handle in handles]
+
+    handles = asyncio.run(run_simulations())
+    for handle in handles:
+        assert handle.status == status
+        assert handle.returncode == exit_code
+        assert handle.stdout.strip() == f"running {job.cfg_path}"
+        assert handle.elapsed >= 0.2
+
+    if exit_code:
+        with pytest.raises(subprocess.CalledProcessError):
+            asyncio.run(_wait_checked(job))
+
+
+async def _wait_checked(job):
+    handle = await job.execute_simulation_async()
+    await handle.wait(check=True)
@@ -0,0 +1,332 @@
+from datetime import datetime, timedelta
+from pathlib import Path
+from shutil import rmtree
+from threading import Lock
+from time import sleep
+
+import numpy as np
+import pandas as pd
+import pytest
+import xarray as xr
+from requests.sessions import Session
+
+import pyteseo.connections.cmems as cmems
+import pyteseo.connections.noaa as noaa
+from pyteseo.__init__ import __version__ as v
+from pyteseo.connections.cache import DatasetCache, _missing_intervals
+from pyteseo.connections.download import fetch_in_chunks, split_timebox
+
+tmp_path = Path(f"./tmp_pyteseo_{v}_tests")
+bbox = (-4.0, 43.0, -3.0, 44.0)
+
+
+@pytest.fixture
+def setup_teardown():
+    if not tmp_path.exists():
+        tmp_path.mkdir()
+    yield
+    if tmp_path.exists():
+        rmtree(tmp_path)
+
+
+def create_dataset(varnames=("u", "v")):
+    """local stand-in of a remote hourly dataset"""
+    time = pd.date_range("2023-01-01", "2023-01-05", freq="h")
+    lon = np.arange(-5, -2, 0.25)
+    lat = np.arange(42, 45, 0.25)
+    shape = (len(time), len(lat), len(lon))
+    return xr.Dataset(
+        {
+            varname: (("time", "lat", "lon"), np.random.rand(*shape))
+            for varname in varnames
+        },
+        coords={"time": time, "lat": lat, "lon": lon},
+    )
+
+
+class Fetcher:
+    def __init__(self, ds, fail_first_attempt=False, delay=0):
+        self.ds = ds
+        self.calls = []
+        self.fail_first_attempt = fail_first_attempt
+        self.delay = delay
+        self.running = 0
+        self.max_running = 0
+        self.lock = Lock()
+
+    def __call__(self, timebox):
+        with self.lock:
+            self.calls.append(timebox)
+            failed = self.fail_first_attempt and self.calls.count(timebox) == 1
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        sleep(self.delay)
+        with self.lock:
+            self.running -= 1
+        if failed:
+            raise OSError("connection reset")
+        return self.ds.sel(time=slice(*timebox))
+
+
+def hours(*values):
+    return tuple(pd.Timestamp("2023-01-01") + pd.Timedelta(hours=h) for h in values)
+
+
+@pytest.mark.parametrize(
+    "timebox, intervals, missing",
+    [
+        (hours(0, 10), [], [hours(0, 10)]),
+        (hours(0, 10), [hours(0, 10)], []),
+        (hours(2, 8), [hours(0, 10)], []),
+        (hours(0, 10), [hours(0, 4)], [hours(4, 10)]),
+        (hours(0, 10), [hours(6, 12)], [hours(0, 6)]),
+        (
+            hours(0, 10),
+            [hours(2, 4), hours(6, 8)],
+            [hours(0, 2), hours(4, 6), hours(8, 10)],
+        ),
+        (hours(0, 10), [hours(0, 5), hours(5, 10)], []),
+        (hours(3, 3), [hours(5, 10)], [hours(3, 3)]),
+    ],
+)
+def test_missing_intervals(timebox, intervals, missing):
+    assert _missing_intervals(timebox, intervals) == missing
+
+
+def test_DatasetCache(setup_teardown):
+    ds = create_dataset()
+    fetch = Fetcher(ds)
+    cache = DatasetCache(Path(tmp_path, "cache"))
+    timebox = (datetime(2023, 1, 1), datetime(2023, 1, 2))
+
+    ds1 = cache.get("file://stand-in", ["u", "v"], bbox, timebox, fetch)
+    xr.testing.assert_equal(ds1, ds.sel(time=slice(*timebox)))
+    assert len(fetch.calls) == 1
+
+    ds2 = cache.get("file://stand-in", ["v", "u"], bbox, timebox, fetch)
+    xr.testing.assert_equal(ds2, ds1)
+    assert len(fetch.calls) == 1
+
+    timebox = (datetime(2023, 1, 1, 12), datetime(2023, 1, 3))
+    ds3 = cache.get("file://stand-in", ["u", "v"], bbox, timebox, fetch)
+    xr.testing.assert_equal(ds3, ds.sel(time=slice(*timebox)))
+    assert fetch.calls[-1] == (datetime(2023, 1, 2), datetime(2023, 1, 3))
+    assert len(list(Path(tmp_path, "cache").glob("*/*.nc"))) == 2
+
+    cache.clear()
+    assert cache.size == 0
+
+
+def test_DatasetCache_eviction(setup_teardown):
+    ds = create_dataset()
+    fetch = Fetcher(ds)
+    timebox = (datetime(2023, 1, 1), datetime(2023, 1, 2))
+
+    cache = DatasetCache(Path(tmp_path, "cache"))
+    cache.get("file://stand-in", ["u"], bbox, timebox, fetch)
+    size = cache.size
+
+    cache.max_size = int(1.5 * size)
+    cache.get("file://stand-in", ["v"], bbox, timebox, fetch)
+    assert cache.size <= cache.max_size
+    cache.get("file://stand-in", ["v"], bbox, timebox, fetch)
+    assert len(fetch.calls) == 2
+    cache.get("file://stand-in", ["u"], bbox, timebox, fetch)
+    assert len(fetch.calls) == 3
+
+
+def test_DatasetCache_partial_fetch(setup_teardown):
+    ds = create_dataset()
+    fetch = Fetcher(ds.sel(time=slice(None, "2023-01-01T12")))
+    cache = DatasetCache(Path(tmp_path, "cache"))
+    timebox = (datetime(2023, 1, 1), datetime(2023, 1, 2))
+
+    ds1 = cache.get("file://stand-in", ["u", "v"], bbox, timebox, fetch)
+    assert ds1["time"].values[-1] == np.datetime64("2023-01-01T12")
+
+    fetch.ds = ds
+    ds2 = cache.get("file://stand-in", ["u", "v"], bbox, timebox, fetch)
+    xr.testing.assert_equal(ds2, ds.sel(time=slice(*timebox)))
+    assert fetch.calls[-1] == (datetime(2023, 1, 1, 12), datetime(2023, 1, 2))
+    assert len(fetch.calls) == 2
+
+
+def test_access_global_currents_cache(monkeypatch, setup_teardown):
+    ds = create_dataset(["utotal", "vtotal"])
+    calls = []
+
+    def fake_fetch_subset(timebox, **kwargs):
+        calls.append(timebox)
+        return ds.sel(time=slice(*timebox))
+
+    monkeypatch.setattr(cmems, "_fetch_subset", fake_fetch_subset)
+    cache = DatasetCache(Path(tmp_path, "cache"))
+    timebox = (datetime(2023, 1, 1, 6), datetime(2023, 1, 2, 6))
+
+    df1 = cmems.access_global_currents("user", "pass", bbox, timebox, cache=cache)
+    df2 = cmems.access_global_currents("user", "pass", bbox, timebox, cache=cache)
+
+    assert len(calls) == 1
+    assert calls[0][0] == timebox[0] - timedelta(hours=1)
+    pd.testing.assert_frame_equal(df1, df2)
+    assert list(df1.columns) == ["time", "lat", "lon", "u", "v"]
+
+
+@pytest.mark.parametrize(
+    "timebox, chunk, expected",
+    [
+        (hours(0, 10), timedelta(hours=5), [hours(0, 5), hours(5, 10)]),
+        (hours(0, 10), timedelta(hours=4), [hours(0, 4), hours(4, 8), hours(8, 10)]),
+        (hours(0, 10), timedelta(hours=12), [hours(0, 10)]),
+        (hours(3, 3), timedelta(hours=1), [hours(3, 3)]),
+    ],
+)
+def test_split_timebox(timebox, chunk, expected):
+    assert split_timebox(timebox, chunk) == list(expected)
+
+
+def test_split_timebox_bad_chunk():
+    with pytest.raises(ValueError):
+        split_timebox(hours(0, 10), timedelta(0))
+
+
+@pytest.mark.parametrize(
+    "n_workers, fail_first_attempt", [(1, False), (3, False), (3, True)]
+)
+def test_fetch_in_chunks(n_workers, fail_first_attempt):
+    ds = create_dataset()
+    fetch = Fetcher(ds, fail_first_attempt, delay=0.05)
+    timebox = (datetime(2023, 1, 1, 6), datetime(2023, 1, 4, 18))
+
+    ds_chunks = fetch_in_chunks(
+        fetch,
+        timebox,
+        chunk=timedelta(hours=12),
+        n_workers=n_workers,
+        retries=1,
+        retry_wait=0,
+    )
+    xr.testing.assert_equal(ds_chunks, ds.sel(time=slice(*timebox)))
+    assert len(fetch.calls) == 7 * (2 if fail_first_attempt else 1)
+    assert 1 < fetch.max_running <= n_workers or n_workers == 1
+
+
+def test_fetch_in_chunks_failed():
+    fetch = Fetcher(create_dataset(), fail_first_attempt=True)
+    with pytest.raises(OSError):
+        fetch_in_chunks(fetch, hours(0, 10), timedelta(hours=5), retries=0)
+
+
+def test_access_global_winds_chunks(monkeypatch):
+    ds = create_dataset(["eastward_wind", "northward_wind"])
+    calls = []
+
+    def fake_fetch_subset(timebox, **kwargs):
+        calls.append(timebox)
+        return ds.sel(time=slice(*timebox))
+
+    monkeypatch.setattr(cmems, "_fetch_subset", fake_fetch_subset)
+    timebox = (datetime(2023, 1, 1, 6), datetime(2023, 1, 3, 6))
+
+    df = cmems.access_global_winds("user", "pass", bbox, timebox)
+    df_chunks = cmems.access_global_winds(
+        "user", "pass", bbox, timebox, chunk=timedelta(days=1), n_workers=2
+    )
+
+    assert len(calls) == 1 + 3
+    pd.testing.assert_frame_equal(df, df_chunks)
+
+
+@pytest.fixture
+def fake_login(monkeypatch):
+    logins = []
+
+    def fake_setup_session(cas_url, username, password):
+        logins.append(username)
+        session = Session()
+        session.cookies.set("CASTGC", f"TGT-{len(logins)}")
+        return session
+
+    monkeypatch.setattr(cmems, "setup_session", fake_setup_session)
+    monkeypatch.setattr(cmems, "_SESSIONS", {})
+    return logins
+
+
+def test_cmems_login(fake_login):
+    session1 = cmems.cmems_login("user", "pass")
+    session2 = cmems.cmems_login("user", "pass")
+    session3 = cmems.cmems_login("other_user", "pass")
+
+    assert session1 is session2
+    assert session3 is not session1
+    assert fake_login == ["user", "other_user"]
+
+
+def test_cmems_login_expired(fake_login):
+    session1 = cmems.cmems_login("user", "pass", max_age=timedelta(0))
+    assert session1.expired
+    session2 = cmems.cmems_login("user", "pass")
+    assert session2 is not session1
+    assert not session2.expired
+
+    session2.session.cookies.set("CASTGC", "TGT-old", expires=0)
+    assert session2.expired
+    assert cmems.cmems_login("user", "pass") is not session2
+    assert len(fake_login) == 3
+
+
+class FakeCmems:
+    """authenticated session stand-in serving a local dataset"""
+
+    def __init__(self, ds):
+        self.ds = ds
+        self.urls = []
+
+    def opendap_access(self, opendap_url):
+        self.urls.append(opendap_url)
+        return self.ds
+
+
+def test_access_global_currents_session(fake_login):
+    ds = create_dataset(["utotal", "vtotal"]).expand_dims(depth=[0.5])
+    ds = ds.rename({"lon": "longitude", "lat": "latitude"})
+    session = FakeCmems(ds)
+    timebox = (datetime(2023, 1, 1, 6), datetime(2023, 1, 2, 6))
+
+    df = cmems.access_global_currents(None, None, bbox, timebox, cmems=session)
+
+    assert fake_login == []
+    assert len(session.urls) == 1
+    assert df["time"].iloc[0] == 0
+    assert df["time"].iloc[-1] == 26
+    assert df["lon"].min() < bbox[0] and df["lon"].max() > bbox[2]
+
+
+@pytest.mark.parametrize("chunk", [None, timedelta(days=1)])
+def test_access_forecast_global_winds(chunk, monkeypatch, capsys):
+    ds = create_dataset(["ugrd10m", "vgrd10m", "tmp2m"])
+    ds = ds.assign_coords(lon=ds["lon"] + 360)
+    ds.encoding["source"] = "http://stand-in/gfs_0p25_1hr"
+    opened = []
+
+    def fake_open_dataset(url, engine=None):
+        opened.append((url, engine))
+        return ds
+
+    monkeypatch.setattr(noaa, "opendap_access_gfs_0p25_hourly", lambda date: ds)
+    monkeypatch.setattr(noaa.xr, "open_dataset", fake_open_dataset)
+    date = datetime(2023, 1, 3, 12)
+
+    ds_winds = noaa.access_forecast_global_winds(date, bbox, chunk=chunk)
+
+    if chunk is None:
+        assert opened == []
+    else:
+        assert opened == [(ds.encoding["source"], "pydap")] * 2
+
+    assert list(ds_winds.data_vars) == ["ugrd10m", "vgrd10m"]
+    assert ds_winds["time"].values[0] == np.datetime64(date)
+    assert ds_winds["time"].values[-1] == ds["time"].values[-1]
+    assert ds_winds["lon"].min() < bbox[0] and ds_winds["lon"].max() > bbox[2]
+    assert ds_winds["lon"].max() < 0
+    assert "MB (in-memory)" in capsys.readouterr().out
@@ -1,17 +1,23 @@
 from pathlib import Path
-from shutil import rmtree
+from shutil import copyfile, rmtree
+from types import SimpleNamespace
 
+import numpy as np
 import pandas as pd
 import pytest
 
 from pyteseo.__init__ import __version__ as v
 from pyteseo.io.domain import (
     _split_polygons,
+    clip_coastline,
+    preprocess_coastline,
     read_coastline,
+    simplify_coastline,
     read_grid,
     write_coastline,
     write_grid,
 )
+from pyteseo.io.utils import _segment_distance
 
 data_path = Path(__file__).parent.parent / "data"
 tmp_path = Path(f"./tmp_pyteseo_{v}_tests")
@@ -112,6 +118,26 @@ def test_split_polygons(filename):
     assert not coastline_df.empty
 
 
+@pytest.mark.parametrize(
+    "lon, polygons, points",
+    [
+        ([None, 1, 2, 3, None, 4, 5, 6], [1, 1, 1, 1, 2, 2, 2, 2], range(8)),
+        ([1, 2, 3, None, 4, 5, 6, None], [1, 1, 1, 2, 2, 2, 2], range(7)),
+        ([None, 1, 2, None, None, 3, 4], [1, 1, 1, 2, 3, 3, 3], range(7)),
+        ([1, 2, 3], [1, 1, 1], range(3)),
+    ],
+)
+def test_split_polygons_ids(lon, polygons, points):
+    df = pd.DataFrame({"lon": lon, "lat": lon}, dtype=float)
+
+    coastline_df = _split_polygons(df)
+
+    assert coastline_df.index.names == ["polygon", "point"]
+    assert coastline_df.index.get_level_values("polygon").tolist() == polygons
+    assert coastline_df.index.get_level_values("point").tolist() == list(points)
+    assert coastline_df.columns.tolist() == ["lon", "lat"]
+
+
 @pytest.mark.parametrize(
     "file, error",
     [
@@ -173,3 +199,120 @@ def test_write_coastline(error, setup_teardown):
         newdf = read_coastline(path=output_path)
 
         assert all(newdf.get(["lon", "lat"]) == df.get(["lon", "lat"]))
+
+
+@pytest.mark.parametrize("n_workers", [1, 2])
+def test_write_coastline_polygons(n_workers, setup_teardown):
+    df = read_coastline(path=Path(data_path, "coastline.dat"))
+    output_path = Path(tmp_path, "coastline.dat")
+
+    write_coastline(df=df, path=output_path, n_workers=n_workers)
+
+    coastline = output_path.read_text()
+    assert coastline == "".join(
+        Path(tmp_path, f"coastline_polygon_{polygon:03d}.dat").read_text()
+        for polygon in df.index.unique("polygon")
+    )
+    for polygon, group in df.groupby("polygon"):
+        polygon_df = pd.read_csv(
+            Path(tmp_path, f"coastline_polygon_{polygon:03d}.dat"),
+            sep="\t",
+            header=None,
+            names=["lon", "lat"],
+        )
+        pd.testing.assert_frame_equal(polygon_df, group.reset_index(drop=True))
+
+
+def square(x0, y0, side, polygon=1):
+    lon = [x0, x0 + side, x0 + side, x0, x0]
+    lat = [y0, y0, y0 + side, y0 + side, y0]
+    return pd.DataFrame(
+        {"lon": lon, "lat": lat},
+        index=pd.MultiIndex.from_arrays(
+            [[polygon] * 5, range(5)], names=["polygon", "point"]
+        ),
+    )
+
+
+@pytest.mark.parametrize(
+    "bbox, expected",
+    [
+        ((-1, -1, 3, 3), [[0, 0], [2, 0], [2, 2], [0, 2], [0, 0]]),
+        ((1, 1, 3, 3), [[1, 1], [2, 1], [2, 2], [1, 2], [1, 1]]),
+        ((0.5, -1, 1.5, 3), [[0.5, 0], [1.5, 0], [1.5, 2], [0.5, 2], [0.5, 0]]),
+        ((3, 3, 4, 4), []),
+    ],
+)
+def test_clip_coastline(bbox, expected):
+    df = clip_coastline(square(0, 0, 2), bbox)
+
+    assert df.index.names == ["polygon", "point"]
+    np.testing.assert_allclose(df.to_numpy(), np.reshape(expected, (-1, 2)))
+
+
+def test_clip_coastline_bad_bbox():
+    with pytest.raises(ValueError):
+        clip_coastline(square(0, 0, 2), (1, 1, 0, 3))
+
+
+def test_simplify_coastline():
+    df = read_coastline(Path(data_path, "coastline.dat"))
+    tolerance = 2e-4
+
+    simplified = simplify_coastline(df, tolerance)
+
+    assert len(simplified.dropna()) < len(df.dropna()) / 10
+    assert simplified.index.unique("polygon").tolist() == [1, 2, 3, 4]
+    for polygon, group in df.groupby("polygon"):
+        vertices = group.dropna().to_numpy()
+        ring = simplified.loc[polygon].dropna().to_numpy()
+        distance = _segment_distance(vertices[:, None], ring, np.roll(ring, -1, axis=0))
+        assert distance.min(axis=1).max() <= tolerance + 1e-12
+        np.testing.assert_array_equal(ring[0], vertices[0])
+
+
+def test_simplify_coastline_drops_small_polygons():
+    df = pd.concat([square(0, 0, 1), square(5, 5, 0.01, polygon=2)])
+
+    simplified = simplify_coastline(df, tolerance=0.1)
+
+    assert simplified.index.unique("polygon").tolist() == [1]
+    assert len(simplified) == 5
+
+
+def test_preprocess_coastline(capsys, setup_teardown):
+    df = read_coastline(Path(data_path, "coastline.dat"))
+    grid = SimpleNamespace(
+        x_min=-3.80, x_max=-3.74, y_min=43.40, y_max=43.50, dx=0.001, dy=0.001
+    )
+
+    new_df = preprocess_coastline(df, grid)
+
+    assert "Coastline vertices: 14737 -> " in capsys.readouterr().out
+    assert len(new_df.dropna()) < len(df.dropna())
+    assert new_df["lon"].min() >= grid.x_min - grid.dx
+    assert new_df["lon"].max() <= grid.x_max + grid.dx
+    assert new_df["lat"].min() >= grid.y_min - grid.dy
+    assert new_df["lat"].max() <= grid.y_max + grid.dy
+
+    output_path = Path(tmp_path, "coastline.dat")
+    write_coastline(new_df, output_path)
+    pd.testing.assert_frame_equal(read_coastline(output_path), new_df)
+
+
+def test_read_grid_sidecar(setup_teardown):
+    grid_path = Path(tmp_path, "grid.dat")
+    copyfile(Path(data_path, "grid.dat"), grid_path)
+    df = read_grid(grid_path)
+
+    df_first = read_grid(grid_path, sidecar=True)
+    assert Path(tmp_path, "grid.dat.npy").exists()
+    assert Path(tmp_path, "grid.dat.json").exists()
+    df_sidecar = read_grid(grid_path, sidecar=True)
+    pd.testing.assert_frame_equal(df, df_first)
+    pd.testing.assert_frame_equal(df, df_sidecar)
+
+    df.iloc[:10].to_csv(grid_path, sep="\t", header=False, index=False, na_rep=-999)
+    df_updated = read_grid(grid_path, sidecar=True)
+    pd.testing.assert_frame_equal(df_updated, read_grid(grid_path))
+    assert len(df_updated) == 10
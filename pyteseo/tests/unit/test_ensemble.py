@@ -0,0 +1,242 @@
+import multiprocessing
+import os
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+from shutil import copyfile, rmtree
+
+import pandas as pd
+import pytest
+
+import pyteseo.ensemble as ensemble_module
+from pyteseo.__init__ import __version__ as v
+from pyteseo.ensemble import TeseoEnsemble
+
+data_path = Path(__file__).parent.parent / "data"
+tmp_path = Path(f"./tmp_pyteseo_{v}_tests")
+
+pytestmark = pytest.mark.skipif(
+    sys.platform == "win32", reason="fake TESEO binary is a script"
+)
+
+
+@pytest.fixture
+def setup_teardown():
+    if not tmp_path.exists():
+        tmp_path.mkdir()
+    yield
+    if tmp_path.exists():
+        rmtree(tmp_path)
+
+
+def create_inputs(dir_path):
+    input_files = [
+        "grid.dat",
+        "coastline.dat",
+        "lstcurr_UVW_cte.pre",
+        "lstwinds_cte.pre",
+        "lstwaves_cte.pre",
+    ]
+    input_files_dst = [
+        "grid.dat",
+        "coastline.dat",
+        "lstcurr_UVW.pre",
+        "lstwinds.pre",
+        "lstwaves.pre",
+    ]
+    dir_path.mkdir(parents=True)
+    for src_file, dst_file in zip(input_files, input_files_dst):
+        copyfile(Path(data_path, src_file), Path(dir_path, dst_file))
+
+
+def create_fake_binary(path, fail_first_attempt=False):
+    """script that writes the cfg-path in the output directory (fails first if requested)"""
+    path.write_text(
+        f"#!{sys.executable}\n"
+        "import sys\n"
+        "from pathlib import Path\n"
+        "marker = Path('attempted')\n"
+        f"if {fail_first_attempt} and not marker.exists():\n"
+        "    marker.touch()\n"
+        "    sys.exit(1)\n"
+        "Path('output', 'done.txt').write_text(sys.argv[1])\n"
+    )
+    path.chmod(0o755)
+
+
+def user_parameters(lon):
+    return {
+        "substance_type": "oil",
+        "forcing_init_datetime": datetime(2023, 1, 1, 0, 0, 0),
+        "duration": timedelta(hours=12),
+        "spill_points": [
+            {
+                "release_time": datetime(2023, 1, 1, 0, 0, 0),
+                "lon": lon,
+                "lat": 43.55,
+                "initial_width": 1,
+                "initial_length": 1,
+                "substance": "oil_example",
+                "mass": 1500,
+                "thickness": 0.1,
+            },
+        ],
+    }
+
+
+@pytest.mark.parametrize(
+    "fail_first_attempt, retries, status, attempts",
+    [
+        (False, 0, "finished", 1),
+        (True, 0, "failed", 1),
+        (True, 1, "finished", 2),
+    ],
+)
+def test_TeseoEnsemble(fail_first_attempt, retries, status, attempts, setup_teardown):
+    create_inputs(Path(tmp_path, "input"))
+    create_fake_binary(Path(tmp_path, "teseo"), fail_first_attempt)
+
+    ensemble = TeseoEnsemble(
+        Path(tmp_path, "ensemble"), Path(tmp_path, "input"), Path(tmp_path, "teseo")
+    )
+    parameters_list = [user_parameters(lon) for lon in [-3.49, -3.50, -3.51]]
+    report = ensemble.run(parameters_list, max_workers=2, retries=retries)
+
+    assert isinstance(report, pd.DataFrame)
+    assert report["member_id"].tolist() == [0, 1, 2]
+    assert (report["status"] == status).all()
+    assert (report["attempts"] == attempts).all()
+    assert (report["setup_time"] > 0).all()
+    for member_id in report["member_id"]:
+        member_path = Path(ensemble.member_path(member_id))
+        assert Path(member_path, "input", "grid.dat").exists()
+        assert Path(member_path, "teseo.cfg").exists()
+        assert Path(member_path, "teseo.run").exists()
+        assert Path(member_path, "output", "done.txt").exists() == (
+            status == "finished"
+        )
+
+
+def test_TeseoEnsemble_setup_error(setup_teardown):
+    create_inputs(Path(tmp_path, "input"))
+    create_fake_binary(Path(tmp_path, "teseo"))
+
+    ensemble = TeseoEnsemble(
+        Path(tmp_path, "ensemble"), Path(tmp_path, "input"), Path(tmp_path, "teseo")
+    )
+    parameters = user_parameters(-3.49)
+    parameters.pop("duration")
+    report = ensemble.run([parameters], max_workers=1)
+
+    assert report["status"].tolist() == ["failed"]
+    assert report["error"][0].startswith("setup")
+
+
+def test_TeseoEnsemble_not_exist(setup_teardown):
+    with pytest.raises(FileNotFoundError):
+        TeseoEnsemble(tmp_path, Path(tmp_path, "input"), Path(tmp_path, "teseo"))
+
+
+@pytest.mark.parametrize("mode", [("copy"), ("hardlink"), ("symlink")])
+def test_TeseoEnsemble_shared_inputs(mode, setup_teardown):
+    input_dir = Path(tmp_path, "input")
+    create_inputs(input_dir)
+    create_fake_binary(Path(tmp_path, "teseo"))
+    input_size = sum(file.stat().st_size for file in input_dir.iterdir())
+    binary_size = Path(tmp_path, "teseo").stat().st_size
+
+    ensemble = TeseoEnsemble(
+        Path(tmp_path, "ensemble"), input_dir, Path(tmp_path, "teseo"), mode=mode
+    )
+    parameters_list = [user_parameters(lon) for lon in [-3.49, -3.50]]
+    report = ensemble.run(parameters_list, max_workers=2)
+
+    assert (report["status"] == "finished").all()
+    for member_id in report["member_id"]:
+        member_path = Path(ensemble.member_path(member_id))
+        grid_path = Path(member_path, "input", "grid.dat")
+        assert grid_path.is_symlink() == (mode == "symlink")
+        assert Path(member_path, "teseo").samefile(Path(tmp_path, "teseo")) == (
+            mode != "copy"
+        )
+
+    if mode == "copy":
+        assert ensemble.savings["bytes_saved"] == 0
+    else:
+        assert ensemble.savings["bytes_saved"] == 2 * (input_size + binary_size)
+    assert ensemble.savings["input_time_spent"] > 0
+    assert (ensemble.savings["input_time_saved"] > 0) == (mode != "copy")
+
+
+@pytest.mark.parametrize(
+    "mode, link_fails, files_hashed",
+    [
+        ("copy", False, 6),
+        ("hardlink", False, 0),
+        ("symlink", False, 0),
+        ("hardlink", True, 6),
+    ],
+)
+def test_TeseoEnsemble_checksums(
+    mode, link_fails, files_hashed, monkeypatch, setup_teardown
+):
+    if link_fails and multiprocessing.get_start_method() != "fork":
+        pytest.skip("os.link patch only reaches forked workers")
+    input_dir = Path(tmp_path, "input")
+    create_inputs(input_dir)
+    create_fake_binary(Path(tmp_path, "teseo"))
+
+    def failed_link(src, dst):
+        raise OSError("Invalid cross-device link")
+
+    if link_fails:
+        monkeypatch.setattr(os, "link", failed_link)
+    ensemble = TeseoEnsemble(
+        Path(tmp_path, "ensemble"), input_dir, Path(tmp_path, "teseo"), mode=mode
+    )
+    report = ensemble.run([user_parameters(-3.49)], max_workers=1)
+
+    assert (report["status"] == "finished").all()
+    assert report["files_hashed"].tolist() == [files_hashed]
+    assert (report["bytes_copied"] > 0).tolist() == [files_hashed > 0]
+    assert ensemble.savings["input_time_saved"] >= 0
+
+
+def test_TeseoEnsemble_corrupted_copy(monkeypatch, setup_teardown):
+    input_dir = Path(tmp_path, "input")
+    create_inputs(input_dir)
+    create_fake_binary(Path(tmp_path, "teseo"))
+
+    monkeypatch.setattr(ensemble_module, "_source_checksum", lambda path: "checksum")
+    ensemble = TeseoEnsemble(
+        Path(tmp_path, "ensemble"), input_dir, Path(tmp_path, "teseo")
+    )
+    report = ensemble.run([user_parameters(-3.49)], max_workers=1)
+
+    assert report["status"].tolist() == ["failed"]
+    assert "does not match" in report["error"][0]
+
+
+def test_source_checksum_cache(monkeypatch, setup_teardown):
+    path = Path(tmp_path, "forcing.txt")
+    path.write_text("0.0 1.0")
+    checksums = []
+
+    def counted_checksum(path, *args, **kwargs):
+        checksums.append(path)
+        return "checksum"
+
+    monkeypatch.setattr(ensemble_module, "_file_checksum", counted_checksum)
+    monkeypatch.setattr(ensemble_module, "_SOURCE_CHECKSUMS", {})
+    ensemble_module._source_checksum(path)
+    ensemble_module._source_checksum(path)
+    assert len(checksums) == 1
+
+    path.write_text("0.0 1.0 2.0")
+    ensemble_module._source_checksum(path)
+    assert len(checksums) == 2
+
+
+def test_TeseoEnsemble_bad_mode(setup_teardown):
+    with pytest.raises(ValueError):
+        TeseoEnsemble(tmp_path, tmp_path, tmp_path, mode="move")
@@ -1,14 +1,19 @@
 from pathlib import Path
-from shutil import rmtree
+from shutil import copyfile, rmtree
 
+import numpy as np
 import pandas as pd
 import pytest
+import xarray as xr
 
 from pyteseo.__init__ import __version__ as v
 from pyteseo.io.forcings import (
     read_2d_forcing,
+    read_2d_forcing_dataset,
     write_2d_forcing,
+    write_2d_forcing_from_dataset,
     read_cte_forcing,
+    read_forcing_metadata,
     write_cte_forcing,
     write_null_forcing,
 )
@@ -118,3 +123,137 @@ def test_write_null_forcing(type, out_file, setup_teardown):
     df = read_cte_forcing(Path(tmp_path, out_file), type, 1)
     assert len(df.index) == 1
     assert (df.values == 0).all()
+
+
+@pytest.mark.parametrize(
+    "file, forcing_type, spatially_cte",
+    [
+        ("lstcurr_UVW.pre", "currents", False),
+        ("lstwinds.pre", "winds", False),
+        ("lstwaves.pre", "waves", False),
+        ("lstcurr_UVW_cte.pre", "currents", True),
+        ("lstwinds_cte.pre", "winds", True),
+        ("lstwaves_cte.pre", "waves", True),
+    ],
+)
+def test_read_forcing_metadata(file, forcing_type, spatially_cte):
+    path = Path(data_path, file)
+    metadata = read_forcing_metadata(path, forcing_type, dt_cte=1)
+
+    assert metadata["spatially_cte"] == spatially_cte
+    assert metadata["nt"] == 4
+    assert metadata["dt"] == 1
+    if spatially_cte:
+        assert metadata["nx"] == metadata["ny"] == 1
+        assert metadata["dx"] is None and metadata["dy"] is None
+    else:
+        df = read_2d_forcing(path, forcing_type)
+        assert metadata["nx"] == df["lon"].nunique()
+        assert metadata["ny"] == df["lat"].nunique()
+        assert metadata["dx"] == np.unique(np.diff(df["lon"].unique()))[0]
+        assert metadata["dy"] == np.unique(np.diff(df["lat"].unique()))[0]
+
+
+@pytest.mark.parametrize(
+    "file, forcing_type, error",
+    [
+        ("lstcurr_UVW.pre", "currents", None),
+        ("lstwinds.pre", "winds", None),
+        ("lstwaves.pre", "waves", None),
+        ("lstwaves.pre", "waves", "bad_snapshot"),
+    ],
+)
+def test_read_2d_forcing_dataset(file, forcing_type, error, setup_teardown):
+    path = Path(data_path, file)
+    df = read_2d_forcing(path, forcing_type)
+
+    if error == "bad_snapshot":
+        for src in list(data_path.glob("waves_*h.txt")) + [path]:
+            copyfile(src, Path(tmp_path, src.name))
+        with open(Path(tmp_path, "waves_003h.txt"), "a") as f:
+            f.write("9.0 44.0 1.0 1.0 1.0\n")
+        ds = read_2d_forcing_dataset(Path(tmp_path, file), forcing_type)
+        ds.isel(time=0).compute()
+        with pytest.raises(ValueError):
+            ds.isel(time=3).compute()
+    else:
+        ds = read_2d_forcing_dataset(path, forcing_type)
+        assert isinstance(ds, xr.Dataset)
+        assert ds[df.columns[-1]].chunks[0] == (1,) * df["time"].nunique()
+        ds_eager = df.set_index(["time", "lat", "lon"]).to_xarray()
+        xr.testing.assert_allclose(
+            ds.compute(), ds_eager.transpose("time", "lat", "lon")
+        )
+
+
+@pytest.mark.parametrize(
+    "n_workers, executor, engine",
+    [
+        (2, "thread", "c"),
+        (2, "process", "c"),
+        (1, "thread", "pyarrow"),
+        (2, "thread", "pyarrow"),
+    ],
+)
+def test_read_2d_forcing_parallel(n_workers, executor, engine):
+    if engine == "pyarrow":
+        pytest.importorskip("pyarrow")
+    path = Path(data_path, "lstcurr_UVW.pre")
+
+    df = read_2d_forcing(path, "currents")
+    df_parallel = read_2d_forcing(
+        path, "currents", n_workers=n_workers, executor=executor, engine=engine
+    )
+    pd.testing.assert_frame_equal(df, df_parallel)
+    assert df_parallel["time"].unique().tolist() == [0, 1, 2, 3]
+
+
+@pytest.mark.parametrize(
+    "n_workers, executor", [(1, "thread"), (2, "thread"), (2, "process")]
+)
+def test_write_2d_forcing_roundtrip(n_workers, executor, setup_teardown):
+    df = read_2d_forcing(Path(data_path, "lstcurr_UVW.pre"), "currents")
+    df.loc[df.index[::5], "u"] = np.nan
+
+    write_2d_forcing(
+        df=df,
+        dir_path=tmp_path,
+        forcing_type="currents",
+        n_workers=n_workers,
+        executor=executor,
+    )
+    # NOTE - writing again overwrites the lst-file instead of appending to it
+    write_2d_forcing(df=df, dir_path=tmp_path, forcing_type="currents")
+    df_new = read_2d_forcing(Path(tmp_path, "lstcurr_UVW.pre"), "currents")
+
+    assert len(Path(tmp_path, "lstcurr_UVW.pre").read_text().splitlines()) == 4
+    assert df_new["u"].isna().sum() == 0
+    assert (df_new["u"] == 0).sum() == df["u"].isna().sum()
+    np.testing.assert_allclose(df_new["v"], df["v"], rtol=1e-8)
+    with open(Path(tmp_path, "currents_000h.txt")) as f:
+        assert f.readline().count("\t") == 3
+
+
+@pytest.mark.parametrize(
+    "forcing_type, file, datetimes",
+    [
+        ("currents", "lstcurr_UVW.pre", False),
+        ("winds", "lstwinds.pre", True),
+        ("waves", "lstwaves.pre", False),
+    ],
+)
+def test_write_2d_forcing_from_dataset(forcing_type, file, datetimes, setup_teardown):
+    df = read_2d_forcing(Path(data_path, file), forcing_type)
+    ds = read_2d_forcing_dataset(Path(data_path, file), forcing_type)
+    if datetimes:
+        ds["time"] = pd.Timestamp("2023-01-01") + pd.to_timedelta(ds["time"], "h")
+
+    write_2d_forcing_from_dataset(ds, tmp_path, forcing_type)
+    df_new = read_2d_forcing(Path(tmp_path, file), forcing_type)
+
+    assert df_new["time"].unique().tolist() == df["time"].unique().tolist()
+    pd.testing.assert_frame_equal(
+        df_new.reset_index(drop=True),
+        df.fillna(0).sort_values(["time", "lon", "lat"], ignore_index=True),
+        check_dtype=False,
+    )
@@ -0,0 +1,165 @@
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+import xarray as xr
+
+from pyteseo.io.forcings import read_2d_forcing
+from pyteseo.regrid import (
+    Regridder,
+    _cached_weights,
+    regrid_dataframe,
+    regrid_dataset,
+    weights_1d,
+)
+
+data_path = Path(__file__).parent.parent / "data"
+
+lon = np.arange(-5, -2, 1 / 12)
+lat = np.arange(42, 45, 1 / 12)
+
+
+def linear_field(x, y):
+    return 2 * x - 3 * y + 1
+
+
+@pytest.mark.parametrize("method", ["bilinear", "nearest", "conservative"])
+def test_regrid_same_grid(method):
+    values = np.random.rand(3, len(lat), len(lon))
+    regridder = Regridder(lon, lat, lon, lat, method)
+
+    np.testing.assert_allclose(regridder(values), values, rtol=1e-12)
+
+
+def test_regrid_bilinear():
+    dst_lon = np.linspace(-4.5, -2.5, 31)
+    dst_lat = np.linspace(42.5, 44.5, 21)
+    regridder = Regridder(lon, lat, dst_lon, dst_lat, "bilinear")
+
+    values = regridder(linear_field(*np.meshgrid(lon, lat)))
+
+    np.testing.assert_allclose(values, linear_field(*np.meshgrid(dst_lon, dst_lat)))
+
+
+def test_regrid_nearest():
+    dst_lon = lon[::4] + 0.01
+    dst_lat = lat[::3] - 0.01
+    regridder = Regridder(lon, lat, dst_lon, dst_lat, "nearest")
+    values = np.random.rand(len(lat), len(lon))
+
+    np.testing.assert_array_equal(regridder(values), values[::3, ::4])
+
+
+def test_regrid_conservative():
+    dst_lon = lon.reshape(-1, 3).mean(axis=1)
+    dst_lat = lat.reshape(-1, 4).mean(axis=1)
+    regridder = Regridder(lon, lat, dst_lon, dst_lat, "conservative")
+    values = np.random.rand(2, len(lat), len(lon))
+
+    expected = values.reshape(2, len(dst_lat), 4, len(dst_lon), 3).mean(axis=(2, 4))
+    np.testing.assert_allclose(regridder(values), expected)
+
+
+@pytest.mark.parametrize("method", ["bilinear", "nearest", "conservative"])
+def test_regrid_nan(method):
+    values = np.ones((len(lat), len(lon)))
+    values[:, :6] = np.nan
+    regridder = Regridder(lon, lat, lon[::2], lat[::2], method)
+
+    regridded = regridder(values)
+
+    assert np.all(np.isnan(regridded[:, :2]))
+    np.testing.assert_allclose(regridded[:, 3:], 1)
+
+
+def test_regrid_outside():
+    regridder = Regridder(lon, lat, np.array([-6.0, -4.0, 0.0]), np.array([43.0]))
+
+    regridded = regridder(np.ones((len(lat), len(lon))))
+
+    np.testing.assert_array_equal(np.isnan(regridded), [[True, False, True]])
+
+
+def test_regrid_descending_lat():
+    values = np.random.rand(len(lat), len(lon))
+    dst_lon, dst_lat = np.linspace(-4, -3, 7), np.linspace(43, 44, 9)
+
+    ascending = Regridder(lon, lat, dst_lon, dst_lat)(values)
+    descending = Regridder(lon, lat[::-1], dst_lon, dst_lat)(values[::-1])
+
+    np.testing.assert_allclose(ascending, descending)
+
+
+@pytest.mark.parametrize(
+    "src, method",
+    [([0.0], "bilinear"), ([0.0, 1.0, 1.0], "nearest"), ([0.0, 1.0], "cubic")],
+)
+def test_weights_1d_errors(src, method):
+    with pytest.raises(ValueError):
+        weights_1d(np.array(src), np.array([0.5]), method)
+
+
+def test_cached_weights():
+    dst = np.linspace(-4, -3, 11)
+    assert _cached_weights(lon, dst, "bilinear") is _cached_weights(
+        lon.copy(), dst.copy(), "bilinear"
+    )
+    assert _cached_weights(lon, dst, "bilinear") is not _cached_weights(
+        lon, dst, "nearest"
+    )
+
+
+@pytest.mark.parametrize("chunks", [None, {"time": 1}])
+def test_regrid_dataset(chunks):
+    time = pd.date_range("2023-01-01", periods=4, freq="h")
+    x, y = np.meshgrid(lon, lat)
+    ds = xr.Dataset(
+        {
+            "u": (("time", "lat", "lon"), np.stack([linear_field(x, y)] * 4)),
+            "v": (("lon", "time", "lat"), np.random.rand(len(lon), 4, len(lat))),
+            "t": (("time",), np.arange(4.0)),
+        },
+        coords={"time": time, "lat": lat, "lon": lon},
+    )
+    if chunks:
+        ds = ds.chunk(chunks)
+    dst_lon, dst_lat = np.linspace(-4, -3, 5), np.linspace(43, 44, 7)
+
+    regridded = regrid_dataset(ds, dst_lon, dst_lat)
+
+    assert regridded["u"].dims == ("time", "lat", "lon")
+    assert regridded["u"].shape == (4, 7, 5)
+    assert regridded["v"].shape == (4, 7, 5)
+    np.testing.assert_array_equal(regridded["t"], ds["t"])
+    np.testing.assert_allclose(
+        regridded["u"].isel(time=0), linear_field(*np.meshgrid(dst_lon, dst_lat))
+    )
+
+
+def test_regrid_dataframe():
+    df = read_2d_forcing(Path(data_path, "lstcurr_UVW.pre"), "currents")
+    dst_lon = np.linspace(df["lon"].min(), df["lon"].max(), 7)
+    dst_lat = np.linspace(df["lat"].min(), df["lat"].max(), 5)
+
+    regridded = regrid_dataframe(df, dst_lon, dst_lat)
+
+    assert list(regridded.columns) == list(df.columns)
+    assert len(regridded) == df["time"].nunique() * 7 * 5
+    np.testing.assert_allclose(regridded["lon"].unique(), dst_lon)
+    assert not regridded.isna().any().any()
+
+    same = regrid_dataframe(df, df["lon"].unique(), df["lat"].unique(), "nearest")
+    pd.testing.assert_frame_equal(
+        same, df.sort_values(["time", "lon", "lat"]).reset_index(drop=True)
+    )
+
+
+def test_Regridder_from_grid():
+    grid = SimpleNamespace(x_min=-4.0, x_max=-3.0, nx=11, y_min=43.0, y_max=44.0, ny=6)
+
+    regridder = Regridder.from_grid(lon, lat, grid, "conservative")
+
+    assert regridder.dst_shape == (6, 11)
+    np.testing.assert_allclose(regridder.dst_lon, np.linspace(-4, -3, 11))
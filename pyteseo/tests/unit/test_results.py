@@ -1,12 +1,16 @@
 from pathlib import Path
-from shutil import rmtree
+from shutil import copyfile, rmtree
 
+import numpy as np
 import pandas as pd
 import pytest
+import xarray as xr
 
 from pyteseo.__init__ import __version__ as v
 from pyteseo.io.results import (
+    ResultsTail,
     read_grids_results,
+    read_grids_results_dataset,
     read_particles_results,
     read_properties_results,
 )
@@ -53,3 +57,133 @@ def test_read_grids_results(error):
 
     df = read_grids_results(dir_path=data_path)
     assert isinstance(df, pd.DataFrame)
+
+
+@pytest.mark.parametrize(
+    "n_workers, executor, error",
+    [
+        (2, "thread", None),
+        (2, "process", None),
+        (2, "not_valid", "bad_executor"),
+        (1, "proces", "bad_executor"),
+        (0, "thread", "bad_n_workers"),
+    ],
+)
+def test_read_particles_results_parallel(n_workers, executor, error):
+    if error:
+        with pytest.raises(ValueError):
+            read_particles_results(data_path, n_workers=n_workers, executor=executor)
+    else:
+        df = read_particles_results(data_path)
+        df_parallel = read_particles_results(
+            data_path, n_workers=n_workers, executor=executor
+        )
+        pd.testing.assert_frame_equal(df, df_parallel)
+
+
+@pytest.mark.parametrize(
+    "reader, result_type",
+    [
+        (read_particles_results, "particles"),
+        (read_properties_results, "properties"),
+        (read_grids_results, "grids"),
+    ],
+)
+def test_read_results_cache(reader, result_type, setup_teardown):
+    cache_path = Path(tmp_path, f"{result_type}_{data_path.name}.npz")
+
+    df = reader(data_path)
+    df_first = reader(data_path, cache=True, cache_dir=tmp_path)
+    assert cache_path.exists()
+    df_cached = reader(data_path, cache=True, cache_dir=tmp_path)
+
+    pd.testing.assert_frame_equal(df, df_first)
+    pd.testing.assert_frame_equal(df, df_cached)
+
+
+def test_read_results_cache_invalidation(setup_teardown):
+    results_path = Path(tmp_path, "output")
+    results_path.mkdir()
+    for file in data_path.glob("*_particles_*.txt"):
+        copyfile(file, Path(results_path, file.name))
+
+    df = read_particles_results(results_path, cache=True)
+    cache_path = Path(tmp_path, ".pyteseo_cache", "particles_output.npz")
+    assert cache_path.exists()
+
+    last_file = sorted(results_path.glob("*_particles_*.txt"))[-1]
+    last_file.unlink()
+    df_updated = read_particles_results(results_path, cache=True)
+    assert len(df_updated) < len(df)
+    pd.testing.assert_frame_equal(df_updated, read_particles_results(results_path))
+
+
+def test_read_grids_results_dense():
+    df = read_grids_results(dir_path=data_path)
+
+    n_cells = df.groupby(["spill_id", "time"]).size()
+    assert n_cells.nunique() == 1
+    assert not df.duplicated(["spill_id", "time", "lon", "lat"]).any()
+    for file in data_path.glob("*_grid_*.txt"):
+        spill_id = int(file.stem.split("_")[2])
+        active = pd.read_csv(
+            file, sep=",", header=0, encoding="iso-8859-1", skipinitialspace=True
+        )
+        time = active["time (h)"].values[0]
+        df_time = df[(df["spill_id"] == spill_id) & (df["time"] == time)]
+        assert df_time["particles_count"].notna().sum() == len(active)
+        assert (
+            df_time["particles_count"].sum() == active["particles_per_cell (-)"].sum()
+        )
+
+
+@pytest.mark.parametrize("chunks", [(None), ({"time": 5})])
+def test_read_grids_results_dataset(chunks):
+    ds = read_grids_results_dataset(dir_path=data_path, chunks=chunks)
+    df = read_grids_results(dir_path=data_path)
+
+    assert isinstance(ds, xr.Dataset)
+    assert list(ds["particles_count"].dims) == ["spill_id", "time", "lat", "lon"]
+    assert ds["particles_count"].dtype == np.float32
+    assert list(ds.spill_id.values) == [1, 2]
+    assert list(ds.time.values) == sorted(df.time.unique())
+    assert float(ds["particles_count"].sum()) == df["particles_count"].sum()
+    if chunks:
+        assert ds["particles_count"].chunks is not None
+
+
+def test_results_tail(setup_teardown):
+    results_path = Path(tmp_path, "output")
+    results_path.mkdir()
+    particles_files = sorted(data_path.glob("*_particles_*.txt"))
+    grids_files = sorted(data_path.glob("*_grid_*.txt"))
+    properties_lines = Path(data_path, "cas1_properties_001.txt").read_bytes()
+    properties_lines = properties_lines.splitlines(keepends=True)
+
+    tail = ResultsTail(results_path)
+    assert tail.poll() == []
+
+    copyfile(particles_files[0], Path(results_path, particles_files[0].name))
+    copyfile(grids_files[0], Path(results_path, grids_files[0].name))
+    with open(Path(results_path, "cas1_properties_001.txt"), "wb") as f:
+        f.writelines(properties_lines[:3])
+    results = tail.poll()
+    assert [result_type for result_type, _ in results] == ["properties"]
+    assert len(results[0][1]) == 2
+    assert results[0][1]["spill_id"].unique().tolist() == [1]
+
+    results = dict(tail.poll())
+    assert list(results.keys()) == ["particles", "grids"]
+    assert results["grids"]["spill_id"].unique().tolist() == [1]
+    assert tail.poll() == []
+
+    for file in particles_files[1:]:
+        copyfile(file, Path(results_path, file.name))
+    with open(Path(results_path, "cas1_properties_001.txt"), "ab") as f:
+        f.writelines(properties_lines[3:])
+
+    results = list(tail.follow(until=lambda: True))
+    particles = [df for result_type, df in results if result_type == "particles"]
+    properties = [df for result_type, df in results if result_type == "properties"]
+    assert len(particles) == len(particles_files) - 1
+    assert len(properties[0]) == len(properties_lines) - 3
@@ -0,0 +1,141 @@
+from datetime import timedelta
+from pathlib import Path
+from shutil import rmtree
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pyteseo.__init__ import __version__ as v
+from pyteseo.defaults import EARTH_RADIUS
+from pyteseo.io.forcings import read_2d_forcing, read_cte_forcing, write_2d_forcing
+from pyteseo.subdomain import crop_to_bbox, crop_to_reachable_area, reachable_bbox
+
+data_path = Path(__file__).parent.parent / "data"
+tmp_path = Path(f"./tmp_pyteseo_{v}_tests")
+spill_points = [{"lon": -3.5, "lat": 43.5}, {"lon": -3.4, "lat": 43.6}]
+
+
+@pytest.fixture
+def setup_teardown():
+    if not tmp_path.exists():
+        tmp_path.mkdir()
+    yield
+    if tmp_path.exists():
+        rmtree(tmp_path)
+
+
+def create_forcing(u=0.5, v=0.0, nt=3):
+    """currents or winds DataFrame [time, lon, lat, u, v] over a 0.05 degrees grid"""
+    lon = np.round(np.arange(-5, -2, 0.05), 6)
+    lat = np.round(np.arange(42, 45, 0.05), 6)
+    time, lon, lat = np.meshgrid(np.arange(nt, dtype=float), lon, lat, indexing="ij")
+    df = pd.DataFrame({"time": time.ravel(), "lon": lon.ravel(), "lat": lat.ravel()})
+    df["u"] = u
+    df["v"] = v
+    return df
+
+
+def test_reachable_bbox():
+    currents = create_forcing(u=0.3, v=0.4)
+    winds = create_forcing(u=10.0)
+    duration = timedelta(hours=6)
+
+    bbox = reachable_bbox(spill_points, duration, currents, winds, buffer=0.1)
+
+    distance = (0.5 + 0.035 * 10) * 6 * 3600 * 1.1
+    dlat = np.degrees(distance / EARTH_RADIUS)
+    assert bbox[1] == pytest.approx(43.5 - dlat)
+    assert bbox[3] == pytest.approx(43.6 + dlat)
+    dlon = np.degrees(
+        distance / (EARTH_RADIUS * np.cos(np.radians([43.5, 43.6]) + np.radians(dlat)))
+    )
+    assert bbox[0] == pytest.approx(-3.5 - dlon[0])
+    assert bbox[2] == pytest.approx(-3.4 + dlon[1])
+
+
+def test_reachable_bbox_nan_and_dataset():
+    currents = create_forcing(u=1.0)
+    currents.loc[currents.index[::2], ["u", "v"]] = np.nan
+    ds = currents.set_index(["time", "lat", "lon"]).to_xarray()
+
+    bbox_df = reachable_bbox(spill_points, timedelta(hours=1), currents)
+    bbox_ds = reachable_bbox(spill_points, timedelta(hours=1), ds)
+
+    assert bbox_df == bbox_ds
+    assert bbox_df[0] < -3.5 and bbox_df[2] > -3.4
+
+
+def test_reachable_bbox_errors():
+    with pytest.raises(ValueError):
+        reachable_bbox([], timedelta(hours=1))
+    with pytest.raises(ValueError):
+        reachable_bbox(spill_points, timedelta(hours=1), buffer=-1)
+
+
+@pytest.mark.parametrize("margin", [0, 1, 2])
+def test_crop_to_bbox(margin):
+    df = create_forcing()
+    bbox = (-3.62, 43.41, -3.38, 43.59)
+
+    cropped = crop_to_bbox(df, bbox, margin)
+
+    lon, lat = np.unique(cropped["lon"]), np.unique(cropped["lat"])
+    assert len(lon) == 5 + 2 * margin
+    assert len(lat) == 3 + 2 * margin
+    assert len(cropped) == 3 * len(lon) * len(lat)
+    assert np.sum(lon < bbox[0]) == margin and np.sum(lon > bbox[2]) == margin
+
+    ds = df.set_index(["time", "lat", "lon"]).to_xarray()
+    cropped_ds = crop_to_bbox(ds, bbox, margin)
+    np.testing.assert_array_equal(cropped_ds["lon"], lon)
+    np.testing.assert_array_equal(cropped_ds["lat"], lat)
+
+
+def test_crop_to_bbox_outside():
+    with pytest.raises(ValueError):
+        crop_to_bbox(create_forcing(), (10, 43, 11, 44))
+
+
+def test_crop_to_bbox_cte_forcing():
+    df = read_cte_forcing(Path(data_path, "lstcurr_UVW_cte.pre"), "currents", 1.0)
+    assert crop_to_bbox(df, (-4, 43, -3, 44)) is df
+
+
+def test_crop_to_reachable_area_cte_forcing():
+    parameters = {"spill_points": spill_points, "duration": timedelta(hours=1)}
+    currents = read_cte_forcing(Path(data_path, "lstcurr_UVW_cte.pre"), "currents", 1.0)
+    winds = read_cte_forcing(Path(data_path, "lstwinds_cte.pre"), "winds", 1.0)
+
+    cropped = crop_to_reachable_area(parameters, currents, winds)
+
+    distance = (currents["mod"].max() + 0.035 * winds["mod"].max()) * 3600 * 1.2
+    assert cropped["bbox"][3] == pytest.approx(
+        43.6 + np.degrees(distance / EARTH_RADIUS)
+    )
+    assert cropped["currents"] is currents
+    assert cropped["winds"] is winds
+
+
+def test_crop_to_reachable_area(setup_teardown):
+    parameters = {"spill_points": spill_points, "duration": timedelta(hours=12)}
+    currents = create_forcing(u=0.2, v=0.1)
+    winds = create_forcing(u=5.0, v=5.0)
+    results_grid = currents.loc[currents["time"] == 0, ["lon", "lat"]].assign(
+        depth=10.0
+    )
+
+    cropped = crop_to_reachable_area(
+        parameters, currents, winds, results_grid=results_grid
+    )
+
+    assert set(cropped) == {"bbox", "currents", "winds", "results_grid"}
+    assert len(cropped["currents"]) < len(currents) / 10
+    pd.testing.assert_frame_equal(
+        cropped["currents"][["lon", "lat"]], cropped["winds"][["lon", "lat"]]
+    )
+    assert len(cropped["results_grid"]) == len(cropped["currents"]) / 3
+
+    write_2d_forcing(cropped["currents"], tmp_path, "currents")
+    df = read_2d_forcing(Path(tmp_path, "lstcurr_UVW.pre"), "currents")
+    assert len(df) == len(cropped["currents"])
@@ -1,6 +1,7 @@
+import asyncio
 import subprocess
 from pathlib import Path
-from shutil import copyfile
+from time import monotonic
 
 from pyteseo.classes import Coastline, Currents, Grid, Waves, Winds
 from pyteseo.defaults import (
@@ -18,6 +19,7 @@ from pyteseo.io.results import (
     read_properties_results,
 )
 from pyteseo.io.run import generate_parameters_for_run, write_run
+from pyteseo.io.utils import _share_file
 
 
 class TeseoWrapper:
@@ -60,6 +62,7 @@ class TeseoWrapper:
         currents_dt_cte: float = 1,
         winds_dt_cte: float = 1,
         waves_dt_cte: float = 1,
+        sidecar: bool = False,
     ):
         """load input files in simulation 'inputs' directory
 
@@ -67,6 +70,7 @@ class TeseoWrapper:
             currents_dt_cte (float, optional): dt for spatially cte currents (hours). Defaults to 1.
             winds_dt_cte (float, optional):  dt for spatially cte winds (hours). Defaults to 1.
             waves_dt_cte (float, optional):  dt for spatially cte waves (hours). Defaults to 1.
+            sidecar (bool, optional): read the grid from its memory-mapped binary sidecar (built on first read and reused). Defaults to False.
 
         Raises:
             FileNotFoundError: grid file not founded in 'inputs' directory!
@@ -74,7 +78,7 @@ class TeseoWrapper:
         input_dir = Path(self.input_dir).resolve()
         print("Loading grid...")
         if Path(input_dir, FILE_NAMES["grid"]).exists():
-            self.grid = Grid(Path(input_dir, FILE_NAMES["grid"]))
+            self.grid = Grid(Path(input_dir, FILE_NAMES["grid"]), sidecar=sidecar)
         else:
             raise FileNotFoundError("Grid-file is mandatory!")
 
@@ -177,26 +181,46 @@ class TeseoWrapper:
             if not Path(path).exists():
                 raise FileNotFoundError(path)
 
-    def prepare_teseo_binary(self, teseo_binary_path: str):
-        """copy TESEO model binary to simulation directory
+    def prepare_teseo_binary(self, teseo_binary_path: str, mode: str = "copy") -> int:
+        """copy (or link) TESEO model binary to simulation directory
 
         Args:
             teseo_binary_path (str): path to the binary
+            mode (str, optional): "copy", "hardlink" or "symlink". Defaults to "copy".
 
         Raises:
             FileNotFoundError: if binary not founded
+
+        Returns:
+            int: bytes saved in disk by linking the binary
         """
         self.teseo_binary_path = Path(self.path, Path(teseo_binary_path).name)
         if Path(teseo_binary_path).exists():
-            copyfile(teseo_binary_path, self.teseo_binary_path)
+            return _share_file(teseo_binary_path, self.teseo_binary_path, mode)
         else:
             raise FileNotFoundError(teseo_binary_path)
 
     def execute_simulation(self) -> None:
         """triggers TESEO simulation process"""
-        subprocess.run(
-            [f"{self.teseo_binary_path} {self.cfg_path}"], cwd=self.path, check=True
+        subprocess.run(self._simulation_command, cwd=self.path, check=True)
+
+    async def execute_simulation_async(self) -> "SimulationHandle":
+        """triggers TESEO simulation process without blocking the event loop
+
+        Returns:
+            SimulationHandle: handle to follow (status, elapsed, returncode) and await the simulation
+        """
+        process = await asyncio.create_subprocess_exec(
+            *self._simulation_command,
+            cwd=self.path,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
         )
+        return SimulationHandle(process, self._simulation_command)
+
+    @property
+    def _simulation_command(self) -> list:
+        return [str(self.teseo_binary_path), str(self.cfg_path)]
 
     @property
     def load_particles(self):
@@ -232,6 +256,85 @@ class TeseoWrapper:
         return d
 
 
+class SimulationHandle:
+    def __init__(self, process: asyncio.subprocess.Process, command: list = None):
+        """handle of a TESEO simulation running in the background (asyncio subprocess)
+
+        Args:
+            process (asyncio.subprocess.Process): running TESEO process
+            command (list, optional): command used to launch the process. Defaults to None.
+        """
+        self.process = process
+        self.command = command
+        self.stdout = None
+        self.stderr = None
+        self._start = monotonic()
+        self._end = None
+        self._task = asyncio.ensure_future(self._communicate())
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(pid={self.process.pid}, status={self.status})"
+        )
+
+    async def _communicate(self) -> None:
+        stdout, stderr = await self.process.communicate()
+        self._end = monotonic()
+        self.stdout = stdout.decode(errors="replace")
+        self.stderr = stderr.decode(errors="replace")
+
+    @property
+    def pid(self) -> int:
+        return self.process.pid
+
+    @property
+    def returncode(self) -> int:
+        return self.process.returncode if self.done else None
+
+    @property
+    def done(self) -> bool:
+        return self._task.done()
+
+    @property
+    def status(self) -> str:
+        """'running', 'finished' (returncode 0) or 'failed'"""
+        if not self.done:
+            return "running"
+        return "finished" if self.process.returncode == 0 else "failed"
+
+    @property
+    def elapsed(self) -> float:
+        """seconds since the simulation started (until it ended if done)"""
+        return (self._end if self._end is not None else monotonic()) - self._start
+
+    async def wait(self, check: bool = False) -> "SimulationHandle":
+        """wait until the simulation ends and its outputs are captured
+
+        Args:
+            check (bool, optional): raise if TESEO exits with a non-zero code. Defaults to False.
+
+        Raises:
+            subprocess.CalledProcessError: if check and the simulation failed
+
+        Returns:
+            SimulationHandle: this handle
+        """
+        await asyncio.shield(self._task)
+        if check and self.process.returncode != 0:
+            raise subprocess.CalledProcessError(
+                self.process.returncode,
+                self.command,
+                output=self.stdout,
+                stderr=self.stderr,
+            )
+        return self
+
+    def terminate(self) -> None:
+        """terminate the simulation process if still running"""
+        if not self.done:
+            self.process.terminate()
+
+
 def check_user_minimum_parameters(
     user_parameters: dict[str, any],
     cfg_mandatory_keys: dict[str, any] = CFG_MAIN_MANDATORY_KEYS,